@@ -1,7 +1,17 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import auth, time_entries
+from app.api.api_v1.endpoints import auth, time_entries, reports, jobs, system
+from app.core.config import settings
 
 api_router = APIRouter()
 
+if settings.ASYNC_DB:
+    # Registered first so they take precedence over the sync routes with the same path
+    from app.api.api_v1.endpoints import async_auth, async_time_entries
+    api_router.include_router(async_auth.router, prefix="/auth", tags=["authentication"])
+    api_router.include_router(async_time_entries.router, prefix="/time-entries", tags=["time entries"])
+
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(time_entries.router, prefix="/time-entries", tags=["time entries"])
+api_router.include_router(reports.router, prefix="/reports", tags=["reports"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(system.router, prefix="/system", tags=["system"])
@@ -0,0 +1,45 @@
+from datetime import timedelta
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.crud.async_user import get_user_by_email, update_password_hash
+from app.schemas.user import UserLogin
+from app.core.security import create_access_token, verify_and_update_password, PasswordHasherBusy
+from app.core.config import settings
+from app.api.api_v1.endpoints.auth import hasher_busy
+from app.core.rate_limit import limiter
+
+router = APIRouter()
+
+@router.post("/login")
+@limiter.limit(settings.LOGIN_RATE_LIMIT)  # Same URL as the sync route, so the same counters
+async def login(request: Request, user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await get_user_by_email(db, user_data.email)
+    verified, new_hash = False, None
+    if user:
+        try:
+            # bcrypt is CPU-bound, keep it off the event loop
+            verified, new_hash = await verify_and_update_password(user_data.password, user.hashed_password)
+        except PasswordHasherBusy:
+            raise hasher_busy()
+    if not verified:
+        # Don't reveal whether email exists or not
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if new_hash:
+        await update_password_hash(db, user, new_hash)
+
+    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": user
+    }
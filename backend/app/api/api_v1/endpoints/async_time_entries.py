@@ -0,0 +1,234 @@
+"""Async twins of the core time entry routes, mounted instead of the sync ones when ASYNC_DB is on.
+
+Reads use the async queries in app.crud.async_time_entry. Writes run the sync crud
+functions through write_entry, and bulk import and the audit export keep their sync
+implementations in time_entries.py.
+"""
+from datetime import date, datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_async_db
+from app.db.archive import ArchivedYearError
+from app.db.write_queue import run_write_async
+from app.core.config import settings
+from app.core.rate_limit import limit_entry_writes
+from app.api.deps import get_current_user_async
+from app.api.api_v1.endpoints.time_entries import (
+    cache_headers,
+    entity_tag,
+    not_modified,
+    page_response,
+    parse_page_request,
+    upserted_entry_response
+)
+from app.crud import time_entry as sync_crud
+from app.crud.async_time_entry import (
+    get_time_entry,
+    can_edit_entry,
+    get_total_hours,
+    get_entry_by_date,
+    get_time_entry_rows,
+    get_data_version,
+    get_list_validator,
+    edit_cutoff
+)
+from app.schemas.time_entry import TimeEntry, TimeEntryCreate, TimeEntryDay, TimeEntryUpdate
+from app.models.user import User
+
+router = APIRouter()
+
+async def write_entry(db: AsyncSession, operation, *args, **kwargs):
+    """Async counterpart of time_entries.write_entry; `operation` is the sync crud function"""
+    if settings.WRITE_QUEUE_ENABLED:
+        return await run_write_async(operation, *args, **kwargs)
+    return await db.run_sync(operation, *args, **kwargs)
+
+@router.get("/", response_model=List[TimeEntry])
+async def read_time_entries(
+    request: Request,
+    year: Optional[int] = Query(None, description="Filter by year (defaults to current year)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; the next page's cursor is returned in X-Next-Cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. date,hours,project_phase"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        requested, columns, after = parse_page_request(limit, cursor, fields)
+        version, editable = await get_list_validator(db, current_user.id, edit_cutoff())
+        etag = entity_tag(request, current_user.id, year or datetime.now().year, version, editable)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        rows = await get_time_entry_rows(
+            db, current_user.id, columns, year=year,
+            limit=limit + 1 if limit is not None else None, after=after
+        )
+        return page_response(rows, requested, limit, headers=cache_headers(etag))
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in read_time_entries: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch time entries: {str(e)}"
+        )
+
+@router.post("/", response_model=TimeEntry)
+@limit_entry_writes
+async def create_time_entry_endpoint(
+    request: Request,
+    entry_data: TimeEntryCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    duplicate_detail = f"A time entry already exists for {entry_data.date.strftime('%Y-%m-%d')}. Please edit the existing entry or choose a different date."
+    try:
+        if await get_entry_by_date(db, current_user.id, entry_data.date):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=duplicate_detail)
+
+        entry = await write_entry(db, sync_crud.create_time_entry, entry_data, user_id=current_user.id)
+        entry.can_edit = can_edit_entry(entry)
+        return entry
+    except HTTPException:
+        raise
+    except ArchivedYearError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=duplicate_detail)
+    except Exception as e:
+        print(f"Error in create_time_entry: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create time entry: {str(e)}"
+        )
+
+@router.put("/by-date/{day}", response_model=TimeEntry)
+@limit_entry_writes
+async def upsert_time_entry_by_date_endpoint(
+    request: Request,
+    day: date,
+    entry_data: TimeEntryDay,
+    response: Response,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        row, created = await write_entry(db, sync_crud.upsert_time_entry_by_date, current_user.id, day, entry_data)
+        return upserted_entry_response(row, created, day, response)
+    except HTTPException:
+        raise
+    except ArchivedYearError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        print(f"Error in upsert_time_entry_by_date: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save time entry: {str(e)}"
+        )
+
+@router.put("/{entry_id}", response_model=TimeEntry)
+@limit_entry_writes
+async def update_time_entry_endpoint(
+    request: Request,
+    entry_id: int,
+    entry_data: TimeEntryUpdate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    duplicate_detail = f"Another time entry already exists for {entry_data.date.strftime('%Y-%m-%d')}. Please choose a different date."
+    try:
+        existing_entry = await get_entry_by_date(db, current_user.id, entry_data.date)
+        if existing_entry and existing_entry.id != entry_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=duplicate_detail)
+
+        entry = await write_entry(db, sync_crud.update_time_entry, entry_id, entry_data, user_id=current_user.id)
+        if not entry:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Time entry not found or cannot be edited (48-hour limit exceeded)"
+            )
+        entry.can_edit = can_edit_entry(entry)
+        return entry
+    except HTTPException:
+        raise
+    except ArchivedYearError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=duplicate_detail)
+    except Exception as e:
+        print(f"Error in update_time_entry: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update time entry: {str(e)}"
+        )
+
+@router.delete("/{entry_id}")
+@limit_entry_writes
+async def delete_time_entry_endpoint(
+    request: Request,
+    entry_id: int,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        entry = await get_time_entry(db, entry_id, current_user.id)
+        if not entry:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Time entry not found")
+
+        if not can_edit_entry(entry):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Time entry cannot be deleted (48-hour limit exceeded)"
+            )
+
+        if not await write_entry(db, sync_crud.delete_time_entry, entry_id, current_user.id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Time entry not found")
+
+        return {"message": "Time entry deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in delete_time_entry: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete time entry: {str(e)}"
+        )
+
+@router.get("/stats")
+async def get_time_stats(
+    request: Request,
+    response: Response,
+    year: Optional[int] = Query(None, description="Filter by year (defaults to current year)"),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        etag = entity_tag(
+            request, current_user.id, year or datetime.now().year,
+            await get_data_version(db, current_user.id), current_user.approved_hours
+        )
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        response.headers.update(cache_headers(etag))
+        total_hours = await get_total_hours(db, user_id=current_user.id, year=year)
+        remaining_hours = current_user.approved_hours - total_hours
+        progress_percentage = (total_hours / current_user.approved_hours) * 100 if current_user.approved_hours > 0 else 0
+
+        return {
+            "total_hours": total_hours,
+            "remaining_hours": remaining_hours,
+            "approved_hours": current_user.approved_hours,
+            "progress_percentage": round(progress_percentage, 1)
+        }
+    except Exception as e:
+        print(f"Error in get_time_stats: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get stats: {str(e)}"
+        )
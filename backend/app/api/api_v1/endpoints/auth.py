@@ -1,15 +1,14 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.crud.user import authenticate_user
+from app.crud.user import get_user_by_email, update_password_hash
 from app.schemas.user import User, UserLogin
-from app.core.security import create_access_token
+from app.core.security import create_access_token, verify_and_update_password, PasswordHasherBusy
 from app.core.config import settings
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from app.core.rate_limit import limiter
 
-limiter = Limiter(key_func=get_remote_address)
 router = APIRouter()
 
 # Remove the register endpoint completely
@@ -26,11 +25,25 @@ router = APIRouter()
 #     user = create_user(db, user_data)
 #     return user
 
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins in progress, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/login")
-@limiter.limit("5/minute")  # Only 5 login attempts per minute
-def login(request: Request, user_data: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_data.email, user_data.password)
-    if not user:
+@limiter.limit(settings.LOGIN_RATE_LIMIT)  # Per client IP, counted across all workers
+async def login(request: Request, user_data: UserLogin, db: Session = Depends(get_db)):
+    # Async so that bcrypt waits on its own pool instead of holding a request thread
+    user = await run_in_threadpool(get_user_by_email, db, user_data.email)
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await verify_and_update_password(user_data.password, user.hashed_password)
+        except PasswordHasherBusy:
+            raise hasher_busy()
+    if not verified:
         # Don't reveal whether email exists or not
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,6 +51,10 @@ def login(request: Request, user_data: UserLogin, db: Session = Depends(get_db))
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made
+        await run_in_threadpool(update_password_hash, db, user, new_hash)
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
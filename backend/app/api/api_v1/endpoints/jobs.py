@@ -0,0 +1,81 @@
+"""Background report jobs: submit, poll progress, download the result"""
+import os
+from datetime import datetime, timezone
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.api.deps import get_current_user
+from app.core.jobs import DONE, job_store
+from app.crud.report_jobs import REPORT_KINDS, get_report_job, report_params, submit_report
+from app.schemas.job import ReportJob, ReportJobCreate
+from app.models.user import User
+
+router = APIRouter()
+
+def _timestamp(value):
+    return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+
+def job_response(request: Request, job: dict) -> dict:
+    return {
+        "id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "error": job["error"],
+        "created_at": _timestamp(job["created_at"]),
+        "started_at": _timestamp(job["started_at"]),
+        "finished_at": _timestamp(job["finished_at"]),
+        "result_url": str(request.url_for("download_report_job", job_id=job["id"])) if job["status"] == DONE else None,
+    }
+
+@router.post("/", response_model=ReportJob, status_code=status.HTTP_202_ACCEPTED)
+def create_report_job(
+    request: Request,
+    response: Response,
+    job_data: ReportJobCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Queue an audit export or a multi-year analytics report; identical unchanged reports come back done"""
+    try:
+        params = report_params(current_user, job_data.kind, job_data.format, job_data.start_year, job_data.end_year)
+        job = submit_report(db, current_user, job_data.kind, params)
+        if job["status"] == DONE:
+            response.status_code = status.HTTP_200_OK
+        return job_response(request, job)
+    except Exception as e:
+        print(f"Error in create_report_job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue report: {str(e)}"
+        )
+
+@router.get("/", response_model=List[ReportJob])
+def read_report_jobs(request: Request, current_user: User = Depends(get_current_user)):
+    return [job_response(request, job) for job in job_store().list_for_user(current_user.id)]
+
+@router.get("/{job_id}", response_model=ReportJob)
+def read_report_job(job_id: str, request: Request, current_user: User = Depends(get_current_user)):
+    job = get_report_job(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job_response(request, job)
+
+@router.get("/{job_id}/result")
+def download_report_job(job_id: str, current_user: User = Depends(get_current_user)):
+    job = job_store().get(job_id, user_id=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    if job["status"] != DONE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is {job['status']}")
+    if not os.path.exists(job["artifact"]):
+        # Superseded by a newer version of the same report, or pruned
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Result no longer available; submit the report again")
+    kind = REPORT_KINDS[job["kind"]]
+    return FileResponse(
+        job["artifact"],
+        media_type=kind.media_type(job["params"]),
+        filename=f"wbso-{current_user.wbso_application_number}-{job['kind']}{kind.extension(job['params'])}",
+    )
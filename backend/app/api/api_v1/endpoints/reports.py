@@ -0,0 +1,26 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.api.deps import get_current_admin
+from app.crud.org_report import get_org_report
+from app.schemas.report import OrgReport
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/organization", response_model=OrgReport)
+def read_org_report(
+    year: Optional[int] = Query(None, description="Report year (defaults to current year)"),
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db)
+):
+    """Approved vs used hours, phase mix and burn forecast for every user (admins only)"""
+    try:
+        return get_org_report(db, year=year)
+    except Exception as e:
+        print(f"Error in read_org_report: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build organization report: {str(e)}"
+        )
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_admin
+from app.db.base import get_pool_stats
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/pool")
+def read_pool_stats(current_user: User = Depends(get_current_admin)):
+    """Connection pool occupancy and checkout wait times, to spot pool starvation (admins only)"""
+    return get_pool_stats()
@@ -1,35 +1,159 @@
+import base64
+import hashlib
+from datetime import date, datetime, timedelta, timezone
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from app.db.base import SessionLocal
 from app.db.session import get_db
+from app.db.archive import ArchivedYearError, ArchiveNotSearchableError, is_archived
+from app.db.write_queue import run_write
 from app.api.deps import get_current_user
 from app.crud.time_entry import (
-    get_time_entries, 
     create_time_entry, 
     update_time_entry, 
     get_time_entry,
     delete_time_entry,
     can_edit_entry,
     get_total_hours,
-    get_entry_by_date
+    get_entry_by_date,
+    get_existing_days,
+    bulk_insert_time_entries,
+    iter_entry_rows,
+    get_time_entry_rows,
+    get_changed_entry_rows,
+    upsert_time_entry_by_date,
+    edit_cutoff
 )
-from app.schemas.time_entry import TimeEntry, TimeEntryCreate, TimeEntryUpdate
+from app.crud.sync import change_token_time, get_data_version, get_list_validator, get_tombstones
+from app.crud.search import search_time_entries
+from app.crud.analytics import get_analytics
+from app.schemas.analytics import Analytics
+from app.schemas.time_entry import TimeEntry, TimeEntryChanges, TimeEntryCreate, TimeEntryDay, TimeEntryUpdate, TimeEntrySearchHit, BulkImportError, BulkImportResult
 from app.models.user import User
+from app.core.config import settings
+from app.core.rate_limit import limit_entry_writes
+from app.core.entry_import import detect_format, iter_records
+from app.core.entry_export import ENCODERS, MEDIA_TYPES
 
 router = APIRouter()
 
+# Fields of the TimeEntry schema, in response order; all are selectable through `fields=`
+ENTRY_FIELDS = [
+    "date", "hours", "project_phase", "activity_description", "technical_challenge",
+    "id", "user_id", "created_at", "updated_at", "can_edit",
+]
+
+def _encode_cursor(entry_date: datetime, entry_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{entry_date.isoformat()}|{entry_id}".encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        entry_date, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(entry_date), int(entry_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def write_entry(db: Session, operation, *args, **kwargs):
+    """Run a crud write on the request's session, or through the group-commit queue when enabled"""
+    if settings.WRITE_QUEUE_ENABLED:
+        return run_write(operation, *args, **kwargs)
+    return operation(db, *args, **kwargs)
+
+def _encode_token(moment: datetime) -> str:
+    return base64.urlsafe_b64encode(moment.isoformat().encode()).decode()
+
+def _decode_token(token: str) -> datetime:
+    try:
+        moment = datetime.fromisoformat(base64.urlsafe_b64decode(token.encode()).decode())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid change token")
+    if moment < datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        # Deletions from before then may have been pruned; only a full sync is safe
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Change token expired; resync without `since`")
+    return moment
+
+def entity_tag(request: Request, *validators) -> str:
+    """Weak ETag over the query string and whatever the response depends on"""
+    key = repr((sorted(request.query_params.multi_items()), validators))
+    return 'W/"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 for a matching If-None-Match (weak comparison), else None"""
+    candidates = {tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")}
+    if etag.removeprefix("W/") in candidates or "*" in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+    return None
+
+def cache_headers(etag: str) -> dict:
+    # Browsers keep the response but revalidate it on every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return ENTRY_FIELDS
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = sorted(set(requested) - set(ENTRY_FIELDS))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(unknown)}"
+        )
+    return requested
+
+def parse_page_request(limit: Optional[int], cursor: Optional[str], fields: Optional[str]):
+    """Validate paging parameters into (requested fields, columns to select, keyset position)"""
+    requested = _parse_fields(fields)
+    # id and date drive the keyset cursor even when not requested
+    columns = requested + [column for column in ("id", "date") if column not in requested]
+    after = _decode_cursor(cursor) if cursor else None
+    return requested, columns, after
+
+def page_response(rows, requested: List[str], limit: Optional[int], headers: Optional[dict] = None) -> ORJSONResponse:
+    """Encode rows (fetched with limit + 1) straight to JSON, with X-Next-Cursor if more remain.
+
+    Rows already carry can_edit and match the TimeEntry schema, so per-row Pydantic
+    validation is skipped.
+    """
+    headers = dict(headers or {})
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _encode_cursor(rows[-1].date, rows[-1].id)
+
+    if rows and len(rows[0]) == len(requested):
+        items = [row._asdict() for row in rows]
+    else:
+        items = [{field: row._mapping[field] for field in requested} for row in rows]
+    return ORJSONResponse(content=items, headers=headers)
+
 @router.get("/", response_model=List[TimeEntry])
 def read_time_entries(
+    request: Request,
     year: Optional[int] = Query(None, description="Filter by year (defaults to current year)"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size; the next page's cursor is returned in X-Next-Cursor"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. date,hours,project_phase"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
-        entries = get_time_entries(db, user_id=current_user.id, year=year)
-        # Add can_edit flag to each entry
-        for entry in entries:
-            entry.can_edit = can_edit_entry(entry)
-        return entries
+        requested, columns, after = parse_page_request(limit, cursor, fields)
+        version, editable = get_list_validator(db, current_user.id, edit_cutoff())
+        etag = entity_tag(request, current_user.id, year or datetime.now().year, version, editable)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        rows = get_time_entry_rows(
+            db, current_user.id, columns, year=year,
+            limit=limit + 1 if limit is not None else None, after=after
+        )
+        return page_response(rows, requested, limit, headers=cache_headers(etag))
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in read_time_entries: {str(e)}")
         raise HTTPException(
@@ -38,7 +162,9 @@ def read_time_entries(
         )
 
 @router.post("/", response_model=TimeEntry)
+@limit_entry_writes
 def create_time_entry_endpoint(
+    request: Request,
     entry_data: TimeEntryCreate,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -52,11 +178,20 @@ def create_time_entry_endpoint(
                 detail=f"A time entry already exists for {entry_data.date.strftime('%Y-%m-%d')}. Please edit the existing entry or choose a different date."
             )
         
-        entry = create_time_entry(db, entry_data, user_id=current_user.id)
+        entry = write_entry(db, create_time_entry, entry_data, user_id=current_user.id)
         entry.can_edit = can_edit_entry(entry)
         return entry
     except HTTPException:
         raise
+    except ArchivedYearError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError:
+        # A concurrent request won the race for this day; the unique index caught it
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A time entry already exists for {entry_data.date.strftime('%Y-%m-%d')}. Please edit the existing entry or choose a different date."
+        )
     except Exception as e:
         print(f"Error in create_time_entry: {str(e)}")
         raise HTTPException(
@@ -64,8 +199,139 @@ def create_time_entry_endpoint(
             detail=f"Failed to create time entry: {str(e)}"
         )
 
+def _import_chunk(db: Session, user_id: int, chunk: list, errors: List[BulkImportError]) -> int:
+    """Insert and commit a chunk in one executemany, skipping days that already exist or are archived.
+
+    Committing per chunk keeps the SQLite write lock for one chunk at a time rather than
+    for as long as the client takes to upload.
+    """
+    existing_days = get_existing_days(db, user_id, (entry.date.date() for _, entry in chunk))
+    new_rows = []
+    for row, entry in chunk:
+        if is_archived(entry.date.year):
+            errors.append(BulkImportError(row=row, error=f"{entry.date.year} is archived and read-only"))
+        elif entry.date.date() in existing_days:
+            errors.append(BulkImportError(row=row, error=f"A time entry already exists for {entry.date.strftime('%Y-%m-%d')}"))
+        else:
+            new_rows.append((row, entry))
+    try:
+        imported = bulk_insert_time_entries(db, [entry for _, entry in new_rows], user_id=user_id)
+        db.commit()
+        return imported
+    except IntegrityError:
+        db.rollback()
+
+    # A concurrent write took some of these days after the check: insert the rows one by one
+    imported = 0
+    for row, entry in new_rows:
+        try:
+            imported += bulk_insert_time_entries(db, [entry], user_id=user_id)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            errors.append(BulkImportError(row=row, error=f"A time entry already exists for {entry.date.strftime('%Y-%m-%d')}"))
+    return imported
+
+@router.post("/bulk", response_model=BulkImportResult)
+@limit_entry_writes
+async def bulk_import_time_entries(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import a CSV (text/csv) or JSON-lines (application/x-ndjson) body of entries.
+
+    Rows are committed in chunks of BULK_IMPORT_CHUNK_SIZE as the upload streams in.
+    Invalid rows and days that already have an entry are skipped and listed in `errors`.
+    """
+    fmt = detect_format(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload entries as text/csv or application/x-ndjson"
+        )
+
+    errors: List[BulkImportError] = []
+    seen_days = set()
+    chunk = []
+    imported = 0
+    try:
+        async for row, record in iter_records(request.stream(), fmt):
+            if isinstance(record, str):
+                errors.append(BulkImportError(row=row, error=record))
+                continue
+            try:
+                entry = TimeEntryCreate(**record)
+            except ValidationError as e:
+                errors.append(BulkImportError(row=row, error="; ".join(
+                    f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                )))
+                continue
+
+            day = entry.date.date()
+            if day in seen_days:
+                errors.append(BulkImportError(row=row, error=f"Duplicate date {day.isoformat()} in upload"))
+                continue
+            seen_days.add(day)
+
+            chunk.append((row, entry))
+            if len(chunk) >= settings.BULK_IMPORT_CHUNK_SIZE:
+                imported += await run_in_threadpool(_import_chunk, db, current_user.id, chunk, errors)
+                chunk = []
+
+        imported += await run_in_threadpool(_import_chunk, db, current_user.id, chunk, errors)
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        print(f"Error in bulk_import_time_entries: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to import time entries after {imported} were imported: {str(e)}"
+        )
+
+    errors.sort(key=lambda error: error.row)
+    return BulkImportResult(imported=imported, failed=len(errors), errors=errors)
+
+def upserted_entry_response(row, created: bool, day: date, response: Response) -> dict:
+    """Shape the RETURNING row of an upsert-by-date as a TimeEntry (201 when it was inserted)"""
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"The time entry for {day.isoformat()} can no longer be edited (48-hour limit exceeded)"
+        )
+    if created:
+        response.status_code = status.HTTP_201_CREATED
+    # Whichever branch ran, the row was written just now and is inside the edit window
+    return {**row._mapping, "can_edit": True}
+
+@router.put("/by-date/{day}", response_model=TimeEntry)
+@limit_entry_writes
+def upsert_time_entry_by_date_endpoint(
+    request: Request,
+    day: date,
+    entry_data: TimeEntryDay,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Create or overwrite the entry for a day (YYYY-MM-DD) in a single statement"""
+    try:
+        row, created = write_entry(db, upsert_time_entry_by_date, current_user.id, day, entry_data)
+        return upserted_entry_response(row, created, day, response)
+    except HTTPException:
+        raise
+    except ArchivedYearError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        print(f"Error in upsert_time_entry_by_date: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to save time entry: {str(e)}"
+        )
+
 @router.put("/{entry_id}", response_model=TimeEntry)
+@limit_entry_writes
 def update_time_entry_endpoint(
+    request: Request,
     entry_id: int,
     entry_data: TimeEntryUpdate,
     current_user: User = Depends(get_current_user),
@@ -80,7 +346,7 @@ def update_time_entry_endpoint(
                 detail=f"Another time entry already exists for {entry_data.date.strftime('%Y-%m-%d')}. Please choose a different date."
             )
         
-        entry = update_time_entry(db, entry_id, entry_data, user_id=current_user.id)
+        entry = write_entry(db, update_time_entry, entry_id, entry_data, user_id=current_user.id)
         if not entry:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -90,6 +356,14 @@ def update_time_entry_endpoint(
         return entry
     except HTTPException:
         raise
+    except ArchivedYearError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Another time entry already exists for {entry_data.date.strftime('%Y-%m-%d')}. Please choose a different date."
+        )
     except Exception as e:
         print(f"Error in update_time_entry: {str(e)}")
         raise HTTPException(
@@ -98,7 +372,9 @@ def update_time_entry_endpoint(
         )
 
 @router.delete("/{entry_id}")
+@limit_entry_writes
 def delete_time_entry_endpoint(
+    request: Request,
     entry_id: int,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -119,7 +395,7 @@ def delete_time_entry_endpoint(
                 detail="Time entry cannot be deleted (48-hour limit exceeded)"
             )
         
-        success = delete_time_entry(db, entry_id, current_user.id)
+        success = write_entry(db, delete_time_entry, entry_id, current_user.id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -136,13 +412,39 @@ def delete_time_entry_endpoint(
             detail=f"Failed to delete time entry: {str(e)}"
         )
 
+@router.get("/analytics", response_model=Analytics)
+def get_time_analytics(
+    year: Optional[int] = Query(None, description="Filter by year (defaults to current year)"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Per-phase, per-week and per-month hours plus a burn-rate projection, aggregated in SQL"""
+    try:
+        return get_analytics(db, current_user, year=year)
+    except Exception as e:
+        print(f"Error in get_time_analytics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get analytics: {str(e)}"
+        )
+
 @router.get("/stats")
 def get_time_stats(
+    request: Request,
+    response: Response,
     year: Optional[int] = Query(None, description="Filter by year (defaults to current year)"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     try:
+        etag = entity_tag(
+            request, current_user.id, year or datetime.now().year,
+            get_data_version(db, current_user.id), current_user.approved_hours
+        )
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        response.headers.update(cache_headers(etag))
         total_hours = get_total_hours(db, user_id=current_user.id, year=year)
         remaining_hours = current_user.approved_hours - total_hours
         progress_percentage = (total_hours / current_user.approved_hours) * 100 if current_user.approved_hours > 0 else 0
@@ -159,3 +461,85 @@ def get_time_stats(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get stats: {str(e)}"
         )
+
+def changes_response(as_of: datetime, since_time: Optional[datetime], rows, deleted) -> ORJSONResponse:
+    return ORJSONResponse(content={
+        "token": _encode_token(as_of),
+        "full": since_time is None,
+        "entries": [row._asdict() for row in rows],
+        "deleted": [{"id": entry_id, "date": day} for entry_id, day in deleted],
+    })
+
+@router.get("/changes", response_model=TimeEntryChanges)
+def read_changes(
+    since: Optional[str] = Query(None, description="`token` from the previous call; omit for a full sync"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Entries created or updated, and ids deleted, since a change token"""
+    try:
+        # Taken before reading so nothing committed meanwhile can fall between two tokens
+        as_of = change_token_time()
+        since_time = _decode_token(since) if since else None
+        rows = get_changed_entry_rows(db, current_user.id, ENTRY_FIELDS, since=since_time)
+        deleted = get_tombstones(db, current_user.id, since_time) if since_time else []
+        return changes_response(as_of, since_time, rows, deleted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in read_changes: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch changes: {str(e)}"
+        )
+
+def _stream_export(user_id: int, start, end, fmt: str):
+    # The stream outlives the request dependencies, so it owns its session
+    db = SessionLocal()
+    try:
+        yield from ENCODERS[fmt](iter_entry_rows(db, user_id, start, end, batch_size=settings.EXPORT_BATCH_SIZE))
+    finally:
+        db.close()
+
+@router.get("/export")
+def export_time_entries(
+    format: str = Query("csv", pattern="^(csv|jsonl)$", description="csv or jsonl"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream every entry in the WBSO project window with per-phase subtotals"""
+    start = current_user.project_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = current_user.project_end_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    filename = f"wbso-{current_user.wbso_application_number}-hours.{format}"
+    return StreamingResponse(
+        _stream_export(current_user.id, start, end, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/search", response_model=List[TimeEntrySearchHit])
+def search_time_entries_endpoint(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to find in activity descriptions and technical challenges"),
+    start: Optional[date] = Query(None, description="Only entries on or after this day"),
+    end: Optional[date] = Query(None, description="Only entries on or before this day"),
+    phase: Optional[str] = Query(None, description="Only entries in this project phase"),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search across the user's entire history, with highlighted snippets"""
+    try:
+        return search_time_entries(
+            db, current_user.id, q,
+            start=datetime.combine(start, datetime.min.time()) if start else None,
+            end=datetime.combine(end + timedelta(days=1), datetime.min.time()) if end else None,
+            project_phase=phase,
+            limit=limit
+        )
+    except ArchiveNotSearchableError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        print(f"Error in search_time_entries: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to search time entries: {str(e)}"
+        )
@@ -1,13 +1,18 @@
-from typing import Generator
+import secrets
+from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
+from app.core.config import settings
 from app.core.security import verify_token
-from app.crud.user import get_user
+from app.crud.user import get_user_cached
+from app.crud import async_user
 from app.models.user import User
 
 security = HTTPBearer()
+metrics_security = HTTPBearer(auto_error=False)
 
 def get_current_user(
     db: Session = Depends(get_db),
@@ -21,7 +26,38 @@ def get_current_user(
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = get_user(db, user_id=int(user_id))
+    user = get_user_cached(db, user_id=int(user_id))
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security)) -> None:
+    """Scrapers authenticate with `Authorization: Bearer <METRICS_TOKEN>`"""
+    if credentials is None or not secrets.compare_digest(credentials.credentials, settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> User:
+    token = credentials.credentials
+    user_id = verify_token(token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user = await async_user.get_user_cached(db, user_id=int(user_id))
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -0,0 +1,152 @@
+"""Maintenance commands for the WBSO Time Tracker backend.
+
+Run from the backend directory, e.g. ``python -m app.cli rollups verify``.
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta, timezone
+from app.db.base import SessionLocal
+from app.db.archive import archive_path, archived_at, archived_years
+from app.crud.archive import archivable, archive_year, years_with_entries
+from app.crud.report_jobs import prune_jobs
+from app.crud.hours_rollup import rebuild_rollups, verify_rollups
+from app.crud.search import rebuild_search_index
+from app.crud.sync import prune_tombstones
+from app.crud.user import get_user_by_email, set_admin
+from app.core.config import settings
+from app.core.static_files import brotli, precompress_directory
+
+def _rollups(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        drift = verify_rollups(db, user_id=args.user_id)
+        for row in drift:
+            print(
+                f"user={row.user_id} {row.year}-{row.month:02d}: "
+                f"stored {row.stored_hours}h/{row.stored_count} entries, "
+                f"actual {row.actual_hours}h/{row.actual_count} entries"
+            )
+        if args.action == "verify":
+            print(f"{len(drift)} rollup row(s) out of sync")
+            return 1 if drift else 0
+
+        written = rebuild_rollups(db, user_id=args.user_id)
+        print(f"Rebuilt {written} rollup row(s), repaired {len(drift)}")
+        return 0
+    finally:
+        db.close()
+
+def _search(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        print(f"Indexed {rebuild_search_index(db)} time entries")
+        return 0
+    finally:
+        db.close()
+
+def _tombstones(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+        print(f"Pruned {prune_tombstones(db, cutoff)} tombstone(s) older than {cutoff:%Y-%m-%d}")
+        return 0
+    finally:
+        db.close()
+
+def _jobs(args: argparse.Namespace) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.JOB_RETENTION_DAYS)
+    counts = prune_jobs(cutoff)
+    print(f"Pruned {counts['jobs']} job(s) finished before {cutoff:%Y-%m-%d} and {counts['artifacts']} unreferenced artifact(s)")
+    return 0
+
+def _users(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        user = get_user_by_email(db, args.email)
+        if user is None:
+            print(f"No user with email {args.email}")
+            return 1
+        set_admin(db, user, not args.revoke)
+        print(f"{user.email} is {'no longer' if args.revoke else 'now'} an admin")
+        return 0
+    finally:
+        db.close()
+
+def _archive(args: argparse.Namespace) -> int:
+    if args.action == "list":
+        for year in archived_years():
+            print(f"{year}: {archive_path(year)} (archived {archived_at(year):%Y-%m-%d %H:%M} UTC)")
+        return 0
+
+    db = SessionLocal()
+    try:
+        if args.year is not None:
+            years = [args.year]
+        else:
+            # Only years with entries: an archive makes its year read-only for good
+            years = [year for year in years_with_entries(db) if archivable(db, year)]
+        for year in years:
+            result = archive_year(db, year, allow_empty=args.allow_empty)
+            print(f"Archived {result.moved} entries of {year} to {archive_path(year)}")
+            if result.remaining:
+                print(f"{result.remaining} entries of {year} were added meanwhile; run again to move them")
+        if not years:
+            print("No closed years left in time_entries")
+        return 0
+    except ValueError as e:
+        print(e)
+        return 1
+    finally:
+        db.close()
+
+def _static(args: argparse.Namespace) -> int:
+    counts = precompress_directory(args.directory, force=args.force)
+    print(f"Wrote {counts['written']} compressed file(s), {counts['skipped']} already up to date")
+    if brotli is None:
+        print("brotli is not installed; only gzip variants were written")
+    return 0
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rollups = commands.add_parser("rollups", help="Verify or rebuild the hours_rollups table")
+    rollups.add_argument("action", choices=["verify", "rebuild"])
+    rollups.add_argument("--user-id", type=int, default=None, help="Limit to a single user")
+    rollups.set_defaults(handler=_rollups)
+
+    search = commands.add_parser("search", help="Rebuild the full-text search index")
+    search.add_argument("action", choices=["rebuild"])
+    search.set_defaults(handler=_search)
+
+    tombstones = commands.add_parser("tombstones", help="Prune delta sync tombstones past SYNC_TOMBSTONE_RETENTION_DAYS")
+    tombstones.add_argument("action", choices=["prune"])
+    tombstones.set_defaults(handler=_tombstones)
+
+    jobs = commands.add_parser("jobs", help="Prune report jobs past JOB_RETENTION_DAYS and their artifacts")
+    jobs.add_argument("action", choices=["prune"])
+    jobs.set_defaults(handler=_jobs)
+
+    users = commands.add_parser("users", help="Grant or revoke admin access (organization reports)")
+    users.add_argument("action", choices=["admin"])
+    users.add_argument("email")
+    users.add_argument("--revoke", action="store_true", help="Remove admin access instead of granting it")
+    users.set_defaults(handler=_users)
+
+    archive = commands.add_parser("archive", help="Move closed years out of time_entries into per-year archive files")
+    archive.add_argument("action", choices=["run", "list"])
+    archive.add_argument("--year", type=int, default=None, help="Archive only this year (default: every closed year with entries)")
+    archive.add_argument("--allow-empty", action="store_true", help="With --year: archive (freeze) a year that has no entries")
+    archive.set_defaults(handler=_archive)
+
+    static = commands.add_parser("static", help="Precompress the React build with gzip and brotli")
+    static.add_argument("action", choices=["compress"])
+    static.add_argument("--directory", default=settings.STATIC_DIR)
+    static.add_argument("--force", action="store_true", help="Recompress files that are already up to date")
+    static.set_defaults(handler=_static)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,47 @@ import secrets
 class Settings(BaseSettings):
     # Database - will use environment variable if available, fallback to SQLite for local dev
     DATABASE_URL: str = "sqlite:///./wbso_tracker.db"
+    # Serve the core API routes from async endpoints on an AsyncSession (aiosqlite/asyncpg). Their reads
+    # are async queries; entry writes still run the sync crud code on the async connection via run_sync
+    ASYNC_DB: bool = False
+    # Startup schema handling: "upgrade" runs pending migrations, "check" refuses to start on an
+    # outdated schema (migrate in a release step instead); an up-to-date schema costs one query
+    DB_STARTUP_MODE: str = "upgrade"
+    # Open the connection pool and load bcrypt/JWT in the background once the app is up
+    STARTUP_PREWARM: bool = True
+    
+    # Group commit: batch concurrent time entry writes into one transaction (see app/db/write_queue.py)
+    WRITE_QUEUE_ENABLED: bool = False
+    WRITE_QUEUE_WINDOW_MS: float = 2.0  # how long the writer waits for more writes to join a batch
+    WRITE_QUEUE_MAX_BATCH: int = 64
+    
+    # Connection pool (ignored for in-memory SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds; -1 keeps connections forever
+    DB_POOL_PRE_PING: bool = True
+    
+    # SQLite tuning, applied to every new connection
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    
+    # Request metrics collected in process; SLOW_REQUEST_MS > 0 logs slower requests with their SQL.
+    # /metrics is only served when METRICS_TOKEN is set, to scrapers sending it as a bearer token
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""
+    SLOW_REQUEST_MS: int = 0
+    
+    # React build served by the API process; precompress with `python -m app.cli static compress`
+    STATIC_DIR: str = "static"
+    
+    # Rate limits, counted in a SQLite file shared by all workers on the host ("memory://" for per-process)
+    RATELIMIT_STORAGE_URI: str = "sqlite:///./ratelimit.db"
+    RATELIMIT_STRATEGY: str = "moving-window"
+    LOGIN_RATE_LIMIT: str = "5/minute"  # per client IP
+    ENTRY_WRITE_RATE_LIMIT: str = "120/minute"  # per user, shared by all time entry writes
     
     # Security - generate secure defaults
     SECRET_KEY: str = secrets.token_urlsafe(64)  # Generate secure random key
@@ -14,8 +55,48 @@ class Settings(BaseSettings):
     # App settings
     PROJECT_NAME: str = "WBSO Time Tracker"
     
+    # Bulk import: rows validated and inserted per batch
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+    
+    # Audit export: rows fetched per server-side cursor batch
+    EXPORT_BATCH_SIZE: int = 1000
+    
+    # Delta sync: tombstones older than this are pruned and older change tokens get a 410
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 90
+    
+    # Analytics breakdowns cached per (user, year, data version), so writes on any worker show up at once
+    ANALYTICS_CACHE_TTL_SECONDS: int = 300
+    ANALYTICS_CACHE_MAX_SIZE: int = 1024
+    
+    # Closed years moved out of time_entries by `python -m app.cli archive run`, one SQLite file
+    # per year; must be persistent storage shared by every instance (required with PostgreSQL)
+    ARCHIVE_DIR: str = "archive"
+    ARCHIVED_TOTALS_CACHE_MAX_SIZE: int = 4096
+    
+    # Background report jobs: job table in a local SQLite file, results cached on disk
+    JOBS_DB_PATH: str = "jobs.db"
+    JOB_ARTIFACT_DIR: str = "artifacts"
+    JOB_WORKERS: int = 2  # report processes per API process
+    JOB_STALE_SECONDS: int = 120  # a running job without progress, or a queued one not started, for this long is requeued
+    JOB_RETENTION_DAYS: int = 7
+    
+    # Organization report: per-user aggregates cached per year, refreshed by data version
+    ORG_REPORT_CACHE_YEARS: int = 4
+    ORG_REPORT_REFRESH_CHUNK: int = 500  # changed users aggregated per IN (...) query
+    
+    # PostgreSQL text search configuration for the full-text index ("simple" suits mixed NL/EN text)
+    SEARCH_TEXT_CONFIG: str = "simple"
+    
     # Security settings
-    BCRYPT_ROUNDS: int = 12  # More secure password hashing
+    BCRYPT_ROUNDS: int = 12  # More secure password hashing; existing hashes are upgraded on login
+    # bcrypt runs on its own bounded thread pool; logins beyond workers + queue get a 503
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 16
+    
+    # Per-process caches on the authentication hot path (0 disables)
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_MAX_SIZE: int = 1024
+    TOKEN_CACHE_MAX_SIZE: int = 4096
     
     class Config:
         env_file = ".env"
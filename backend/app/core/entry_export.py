@@ -0,0 +1,73 @@
+"""Streaming CSV and JSON-lines encoders for the WBSO audit export"""
+import csv
+import io
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List
+
+EXPORT_FIELDS = [
+    "record_type",
+    "id",
+    "date",
+    "hours",
+    "project_phase",
+    "activity_description",
+    "technical_challenge",
+    "created_at",
+    "updated_at",
+    "entry_count",
+]
+
+MEDIA_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+def _records(batches: Iterable[List]) -> Iterator[List[dict]]:
+    """Turn row batches into export records, appending per-phase subtotals and a grand total"""
+    subtotals: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    for batch in batches:
+        records = []
+        for row in batch:
+            totals = subtotals[row.project_phase]
+            totals[0] += row.hours
+            totals[1] += 1
+            records.append({
+                "record_type": "entry",
+                "id": row.id,
+                "date": _isoformat(row.date),
+                "hours": row.hours,
+                "project_phase": row.project_phase,
+                "activity_description": row.activity_description,
+                "technical_challenge": row.technical_challenge,
+                "created_at": _isoformat(row.created_at),
+                "updated_at": _isoformat(row.updated_at),
+            })
+        yield records
+
+    summary = [
+        {"record_type": "subtotal", "project_phase": phase, "hours": hours, "entry_count": count}
+        for phase, (hours, count) in sorted(subtotals.items())
+    ]
+    summary.append({
+        "record_type": "total",
+        "hours": sum(hours for hours, _ in subtotals.values()),
+        "entry_count": sum(count for _, count in subtotals.values()),
+    })
+    yield summary
+
+def encode_csv(batches: Iterable[List]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for records in _records(batches):
+        writer.writerows(records)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def encode_jsonl(batches: Iterable[List]) -> Iterator[str]:
+    for records in _records(batches):
+        yield "".join(json.dumps(record) + "\n" for record in records)
+
+ENCODERS = {"csv": encode_csv, "jsonl": encode_jsonl}
@@ -0,0 +1,83 @@
+"""Incremental parsing of CSV and JSON-lines time entry uploads"""
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple, Union
+
+CSV_COLUMNS = ["date", "hours", "project_phase", "activity_description", "technical_challenge"]
+
+CSV_MEDIA_TYPES = {"text/csv", "application/csv"}
+JSONL_MEDIA_TYPES = {"application/x-ndjson", "application/jsonl", "application/x-jsonlines", "application/json-lines"}
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """Map a Content-Type header to "csv" or "jsonl" (None if unsupported)"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CSV_MEDIA_TYPES:
+        return "csv"
+    if media_type in JSONL_MEDIA_TYPES:
+        return "jsonl"
+    return None
+
+def _normalize(record: dict) -> dict:
+    # Spreadsheets export plain dates; TimeEntryCreate.date expects a datetime
+    value = record.get("date")
+    if isinstance(value, str) and len(value.strip()) == 10:
+        record["date"] = value.strip() + "T00:00:00"
+    return record
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    buffer = b""
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig" if first else "utf-8") + "\n"
+            first = False
+    if buffer:
+        yield buffer.decode("utf-8-sig" if first else "utf-8")
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Union[dict, str]]]:
+    """Yield (record number, dict) per record, or (record number, error message) for unparseable ones.
+
+    Only one record is buffered at a time, so uploads of any size are parsed in constant memory.
+    """
+    if fmt == "jsonl":
+        row = 0
+        async for line in _iter_lines(chunks):
+            if not line.strip():
+                continue
+            row += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield row, f"Invalid JSON: {e}"
+                continue
+            yield row, _normalize(record) if isinstance(record, dict) else "Expected a JSON object"
+        return
+
+    header = None
+    row = 0
+    pending = ""
+    async for line in _iter_lines(chunks):
+        pending += line
+        # A quoted field may span lines; the record is complete once quotes balance
+        if pending.count('"') % 2:
+            continue
+        record, pending = pending, ""
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            missing = [name for name in CSV_COLUMNS if name not in header]
+            if missing:
+                yield 0, f"CSV header is missing column(s): {', '.join(missing)}"
+                return
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, _normalize(dict(zip(header, values)))
+    if pending.strip():
+        yield row + 1, "Unterminated quoted field"
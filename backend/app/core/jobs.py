@@ -0,0 +1,201 @@
+"""Background jobs: a job table in a local SQLite file and a process pool to run them.
+
+The table (JOBS_DB_PATH) is shared by every worker on the host and outlives restarts.
+Pool processes claim a job before running it, so a job queued by several processes runs
+once; jobs left running by a process that died stop sending heartbeats, and jobs queued
+on a pool that went away never start. Both are queued again, at startup or when someone
+polls them (app.crud.report_jobs).
+"""
+import json
+import multiprocessing
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    cache_key TEXT NOT NULL,
+    artifact TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS ix_jobs_user_id_created_at ON jobs (user_id, created_at);
+CREATE INDEX IF NOT EXISTS ix_jobs_cache_key ON jobs (cache_key);
+CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status);
+"""
+
+_ACTIVE_SQL = "SELECT * FROM jobs WHERE cache_key = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1"
+
+class JobStore:
+    """The jobs table; one instance (and SQLite connection) per process"""
+
+    def __init__(self, path: str, busy_timeout: float = 5.0):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._connection.execute(sql, params)
+
+    def _one(self, sql: str, params: tuple) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection.execute(sql, params).fetchone()
+        return _decode(row) if row else None
+
+    def create_unless_active(
+        self, user_id: int, kind: str, params: dict, cache_key: str, artifact: str, status: str = QUEUED
+    ) -> Tuple[Dict, bool]:
+        """(job, created): the queued or running job for `cache_key`, else a new one.
+
+        The lookup and the insert share a write transaction, so processes submitting the
+        same report at once end up with one job.
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                active = self._connection.execute(_ACTIVE_SQL, (cache_key, QUEUED, RUNNING)).fetchone()
+                if active is None:
+                    self._connection.execute(
+                        "INSERT INTO jobs (id, user_id, kind, params, cache_key, artifact, status, progress, created_at, finished_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (job_id, user_id, kind, json.dumps(params, sort_keys=True), cache_key, artifact, status,
+                         1.0 if status == DONE else 0.0, now, now if status == DONE else None),
+                    )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        if active is not None:
+            return _decode(active), False
+        return self.get(job_id), True
+
+    def get(self, job_id: str, user_id: Optional[int] = None) -> Optional[Dict]:
+        if user_id is None:
+            return self._one("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return self._one("SELECT * FROM jobs WHERE id = ? AND user_id = ?", (job_id, user_id))
+
+    def list_for_user(self, user_id: int, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT * FROM jobs WHERE user_id = ? ORDER BY created_at DESC LIMIT ?", (user_id, limit)
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def claim(self, job_id: str) -> bool:
+        now = time.time()
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, now, now, job_id, QUEUED),
+        )
+        return cursor.rowcount == 1
+
+    def progress(self, job_id: str, fraction: float) -> None:
+        self._execute(
+            "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?",
+            (min(max(fraction, 0.0), 1.0), time.time(), job_id),
+        )
+
+    def finish(self, job_id: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, progress = 1, finished_at = ? WHERE id = ?", (DONE, time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?", (FAILED, error, time.time(), job_id)
+        )
+
+    def requeue_if_stale(self, job_id: str, stale_after: float) -> bool:
+        """Queue the job again if it is running without a heartbeat, or has sat queued, for `stale_after` seconds.
+
+        heartbeat_at is set on requeue too, so a job whose pool went away is handed out at
+        most once per `stale_after`.
+        """
+        now = time.time()
+        cursor = self._execute(
+            "UPDATE jobs SET status = ?, progress = 0, heartbeat_at = ? WHERE id = ? AND ("
+            "(status = ? AND heartbeat_at < ?) OR (status = ? AND COALESCE(heartbeat_at, created_at) < ?))",
+            (QUEUED, now, job_id, RUNNING, now - stale_after, QUEUED, now - stale_after),
+        )
+        return cursor.rowcount == 1
+
+    def requeue_stale(self, stale_after: float) -> List[str]:
+        """Requeue running jobs without a heartbeat for `stale_after` seconds; return every queued id"""
+        self._execute(
+            "UPDATE jobs SET status = ?, progress = 0 WHERE status = ? AND heartbeat_at < ?",
+            (QUEUED, RUNNING, time.time() - stale_after),
+        )
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def prune(self, older_than: float) -> int:
+        """Delete finished jobs older than the timestamp `older_than`"""
+        cursor = self._execute(
+            "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (DONE, FAILED, older_than)
+        )
+        return cursor.rowcount
+
+    def artifacts(self) -> set:
+        """Artifact paths still referenced by a job"""
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT artifact FROM jobs").fetchall()
+        return {row["artifact"] for row in rows}
+
+def _decode(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    job["params"] = json.loads(job["params"])
+    return job
+
+_store: Optional[JobStore] = None
+_executor: Optional[ProcessPoolExecutor] = None
+_init_lock = threading.Lock()
+
+def job_store() -> JobStore:
+    global _store
+    if _store is None:
+        with _init_lock:
+            if _store is None:
+                _store = JobStore(settings.JOBS_DB_PATH)
+    return _store
+
+def enqueue(run: Callable[[str], None], job_id: str) -> None:
+    """Run `run(job_id)` on the process pool (started on first use)"""
+    global _executor
+    if _executor is None:
+        with _init_lock:
+            if _executor is None:
+                # spawn: forking a threaded server would copy its locks and pooled connections
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.JOB_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+    _executor.submit(run, job_id)
+
+def shutdown_pool() -> None:
+    """Drop queued work and let running jobs finish; dropped jobs stay queued for the next startup"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,194 @@
+"""In-process request metrics rendered in the Prometheus text exposition format"""
+import bisect
+import contextvars
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds; the usual Prometheus client defaults
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Statements per request; anything past ~20 on these endpoints is an N+1
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (), buckets: Tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._values: Dict[Tuple, List] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = 'le="' + _format_value(float(bound)) + '"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route template and status code", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "End-to-end request latency", ("method", "route")
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements executed per request", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Time spent executing SQL per request", ("method", "route")
+)
+db_queries = Counter(
+    "db_queries_total", "SQL statements executed, including those outside requests", ("engine",)
+)
+write_batch_size = Histogram(
+    "db_write_batch_size", "Operations committed together by the group-commit write queue", (), (1, 2, 4, 8, 16, 32, 64, 128)
+)
+METRICS = (http_requests, http_request_duration, http_request_db_queries, http_request_db_duration, db_queries, write_batch_size)
+
+class RequestStats:
+    """SQL activity of the request being served; shared with the threadpool via contextvars"""
+    __slots__ = ("queries", "db_seconds", "statements")
+
+    def __init__(self, capture_statements: bool = False):
+        self.queries = 0
+        self.db_seconds = 0.0
+        # (seconds, statement) pairs, only collected for the slow-request log
+        self.statements: Optional[List[Tuple[float, str]]] = [] if capture_statements else None
+
+    def record(self, seconds: float, statement: str) -> None:
+        self.queries += 1
+        self.db_seconds += seconds
+        if self.statements is not None:
+            self.statements.append((seconds, statement))
+
+current_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+def _pool_lines(pool_stats: Dict) -> List[str]:
+    gauges = {
+        "in_use": ("db_pool_connections_in_use", "gauge", "Connections currently checked out"),
+        "checkedin": ("db_pool_connections_idle", "gauge", "Idle connections held by the pool"),
+        "overflow": ("db_pool_overflow", "gauge", "Connections opened beyond pool_size"),
+        "checkouts": ("db_pool_checkouts_total", "counter", "Connection checkouts"),
+        "timeouts": ("db_pool_timeouts_total", "counter", "Checkouts that hit pool_timeout"),
+        "wait_seconds_total": ("db_pool_wait_seconds_total", "counter", "Time spent waiting for a connection"),
+    }
+    lines = []
+    for key, (name, kind, documentation) in gauges.items():
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        for engine_name, stats in pool_stats.items():
+            if key in stats:
+                lines.append(f'{name}{{engine="{engine_name}"}} {_format_value(stats[key])}')
+    return lines
+
+def render_metrics(pool_stats: Optional[Dict] = None) -> str:
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    if pool_stats:
+        lines += _pool_lines(pool_stats)
+    return "\n".join(lines) + "\n"
+
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+class RequestMetricsMiddleware:
+    """Plain ASGI middleware (streaming-safe) timing each request and the SQL it runs"""
+
+    def __init__(self, app, slow_request_ms: int = 0):
+        self.app = app
+        self.slow_request_seconds = slow_request_ms / 1000 if slow_request_ms > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(capture_statements=self.slow_request_seconds is not None)
+        token = current_request_stats.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_stats.reset(token)
+            # The router stores the matched route in the scope; templates keep label cardinality bounded
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method, route_label, str(status_code))
+            http_request_duration.observe(elapsed, method, route_label)
+            http_request_db_queries.observe(stats.queries, method, route_label)
+            http_request_db_duration.observe(stats.db_seconds, method, route_label)
+            if self.slow_request_seconds is not None and elapsed >= self.slow_request_seconds:
+                self._log_slow_request(method, scope["path"], route_label, status_code, elapsed, stats)
+
+    @staticmethod
+    def _log_slow_request(method, path, route, status_code, elapsed, stats: RequestStats) -> None:
+        lines = [
+            f"Slow request {method} {path} ({route}) -> {status_code} in {elapsed * 1000:.1f} ms; "
+            f"{stats.queries} queries, {stats.db_seconds * 1000:.1f} ms in SQL"
+        ]
+        for seconds, statement in stats.statements or ():
+            lines.append(f"  [{seconds * 1000:.2f} ms] {' '.join(statement.split())}")
+        slow_request_logger.warning("\n".join(lines))
@@ -0,0 +1,174 @@
+"""Rate limiting shared by every worker on the host.
+
+slowapi's default storage is per-process memory, so N uvicorn workers allow N times the
+limit and forget everything on restart. SQLiteStorage keeps the counters in a local SQLite
+file instead ("sqlite:///path" storage URI): no network service, and each check is one
+short write transaction that other processes serialize behind.
+"""
+import sqlite3
+import threading
+import time
+from typing import Tuple
+from limits.storage import MovingWindowSupport, Storage
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.core.config import settings
+from app.core.security import verify_token
+
+# Expired rows of keys that are never hit again are swept every this many writes
+_SWEEP_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limit_hits (
+    key TEXT NOT NULL,
+    at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_rate_limit_hits_key_at ON rate_limit_hits (key, at);
+CREATE INDEX IF NOT EXISTS ix_rate_limit_hits_expires_at ON rate_limit_hits (expires_at);
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """limits storage on a SQLite file, for the fixed-window and moving-window strategies.
+
+    Moving-window hits are rows in rate_limit_hits; acquiring one runs under BEGIN IMMEDIATE,
+    which takes the database write lock, so the count-then-insert is atomic across processes.
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, busy_timeout: float = 5.0, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        path = uri.split("://", 1)[1]
+        self.path = path[1:] if path.startswith("/") else path or ":memory:"
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._connection = sqlite3.connect(
+            self.path, timeout=float(busy_timeout), isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Losing the last few hits on a power cut is fine for rate limiting
+        self._connection.execute("PRAGMA synchronous=OFF")
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _write(self, work):
+        """Run `work(cursor, now)` in one IMMEDIATE transaction"""
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                result = work(cursor, now)
+                self._writes += 1
+                if self._writes % _SWEEP_EVERY == 0:
+                    cursor.execute("DELETE FROM rate_limit_hits WHERE expires_at <= ?", (now,))
+                    cursor.execute("DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,))
+                cursor.execute("COMMIT")
+                return result
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def _read(self, sql: str, params: tuple):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchone()
+
+    # Fixed window
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        def work(cursor, now):
+            # A window that has run out starts over at `amount`
+            return cursor.execute(
+                "INSERT INTO rate_limit_counters (key, count, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET "
+                "count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END, "
+                "expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at ELSE expires_at END "
+                "RETURNING count",
+                (key, amount, now + expiry, now, now),
+            ).fetchone()[0]
+        return self._write(work)
+
+    def get(self, key: str) -> int:
+        row = self._read(
+            "SELECT count FROM rate_limit_counters WHERE key = ? AND expires_at > ?", (key, time.time())
+        )
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self._read("SELECT expires_at FROM rate_limit_counters WHERE key = ?", (key,))
+        return row[0] if row else time.time()
+
+    # Moving window
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+
+        def work(cursor, now):
+            cursor.execute("DELETE FROM rate_limit_hits WHERE key = ? AND at <= ?", (key, now - expiry))
+            (count,) = cursor.execute("SELECT count(*) FROM rate_limit_hits WHERE key = ?", (key,)).fetchone()
+            if count + amount > limit:
+                return False
+            cursor.executemany(
+                "INSERT INTO rate_limit_hits (key, at, expires_at) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            return True
+        return self._write(work)
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> Tuple[float, int]:
+        now = time.time()
+        oldest, count = self._read(
+            "SELECT min(at), count(*) FROM rate_limit_hits WHERE key = ? AND at > ?", (key, now - expiry)
+        )
+        return (oldest, count) if count else (now, 0)
+
+    # Housekeeping
+
+    def check(self) -> bool:
+        try:
+            self._read("SELECT 1", ())
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        def work(cursor, now):
+            cleared = cursor.execute("DELETE FROM rate_limit_hits").rowcount
+            return cleared + cursor.execute("DELETE FROM rate_limit_counters").rowcount
+        return self._write(work)
+
+    def clear(self, key: str) -> None:
+        def work(cursor, now):
+            cursor.execute("DELETE FROM rate_limit_hits WHERE key = ?", (key,))
+            cursor.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+        self._write(work)
+
+def user_or_ip_key(request) -> str:
+    """Key authenticated requests by token subject so a user's limit follows them across IPs"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        subject = verify_token(token)
+        if subject:
+            return f"user:{subject}"
+    return f"ip:{get_remote_address(request)}"
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy=settings.RATELIMIT_STRATEGY,
+    storage_uri=settings.RATELIMIT_STORAGE_URI,
+)
+
+# All time entry writes by one user draw from a single budget
+limit_entry_writes = limiter.shared_limit(
+    settings.ENTRY_WRITE_RATE_LIMIT, scope="time-entry-writes", key_func=user_or_ip_key
+)
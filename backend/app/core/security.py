@@ -1,12 +1,50 @@
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and jose (with its cryptography backend) are imported on first use, or by
+# warm_up() in the background at startup, rather than on the import path of every worker
+_pwd_context = None
+_init_lock = threading.Lock()
+
+def get_pwd_context():
+    global _pwd_context
+    if _pwd_context is None:
+        with _init_lock:
+            if _pwd_context is None:
+                from passlib.context import CryptContext
+                # Hashes with any other round count are flagged by verify_and_update and rehashed on login
+                _pwd_context = CryptContext(
+                    schemes=["bcrypt"],
+                    deprecated="auto",
+                    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+                    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+                    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+                )
+    return _pwd_context
+
+def warm_up() -> None:
+    """Import the JWT stack and load the bcrypt backend ahead of the first login"""
+    from jose import jwt  # noqa: F401
+    get_pwd_context().handler("bcrypt").get_backend()
+
+class PasswordHasherBusy(Exception):
+    """The password hashing pool and its queue are full"""
+
+# bcrypt releases the GIL, so a small dedicated thread pool keeps it off both the event
+# loop and the shared request threadpool
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
+
+# token -> user id, each entry kept until the token's own expiry
+_token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAX_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -17,17 +55,40 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def run_in_hash_pool(func, *args):
+    """Run a bcrypt call on the dedicated pool, failing fast with PasswordHasherBusy when saturated"""
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHasherBusy()
+    try:
+        future = _hash_executor.submit(func, *args)
+    except BaseException:
+        _hash_slots.release()
+        raise
+    # Free the slot when the work finishes, even if the awaiting request was cancelled
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the hash pool; also returns a new hash when the stored one uses outdated settings"""
+    return await run_in_hash_pool(get_pwd_context().verify_and_update, plain_password, hashed_password)
 
 def verify_token(token: str) -> Optional[str]:
+    user_id = _token_cache.get(token)
+    if user_id is not None:
+        return user_id
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
+        expires_in = payload.get("exp", 0) - datetime.now(timezone.utc).timestamp()
+        _token_cache.set(token, user_id, ttl=expires_in)
         return user_id
     except JWTError:
         return None
@@ -0,0 +1,174 @@
+"""Serving the bundled React build: precompressed variants, long-lived caching of hashed assets, ETag/304"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Iterator, NamedTuple, Optional, Tuple
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, PlainTextResponse, Response
+
+try:
+    import brotli
+except ImportError:  # brotli variants are skipped, gzip still works
+    brotli = None
+
+# Encodings in order of preference, with the suffix of their precompressed file
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".html", ".json", ".map", ".svg", ".txt", ".ico", ".xml", ".webmanifest"}
+# Below this the encoding overhead outweighs the savings
+MIN_COMPRESS_SIZE = 1024
+# Bundler output such as main.3f2a1b9c.js or 453.8ab2d1f0.chunk.css: the name changes with the content
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,}\.")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+class StaticAsset(NamedTuple):
+    path: str
+    stat: os.stat_result
+    media_type: str
+    etag: str
+    cache_control: str
+    # encoding -> (precompressed path, its stat)
+    variants: Dict[str, Tuple[str, os.stat_result]]
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.md5(data, usedforsecurity=False).hexdigest()[:20] + '"'
+
+def _file_etag(path: str) -> str:
+    with open(path, "rb") as handle:
+        return _etag(handle.read())
+
+def _accepted_encodings(headers: Headers) -> set:
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+def _not_modified(headers: Headers, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in headers.get("if-none-match", "").split(",")]
+    return etag in candidates or "*" in candidates
+
+def _iter_files(directory: str) -> Iterator[str]:
+    for root, _, files in os.walk(directory):
+        for name in files:
+            yield os.path.join(root, name)
+
+def _is_variant(path: str) -> bool:
+    return any(path.endswith(suffix) for _, suffix in ENCODINGS)
+
+class PrecompressedStaticFiles:
+    """ASGI app for a build directory, indexed once at startup.
+
+    Serves `<file>.br` / `<file>.gz` written by `precompress_directory` when the client
+    accepts them, marks fingerprinted files immutable and answers If-None-Match with 304.
+    Files added after startup are not served; the build directory is fixed per deploy.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.realpath(directory)
+        self.assets: Dict[str, StaticAsset] = {}
+        for path in _iter_files(self.directory):
+            if _is_variant(path):
+                continue
+            relative = os.path.relpath(path, self.directory).replace(os.sep, "/")
+            variants = {}
+            for encoding, suffix in ENCODINGS:
+                if os.path.exists(path + suffix):
+                    variants[encoding] = (path + suffix, os.stat(path + suffix))
+            self.assets[relative] = StaticAsset(
+                path=path,
+                stat=os.stat(path),
+                media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+                etag=_file_etag(path),
+                cache_control=IMMUTABLE_CACHE_CONTROL if FINGERPRINTED.search(os.path.basename(path)) else REVALIDATE_CACHE_CONTROL,
+                variants=variants,
+            )
+
+    def response(self, relative: str, method: str, headers: Headers) -> Response:
+        asset = self.assets.get(relative)
+        if asset is None or method not in ("GET", "HEAD"):
+            return PlainTextResponse("Not Found", status_code=404)
+
+        response_headers = {"cache-control": asset.cache_control}
+        if asset.variants:
+            response_headers["vary"] = "Accept-Encoding"
+        path, stat, etag = asset.path, asset.stat, asset.etag
+        accepted = _accepted_encodings(headers)
+        for encoding, _ in ENCODINGS:
+            if encoding in asset.variants and encoding in accepted:
+                path, stat = asset.variants[encoding]
+                # Each representation needs its own strong validator
+                etag = f'{asset.etag[:-1]}-{encoding}"'
+                response_headers["content-encoding"] = encoding
+                break
+        response_headers["etag"] = etag
+
+        if _not_modified(headers, etag):
+            response_headers.pop("content-encoding", None)
+            return Response(status_code=304, headers=response_headers)
+        return FileResponse(path, headers=response_headers, media_type=asset.media_type, stat_result=stat, method=method)
+
+    async def __call__(self, scope, receive, send):
+        # Under a Mount the scope path is what remains after the mount prefix
+        response = self.response(scope["path"].lstrip("/"), scope["method"], Headers(scope=scope))
+        await response(scope, receive, send)
+
+class InMemoryIndex:
+    """index.html held in memory with gzip/brotli variants, revalidated on every navigation"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as handle:
+            content = handle.read()
+        self.etag = _etag(content)
+        self.bodies = {None: content, "gzip": gzip.compress(content, 9, mtime=0)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(content, quality=11)
+
+    def response(self, headers: Headers) -> Response:
+        response_headers = {"cache-control": REVALIDATE_CACHE_CONTROL, "vary": "Accept-Encoding"}
+        accepted = _accepted_encodings(headers)
+        encoding = next((name for name, _ in ENCODINGS if name in self.bodies and name in accepted), None)
+        etag = f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+        response_headers["etag"] = etag
+        if _not_modified(headers, etag):
+            return Response(status_code=304, headers=response_headers)
+        if encoding:
+            response_headers["content-encoding"] = encoding
+        return Response(self.bodies[encoding], headers=response_headers, media_type="text/html")
+
+def precompress_directory(directory: str, force: bool = False) -> Dict[str, int]:
+    """Write .gz (and .br when brotli is installed) next to each compressible file.
+
+    Variants newer than their source are left alone unless `force`. Returns counts of
+    written and skipped variants.
+    """
+    counts = {"written": 0, "skipped": 0}
+    encoders = [(".gz", lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        encoders.append((".br", lambda data: brotli.compress(data, quality=11)))
+    for path in _iter_files(directory):
+        if _is_variant(path) or os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        source_stat = os.stat(path)
+        if source_stat.st_size < MIN_COMPRESS_SIZE:
+            continue
+        data: Optional[bytes] = None
+        for suffix, encode in encoders:
+            target = path + suffix
+            if not force and os.path.exists(target) and os.stat(target).st_mtime >= source_stat.st_mtime:
+                counts["skipped"] += 1
+                continue
+            if data is None:
+                with open(path, "rb") as handle:
+                    data = handle.read()
+            compressed = encode(data)
+            if len(compressed) >= len(data):
+                continue
+            with open(target, "wb") as handle:
+                handle.write(compressed)
+            counts["written"] += 1
+    return counts
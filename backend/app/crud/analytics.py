@@ -0,0 +1,136 @@
+"""Grouped hour breakdowns and burn-rate projections for the analytics dashboard"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from sqlalchemy import Date, cast, extract, func, select
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.sync import get_data_version
+from app.crud.time_entry import year_bounds
+from app.db.archive import entries_session
+from app.models.time_entry import TimeEntry
+from typing import Dict, Optional
+
+# (user_id, year, data version) -> breakdowns. Any write bumps the user's data version in the
+# database, so every worker misses on the next read without in-process invalidation; entries
+# for older versions just age out. Burn projections depend on today's date and are not cached.
+_breakdown_cache = TTLCache(maxsize=settings.ANALYTICS_CACHE_MAX_SIZE, ttl=settings.ANALYTICS_CACHE_TTL_SECONDS)
+
+def _week_start(db: Session):
+    """Monday of the ISO week containing TimeEntry.day"""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("week", TimeEntry.day), Date)
+    # SQLite: 'weekday 0' moves forward to Sunday (or stays), then back six days
+    return func.date(TimeEntry.day, "weekday 0", "-6 days", type_=Date)
+
+def get_breakdowns(db: Session, user_id: int, year: int) -> Dict:
+    """Per-phase, per-ISO-week and per-month totals for a year from one GROUP BY query"""
+    # Read before the entries: a write landing in between leaves newer rows under an older
+    # version, which only costs a recompute on the next read
+    cache_key = (user_id, year, get_data_version(db, user_id))
+    cached = _breakdown_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    start, end = year_bounds(year)
+    with entries_session(db, year) as source:
+        week_start = _week_start(source).label("week_start")
+        month = extract("month", TimeEntry.date).label("month")
+        rows = source.execute(
+            select(
+                TimeEntry.project_phase, week_start, month,
+                func.sum(TimeEntry.hours).label("hours"), func.count(TimeEntry.id).label("entries")
+            ).where(
+                TimeEntry.user_id == user_id,
+                TimeEntry.date >= start,
+                TimeEntry.date < end
+            ).group_by(TimeEntry.project_phase, week_start, month)
+        ).all()
+
+    # Each (phase, week, month) group is small; fold it into the three breakdowns
+    phases = defaultdict(lambda: [0.0, 0])
+    weeks = defaultdict(lambda: [0.0, 0])
+    months = defaultdict(lambda: [0.0, 0])
+    for row in rows:
+        for bucket, key in ((phases, row.project_phase), (weeks, row.week_start), (months, int(row.month))):
+            bucket[key][0] += row.hours
+            bucket[key][1] += row.entries
+
+    total_hours = sum(hours for hours, _ in phases.values())
+    breakdowns = {
+        "year": year,
+        "total_hours": total_hours,
+        "entry_count": sum(entries for _, entries in phases.values()),
+        "by_phase": [
+            {
+                "project_phase": phase,
+                "hours": hours,
+                "entries": entries,
+                "share": round(hours / total_hours * 100, 1) if total_hours else 0.0,
+            }
+            for phase, (hours, entries) in sorted(phases.items(), key=lambda item: -item[1][0])
+        ],
+        "by_week": [
+            {
+                "iso_year": week.isocalendar()[0],
+                "iso_week": week.isocalendar()[1],
+                "week_start": week,
+                "hours": hours,
+                "entries": entries,
+            }
+            for week, (hours, entries) in sorted(weeks.items())
+        ],
+        "by_month": [
+            {"month": month_number, "hours": hours, "entries": entries}
+            for month_number, (hours, entries) in sorted(months.items())
+        ],
+    }
+    _breakdown_cache.set(cache_key, breakdowns)
+    return breakdowns
+
+def project_burn(
+    total_hours: float,
+    approved_hours: float,
+    project_start: datetime,
+    project_end: datetime,
+    year: int,
+    today: Optional[date] = None
+) -> Dict:
+    """Extrapolate the year's logging rate to the end of the project window within that year"""
+    window_start = max(project_start.date(), date(year, 1, 1))
+    window_end = min(project_end.date(), date(year, 12, 31))
+    today = min(max(today or date.today(), window_start), window_end) if window_start <= window_end else window_start
+
+    weeks_elapsed = max(((today - window_start).days + 1) / 7, 1 / 7)
+    weeks_remaining = max((window_end - today).days / 7, 0.0)
+    hours_per_week = total_hours / weeks_elapsed
+    projected_total = total_hours + hours_per_week * weeks_remaining
+    remaining_hours = approved_hours - total_hours
+
+    completion_date = None
+    if remaining_hours <= 0:
+        completion_date = today
+    elif hours_per_week > 0:
+        completion_date = today + timedelta(weeks=remaining_hours / hours_per_week)
+
+    return {
+        "window_start": window_start,
+        "window_end": window_end,
+        "weeks_elapsed": round(weeks_elapsed, 1),
+        "weeks_remaining": round(weeks_remaining, 1),
+        "hours_per_week": round(hours_per_week, 2),
+        "required_hours_per_week": round(remaining_hours / weeks_remaining, 2) if weeks_remaining > 0 and remaining_hours > 0 else 0.0,
+        "projected_total_hours": round(projected_total, 1),
+        "projected_over_under": round(projected_total - approved_hours, 1),
+        "projected_completion_date": completion_date,
+    }
+
+def get_analytics(db: Session, user, year: Optional[int] = None) -> Dict:
+    if year is None:
+        year = datetime.now().year
+    breakdowns = get_breakdowns(db, user.id, year)
+    burn = project_burn(
+        breakdowns["total_hours"], user.approved_hours,
+        user.project_start_date, user.project_end_date, year
+    )
+    return {**breakdowns, "approved_hours": user.approved_hours, "burn": burn}
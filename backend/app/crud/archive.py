@@ -0,0 +1,127 @@
+"""Moving closed years out of time_entries into their archive files (see app.db.archive)"""
+import os
+import shutil
+from datetime import datetime, timezone
+from sqlalchemy import delete, extract, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud.search import unindex_time_entries_between
+from app.crud.time_entry import edit_cutoff, year_bounds
+from app.db.archive import archive_info, archive_path, archive_totals, create_archive_engine, create_archive_schema
+from app.models.time_entry import TimeEntry
+from typing import NamedTuple
+
+class ArchiveResult(NamedTuple):
+    year: int
+    moved: int
+    remaining: int  # entries written while the archive was built; run again to move them
+
+def ensure_archive_storage(db: Session) -> None:
+    """Refuse to move rows out of a server database into the default, local ARCHIVE_DIR.
+
+    Archives are files on the API host; next to a SQLite database they share its disk, but
+    a PostgreSQL deployment must point ARCHIVE_DIR at storage that survives redeploys and is
+    shared by every instance, or archived years disappear or differ between instances.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect != "sqlite" and "ARCHIVE_DIR" not in settings.model_fields_set:
+        raise ValueError(
+            f"Refusing to archive out of {dialect}: set ARCHIVE_DIR to a persistent volume "
+            "mounted on every instance first (see the README)"
+        )
+
+def archivable(db: Session, year: int) -> bool:
+    """A year can be archived once it is over and none of its entries can still be edited"""
+    if year >= datetime.now().year:
+        return False
+    start, end = year_bounds(year)
+    editable = db.execute(
+        select(func.count(TimeEntry.id)).where(
+            TimeEntry.date >= start, TimeEntry.date < end, TimeEntry.created_at > edit_cutoff()
+        )
+    ).scalar()
+    return editable == 0
+
+def years_with_entries(db: Session):
+    """Years that still have entries in time_entries, oldest first"""
+    year = extract("year", TimeEntry.date)
+    return [int(value) for value in db.execute(select(year).distinct().order_by(year)).scalars()]
+
+def archive_year(db: Session, year: int, batch_size: int = 5000, allow_empty: bool = False) -> ArchiveResult:
+    """Copy a closed year's entries into its archive file, then delete them from time_entries.
+
+    An existing archive for the year is merged into, so a re-run picks up stragglers. The
+    archive is written under a temporary name and renamed into place before the delete
+    commits: readers switch to the archive while the rows still exist in the main database.
+    Archiving makes the year read-only, so a year without entries (and without an archive)
+    is refused unless `allow_empty` is set.
+    """
+    ensure_archive_storage(db)
+    if not archivable(db, year):
+        raise ValueError(f"{year} is not closed yet: it is the current year or still has editable entries")
+    start, end = year_bounds(year)
+    in_year = (TimeEntry.date >= start, TimeEntry.date < end)
+    if not allow_empty and not os.path.exists(archive_path(year)):
+        if not db.execute(select(func.count(TimeEntry.id)).where(*in_year)).scalar():
+            raise ValueError(f"{year} has no entries; archiving it would only make it read-only")
+
+    path = archive_path(year)
+    staging = path + ".tmp"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path):
+        shutil.copyfile(path, staging)
+    elif os.path.exists(staging):
+        os.remove(staging)
+    archive = create_archive_engine(staging, read_only=False)
+    try:
+        create_archive_schema(archive)
+        unindex_time_entries_between(db, start, end)
+
+        table = TimeEntry.__table__
+        moved, last_id = 0, None
+        with archive.begin() as target:
+            target.exec_driver_sql("PRAGMA synchronous=OFF")
+            result = db.execute(
+                select(table).where(*in_year).order_by(table.c.id),
+                execution_options={"yield_per": batch_size}
+            )
+            for batch in result.partitions():
+                target.execute(insert(table).prefix_with("OR REPLACE"), [row._asdict() for row in batch])
+                moved += len(batch)
+                last_id = batch[-1].id
+
+            # The archive's own search index, rebuilt over everything it holds (older archives included)
+            target.exec_driver_sql("DELETE FROM time_entries_fts")
+            target.exec_driver_sql(
+                "INSERT INTO time_entries_fts (rowid, activity_description, technical_challenge, owner) "
+                "SELECT id, activity_description, technical_challenge, 'u' || user_id FROM time_entries"
+            )
+
+            target.execute(delete(archive_totals))
+            month = extract("month", table.c.date)
+            target.execute(insert(archive_totals).from_select(
+                ["user_id", "month", "hours", "entry_count"],
+                select(table.c.user_id, month, func.sum(table.c.hours), func.count(table.c.id)).group_by(table.c.user_id, month)
+            ))
+            target.execute(delete(archive_info))
+            target.execute(insert(archive_info), [
+                {"key": "year", "value": str(year)},
+                {"key": "archived_at", "value": datetime.now(timezone.utc).isoformat()},
+            ])
+        archive.dispose()
+
+        # Entries of a closed year cannot change, but new ones can still be backdated into it
+        # until the archive is in place; they get higher ids, so only delete what was copied
+        if last_id is not None:
+            db.execute(delete(table).where(*in_year, table.c.id <= last_id))
+        os.replace(staging, path)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        archive.dispose()
+        if os.path.exists(staging):
+            os.remove(staging)
+        raise
+
+    remaining = db.execute(select(func.count(TimeEntry.id)).where(*in_year)).scalar()
+    return ArchiveResult(year, moved, remaining)
@@ -0,0 +1,67 @@
+"""AsyncSession versions of app.crud.time_entry.
+
+Reads are native async queries through aiosqlite/asyncpg, built from the same statements
+as the sync functions. Archived years live in SQLite files behind a sync engine, so
+their reads go to the threadpool instead of blocking the event loop.
+
+Writes are not async: they run the sync crud function on the AsyncSession's connection
+through run_sync (or on the write queue), which keeps the rollup, search index and data
+version bookkeeping in one place. The endpoints call them via write_entry.
+"""
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Select, select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud.hours_rollup import year_hours_query
+from app.crud.sync import data_version_query, list_validator_query
+from app.crud.time_entry import cache_total_hours, get_cached_total_hours, time_entry_rows_query, year_bounds
+from app.crud.time_entry import can_edit_entry, edit_cutoff  # noqa: F401  (pure helpers, no IO)
+from app.db.archive import archive_engine, is_archived
+from app.models.time_entry import TimeEntry
+from typing import Iterable, List, Optional, Tuple
+from datetime import datetime
+
+def _read_archive(year: int, query: Select) -> List[Row]:
+    with archive_engine(year).connect() as connection:
+        return connection.execute(query).all()
+
+async def get_time_entry_rows(
+    db: AsyncSession,
+    user_id: int,
+    columns: Iterable[str],
+    year: Optional[int] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None
+) -> List[Row]:
+    query = time_entry_rows_query(user_id, list(columns), year=year, limit=limit, after=after)
+    start, _ = year_bounds(year)
+    if is_archived(start.year):
+        return await run_in_threadpool(_read_archive, start.year, query)
+    return (await db.execute(query)).all()
+
+async def get_time_entry(db: AsyncSession, entry_id: int, user_id: int) -> Optional[TimeEntry]:
+    result = await db.execute(select(TimeEntry).where(TimeEntry.id == entry_id, TimeEntry.user_id == user_id))
+    return result.scalars().first()
+
+async def get_entry_by_date(db: AsyncSession, user_id: int, date: datetime) -> Optional[TimeEntry]:
+    """Check if an entry already exists for the given date"""
+    target_date = date.date() if isinstance(date, datetime) else date
+    result = await db.execute(select(TimeEntry).where(TimeEntry.user_id == user_id, TimeEntry.day == target_date))
+    return result.scalars().first()
+
+async def get_total_hours(db: AsyncSession, user_id: int, year: Optional[int] = None) -> float:
+    """Get total hours logged by user for a given year (defaults to current year)"""
+    if year is None:
+        year = datetime.now().year
+    hours = get_cached_total_hours(user_id, year)
+    if hours is None:
+        hours = (await db.execute(year_hours_query(user_id, year))).scalar() or 0.0
+        cache_total_hours(user_id, year, hours)
+    return hours
+
+async def get_data_version(db: AsyncSession, user_id: int) -> int:
+    return (await db.execute(data_version_query(user_id))).scalar() or 0
+
+async def get_list_validator(db: AsyncSession, user_id: int, cutoff: datetime) -> Tuple[int, int]:
+    row = (await db.execute(list_validator_query(user_id, cutoff))).one()
+    return row[0] or 0, row[1]
@@ -0,0 +1,28 @@
+"""AsyncSession versions of app.crud.user: native async queries sharing its per-process cache"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.crud import user as user_crud
+from app.models.user import User
+from typing import Optional
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    return (await db.execute(select(User).where(User.id == user_id))).scalars().first()
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+async def update_password_hash(db: AsyncSession, user: User, hashed_password: str) -> User:
+    user.hashed_password = hashed_password
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+async def get_user_cached(db: AsyncSession, user_id: int) -> Optional[User]:
+    """get_user through app.crud.user's cache; the returned row is detached and read-only"""
+    user = user_crud.get_cached_user(user_id)
+    if user is None:
+        user = await get_user(db, user_id)
+        if user is not None:
+            db.expunge(user)
+            user_crud.cache_user(user)
+    return user
@@ -0,0 +1,24 @@
+"""Data version bookkeeping for time entry writes.
+
+Write paths call record_entry_change() inside their transaction. It bumps the user's data
+version in that transaction, once per user however many entries change. Caches derived
+from time entries key on that version (see app.crud.sync.get_data_version), so a write
+on any worker is seen everywhere once it commits.
+"""
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.crud.sync import bump_data_version
+
+_BUMPED_KEY = "bumped_data_versions"
+
+def record_entry_change(db: Session, user_id: int) -> None:
+    bumped = db.info.setdefault(_BUMPED_KEY, set())
+    if user_id not in bumped:
+        bump_data_version(db, user_id)
+        bumped.add(user_id)
+
+# The next transaction on the session bumps again
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset(session: Session) -> None:
+    session.info.pop(_BUMPED_KEY, None)
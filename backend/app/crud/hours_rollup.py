@@ -0,0 +1,122 @@
+from sqlalchemy import Select, delete, extract, func, literal, select
+from sqlalchemy.orm import Session
+from app.db.archive import get_archived_totals
+from app.db.upsert import dialect_insert
+from app.models.hours_rollup import HoursRollup
+from app.models.time_entry import TimeEntry
+from typing import List, NamedTuple, Optional
+from datetime import date, datetime
+
+class RollupDrift(NamedTuple):
+    user_id: int
+    year: int
+    month: int
+    stored_hours: float
+    actual_hours: float
+    stored_count: int
+    actual_count: int
+
+def apply_hours_delta(db: Session, user_id: int, day: date, hours: float, count: int) -> None:
+    """Add `hours`/`count` to the rollup row for the month of `day` (negative values subtract).
+
+    Runs in the caller's transaction so the rollup commits or rolls back with the entry change.
+    """
+    table = HoursRollup.__table__
+    stmt = dialect_insert(db, table).values(
+        user_id=user_id, year=day.year, month=day.month, hours=hours, entry_count=count
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year, table.c.month],
+        set_={
+            "hours": table.c.hours + stmt.excluded.hours,
+            "entry_count": table.c.entry_count + stmt.excluded.entry_count,
+        },
+    )
+    db.execute(stmt)
+
+def refresh_month_rollup(db: Session, user_id: int, day: date) -> None:
+    """Recompute the rollup row for the month of `day` from time_entries in one INSERT ... SELECT.
+
+    For writes that do not know the hours they replaced (such as the by-date upsert).
+    """
+    start = datetime(day.year, day.month, 1)
+    end = datetime(day.year + day.month // 12, day.month % 12 + 1, 1)
+    table = HoursRollup.__table__
+    totals = select(
+        literal(user_id), literal(day.year), literal(day.month),
+        func.coalesce(func.sum(TimeEntry.hours), 0.0), func.count(TimeEntry.id)
+    ).where(
+        TimeEntry.user_id == user_id,
+        TimeEntry.date >= start,
+        TimeEntry.date < end
+    )
+    stmt = dialect_insert(db, table).from_select(
+        ["user_id", "year", "month", "hours", "entry_count"], totals
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.year, table.c.month],
+        set_={"hours": stmt.excluded.hours, "entry_count": stmt.excluded.entry_count},
+    )
+    db.execute(stmt)
+
+def year_hours_query(user_id: int, year: int) -> Select:
+    """Total hours for a year, read from the (user_id, year, month) primary key range"""
+    return select(func.sum(HoursRollup.hours)).where(
+        HoursRollup.user_id == user_id,
+        HoursRollup.year == year
+    )
+
+def get_year_hours(db: Session, user_id: int, year: int) -> float:
+    return db.execute(year_hours_query(user_id, year)).scalar() or 0.0
+
+def _actual_totals(db: Session, user_id: Optional[int] = None):
+    year = extract("year", TimeEntry.date)
+    month = extract("month", TimeEntry.date)
+    query = select(
+        TimeEntry.user_id, year, month, func.sum(TimeEntry.hours), func.count(TimeEntry.id)
+    ).group_by(TimeEntry.user_id, year, month)
+    if user_id is not None:
+        query = query.where(TimeEntry.user_id == user_id)
+    totals = {
+        (row[0], int(row[1]), int(row[2])): (row[3] or 0.0, row[4])
+        for row in db.execute(query)
+    }
+    # Archived years were totalled when they were archived. Entries backdated into a year
+    # while its archive was built stay in time_entries until the next run, so add both
+    for key, (hours, count) in get_archived_totals(user_id).items():
+        live_hours, live_count = totals.get(key, (0.0, 0))
+        totals[key] = (live_hours + hours, live_count + count)
+    return totals
+
+def verify_rollups(db: Session, user_id: Optional[int] = None, tolerance: float = 1e-6) -> List[RollupDrift]:
+    """Compare stored rollups with totals recomputed from time_entries and the archives"""
+    actual = _actual_totals(db, user_id)
+    query = select(HoursRollup)
+    if user_id is not None:
+        query = query.where(HoursRollup.user_id == user_id)
+    stored = {
+        (row.user_id, row.year, row.month): (row.hours, row.entry_count)
+        for row in db.execute(query).scalars()
+    }
+
+    drift = []
+    for key in sorted(set(actual) | set(stored)):
+        stored_hours, stored_count = stored.get(key, (0.0, 0))
+        actual_hours, actual_count = actual.get(key, (0.0, 0))
+        if abs(stored_hours - actual_hours) > tolerance or stored_count != actual_count:
+            drift.append(RollupDrift(*key, stored_hours, actual_hours, stored_count, actual_count))
+    return drift
+
+def rebuild_rollups(db: Session, user_id: Optional[int] = None) -> int:
+    """Recompute rollups from time_entries and the archives, returning the number of rows written"""
+    actual = _actual_totals(db, user_id)
+    stmt = delete(HoursRollup)
+    if user_id is not None:
+        stmt = stmt.where(HoursRollup.user_id == user_id)
+    db.execute(stmt)
+    db.add_all(
+        HoursRollup(user_id=key[0], year=key[1], month=key[2], hours=hours, entry_count=count)
+        for key, (hours, count) in actual.items()
+    )
+    db.commit()
+    return len(actual)
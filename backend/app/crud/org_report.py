@@ -0,0 +1,145 @@
+"""Organization-wide hours report for admins: every user's usage, phase mix and burn forecast.
+
+Per-user aggregates come from one GROUP BY (user_id, project_phase) over the year's
+entries. They are cached per year together with the data version they were computed at;
+on the next request only users whose version moved are aggregated again, so a refresh
+costs one scan of users + user_data_versions plus an indexed query for the changed users.
+"""
+import threading
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.analytics import project_burn
+from app.crud.time_entry import year_bounds
+from app.db.archive import entries_session
+from app.models.time_entry import TimeEntry
+from app.models.user import User
+from app.models.user_data_version import UserDataVersion
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class _YearAggregates:
+    """user_id -> (data version, {phase: [hours, entries]}) for one year"""
+
+    def __init__(self):
+        self.users: Dict[int, Tuple[int, Dict[str, list]]] = {}
+        self.lock = threading.Lock()
+
+# year -> _YearAggregates; entries only go stale by version, the TTL just frees idle years
+_aggregates = TTLCache(maxsize=settings.ORG_REPORT_CACHE_YEARS, ttl=24 * 3600)
+_aggregates_lock = threading.Lock()
+
+def _year_aggregates(year: int) -> _YearAggregates:
+    with _aggregates_lock:
+        aggregates = _aggregates.get(year)
+        if aggregates is None:
+            aggregates = _YearAggregates()
+            _aggregates.set(year, aggregates)
+        return aggregates
+
+def _phase_totals(db: Session, year: int, user_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[str, list]]:
+    """{user_id: {phase: [hours, entries]}} for a year, for all users or just `user_ids`"""
+    start, end = year_bounds(year)
+    query = select(
+        TimeEntry.user_id, TimeEntry.project_phase,
+        func.sum(TimeEntry.hours), func.count(TimeEntry.id)
+    ).where(TimeEntry.date >= start, TimeEntry.date < end)
+    if user_ids is not None:
+        query = query.where(TimeEntry.user_id.in_(list(user_ids)))
+    totals: Dict[int, Dict[str, list]] = defaultdict(dict)
+    with entries_session(db, year) as source:
+        for user_id, phase, hours, entries in source.execute(query.group_by(TimeEntry.user_id, TimeEntry.project_phase)):
+            totals[user_id][phase] = [hours, entries]
+    return totals
+
+def _refresh(db: Session, aggregates: _YearAggregates, year: int, versions: Dict[int, int]) -> None:
+    """Recompute the users whose data version differs from the cached one"""
+    cached = aggregates.users
+    stale = [user_id for user_id, version in versions.items() if cached.get(user_id, (None,))[0] != version]
+    if not stale:
+        return
+    # Versions were read before the entries, so a write landing in between only makes the
+    # stored version older than the data and costs one extra refresh of that user
+    if len(stale) == len(versions):
+        totals = _phase_totals(db, year)
+    else:
+        totals = {}
+        chunk = settings.ORG_REPORT_REFRESH_CHUNK
+        for offset in range(0, len(stale), chunk):
+            totals.update(_phase_totals(db, year, stale[offset:offset + chunk]))
+    for user_id in stale:
+        cached[user_id] = (versions[user_id], totals.get(user_id, {}))
+    for user_id in set(cached) - set(versions):
+        del cached[user_id]
+
+def _user_report(user, phases: Dict[str, list], year: int) -> Dict:
+    total_hours = sum(hours for hours, _ in phases.values())
+    return {
+        "user_id": user.id,
+        "email": user.email,
+        "project_name": user.project_name,
+        "wbso_application_number": user.wbso_application_number,
+        "approved_hours": user.approved_hours,
+        "total_hours": total_hours,
+        "remaining_hours": user.approved_hours - total_hours,
+        "progress_percentage": round(total_hours / user.approved_hours * 100, 1) if user.approved_hours > 0 else 0.0,
+        "entry_count": sum(entries for _, entries in phases.values()),
+        "by_phase": [
+            {
+                "project_phase": phase,
+                "hours": hours,
+                "entries": entries,
+                "share": round(hours / total_hours * 100, 1) if total_hours else 0.0,
+            }
+            for phase, (hours, entries) in sorted(phases.items(), key=lambda item: -item[1][0])
+        ],
+        "burn": project_burn(
+            total_hours, user.approved_hours, user.project_start_date, user.project_end_date, year
+        ),
+    }
+
+def get_org_report(db: Session, year: Optional[int] = None) -> Dict:
+    """Hours against approved hours, phase mix and burn forecast for every user"""
+    if year is None:
+        year = datetime.now().year
+    # User attributes (approved hours, project window) are cheap to read fresh every time
+    users = db.execute(
+        select(
+            User.id, User.email, User.project_name, User.wbso_application_number,
+            User.approved_hours, User.project_start_date, User.project_end_date,
+            func.coalesce(UserDataVersion.version, 0).label("version")
+        ).outerjoin(UserDataVersion, UserDataVersion.user_id == User.id).order_by(User.id)
+    ).all()
+
+    aggregates = _year_aggregates(year)
+    with aggregates.lock:
+        _refresh(db, aggregates, year, {user.id: user.version for user in users})
+        phases_by_user = {user.id: aggregates.users[user.id][1] for user in users}
+
+    reports: List[Dict] = [_user_report(user, phases_by_user[user.id], year) for user in users]
+    phase_totals: Dict[str, list] = defaultdict(lambda: [0.0, 0])
+    for phases in phases_by_user.values():
+        for phase, (hours, entries) in phases.items():
+            phase_totals[phase][0] += hours
+            phase_totals[phase][1] += entries
+    total_hours = sum(report["total_hours"] for report in reports)
+
+    return {
+        "year": year,
+        "user_count": len(reports),
+        "total_hours": total_hours,
+        "approved_hours": sum(report["approved_hours"] for report in reports),
+        "projected_over_count": sum(1 for report in reports if report["burn"]["projected_over_under"] > 0),
+        "by_phase": [
+            {
+                "project_phase": phase,
+                "hours": hours,
+                "entries": entries,
+                "share": round(hours / total_hours * 100, 1) if total_hours else 0.0,
+            }
+            for phase, (hours, entries) in sorted(phase_totals.items(), key=lambda item: -item[1][0])
+        ],
+        "users": reports,
+    }
@@ -0,0 +1,176 @@
+"""Report jobs run in the background (see app.core.jobs): audit exports and multi-year analytics.
+
+Each report's artifact is a file in JOB_ARTIFACT_DIR named after the user, the report
+kind, its parameters and the user's data version at submit time. Submitting a report
+whose file exists finishes at once; any time entry write bumps the data version, so
+the next submit builds a new file and the old one is removed when it is done.
+"""
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.entry_export import ENCODERS, MEDIA_TYPES
+from app.core.jobs import DONE, QUEUED, RUNNING, enqueue, job_store
+from app.crud.analytics import get_analytics
+from app.crud.sync import get_data_version
+from app.crud.time_entry import iter_entry_rows
+from app.crud.user import get_user
+from app.db.base import SessionLocal
+from app.models.hours_rollup import HoursRollup
+from app.schemas.analytics import Analytics
+from typing import Callable, Dict, IO, NamedTuple
+
+class ReportKind(NamedTuple):
+    # build(db, user, params, progress, out) writes the artifact to `out`
+    build: Callable
+    extension: Callable[[dict], str]
+    media_type: Callable[[dict], str]
+
+def _export_window(user):
+    start = user.project_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = user.project_end_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+    return start, end
+
+def _build_export(db: Session, user, params: dict, progress: Callable[[float], None], out: IO) -> None:
+    start, end = _export_window(user)
+    # Rollups give the entry count up front without touching time_entries or the archives
+    total = db.execute(
+        select(func.sum(HoursRollup.entry_count)).where(
+            HoursRollup.user_id == user.id,
+            HoursRollup.year >= start.year,
+            HoursRollup.year <= end.year
+        )
+    ).scalar() or 0
+
+    def counted(batches):
+        written = 0
+        for batch in batches:
+            yield batch
+            written += len(batch)
+            progress(written / total if total else 1.0)
+
+    batches = iter_entry_rows(db, user.id, start, end, batch_size=settings.EXPORT_BATCH_SIZE)
+    for chunk in ENCODERS[params["format"]](counted(batches)):
+        out.write(chunk)
+
+def _build_analytics(db: Session, user, params: dict, progress: Callable[[float], None], out: IO) -> None:
+    years = list(range(params["start_year"], params["end_year"] + 1))
+    results = []
+    for done, year in enumerate(years, start=1):
+        results.append(Analytics.model_validate(get_analytics(db, user, year)).model_dump(mode="json"))
+        progress(done / len(years))
+    json.dump({"years": results}, out)
+
+REPORT_KINDS: Dict[str, ReportKind] = {
+    "export": ReportKind(_build_export, lambda params: f".{params['format']}", lambda params: MEDIA_TYPES[params["format"]]),
+    "analytics": ReportKind(_build_analytics, lambda params: ".json", lambda params: "application/json"),
+}
+
+def report_params(user, kind: str, export_format: str, start_year: int, end_year: int) -> dict:
+    """Everything besides the entries that the report depends on, so it can be part of the cache key"""
+    if kind == "export":
+        start, end = _export_window(user)
+        return {"format": export_format, "start": start.date().isoformat(), "end": end.date().isoformat()}
+    # Burn projections move with the calendar, so analytics artifacts only last the day
+    return {
+        "start_year": start_year, "end_year": end_year,
+        "approved_hours": user.approved_hours, "as_of": date.today().isoformat(),
+        "project_start": user.project_start_date.date().isoformat(),
+        "project_end": user.project_end_date.date().isoformat(),
+    }
+
+def _artifact_path(user_id: int, kind: str, params: dict, version: int) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+    name = f"{user_id}-{kind}-{digest}-v{version}{REPORT_KINDS[kind].extension(params)}"
+    return os.path.join(settings.JOB_ARTIFACT_DIR, name)
+
+def submit_report(db: Session, user, kind: str, params: dict) -> Dict:
+    """Queue a report, or reuse a job that is already building it or its cached artifact"""
+    store = job_store()
+    artifact = _artifact_path(user.id, kind, params, get_data_version(db, user.id))
+    cache_key = os.path.basename(artifact)
+    status = DONE if os.path.exists(artifact) else QUEUED
+    job, created = store.create_unless_active(user.id, kind, params, cache_key, artifact, status=status)
+    if created and job["status"] == QUEUED:
+        enqueue(run_report_job, job["id"])
+    return job
+
+def get_report_job(job_id: str, user_id: int):
+    """The user's job; a job whose worker or pool went away is queued again on this process's pool"""
+    store = job_store()
+    job = store.get(job_id, user_id=user_id)
+    if job is not None and job["status"] in (QUEUED, RUNNING) and store.requeue_if_stale(job_id, settings.JOB_STALE_SECONDS):
+        enqueue(run_report_job, job_id)
+        job = store.get(job_id, user_id=user_id)
+    return job
+
+def resume_jobs() -> int:
+    """Queue jobs left over from a previous run on this process's pool; returns how many"""
+    job_ids = job_store().requeue_stale(settings.JOB_STALE_SECONDS)
+    for job_id in job_ids:
+        enqueue(run_report_job, job_id)
+    return len(job_ids)
+
+def _remove_older_versions(artifact: str) -> None:
+    directory, name = os.path.split(artifact)
+    prefix = name.rsplit("-v", 1)[0] + "-v"
+    for other in os.listdir(directory):
+        if other.startswith(prefix) and other != name and not other.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(directory, other))
+            except FileNotFoundError:
+                pass
+
+def run_report_job(job_id: str) -> None:
+    """Pool entry point: build the job's artifact unless another process already claimed it"""
+    store = job_store()
+    if not store.claim(job_id):
+        return
+    job = store.get(job_id)
+    artifact = job["artifact"]
+    staging = f"{artifact}.{os.getpid()}.tmp"
+    last_report = [0.0]
+
+    def progress(fraction: float) -> None:
+        # Progress doubles as the heartbeat; write it at most once a second
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0:
+            last_report[0] = now
+            store.progress(job_id, fraction)
+
+    db = SessionLocal()
+    try:
+        user = get_user(db, job["user_id"])
+        if user is None:
+            raise ValueError("User not found")
+        os.makedirs(os.path.dirname(artifact) or ".", exist_ok=True)
+        with open(staging, "w", newline="", encoding="utf-8") as out:
+            REPORT_KINDS[job["kind"]].build(db, user, job["params"], progress, out)
+        os.replace(staging, artifact)
+        _remove_older_versions(artifact)
+        store.finish(job_id)
+    except Exception as e:
+        print(f"Error in report job {job_id}: {str(e)}")
+        store.fail(job_id, str(e))
+        if os.path.exists(staging):
+            os.remove(staging)
+    finally:
+        db.close()
+
+def prune_jobs(older_than: datetime) -> Dict[str, int]:
+    """Forget finished jobs older than `older_than` and delete artifacts no job refers to"""
+    store = job_store()
+    pruned = store.prune(older_than.timestamp())
+    referenced = store.artifacts()
+    removed = 0
+    if os.path.isdir(settings.JOB_ARTIFACT_DIR):
+        for name in os.listdir(settings.JOB_ARTIFACT_DIR):
+            path = os.path.join(settings.JOB_ARTIFACT_DIR, name)
+            if path not in referenced and not name.endswith(".tmp"):
+                os.remove(path)
+                removed += 1
+    return {"jobs": pruned, "artifacts": removed}
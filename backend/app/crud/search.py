@@ -0,0 +1,204 @@
+"""Full-text search over activity descriptions and technical challenges.
+
+SQLite uses the FTS5 table time_entries_fts (rowid = entry id), PostgreSQL the tsvector
+table time_entry_search with a GIN index; both are created by migration 0005. The
+time entry write functions keep the index in sync within their own transaction.
+"""
+import re
+from datetime import datetime
+from sqlalchemy import Date, DateTime, Float, Integer, String, bindparam, text
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.archive import archived_years, search_session
+from app.models.time_entry import TimeEntry
+from typing import Iterable, List, Optional
+
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+def _is_postgresql(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _pg_document() -> str:
+    config = f"CAST('{settings.SEARCH_TEXT_CONFIG}' AS regconfig)"
+    return (
+        f"setweight(to_tsvector({config}, activity_description), 'A') || "
+        f"setweight(to_tsvector({config}, technical_challenge), 'B')"
+    )
+
+def index_time_entry(db: Session, entry: TimeEntry) -> None:
+    """Add or refresh one entry in the search index (the entry must have been flushed)"""
+    if _is_postgresql(db):
+        db.execute(text(
+            "INSERT INTO time_entry_search (entry_id, user_id, document) "
+            f"SELECT id, user_id, {_pg_document()} FROM time_entries WHERE id = :id "
+            "ON CONFLICT (entry_id) DO UPDATE SET document = EXCLUDED.document"
+        ), {"id": entry.id})
+        return
+    db.execute(text("DELETE FROM time_entries_fts WHERE rowid = :id"), {"id": entry.id})
+    db.execute(text(
+        "INSERT INTO time_entries_fts (rowid, activity_description, technical_challenge, owner) "
+        "VALUES (:id, :activity_description, :technical_challenge, :owner)"
+    ), {
+        "id": entry.id,
+        "activity_description": entry.activity_description,
+        "technical_challenge": entry.technical_challenge,
+        "owner": f"u{entry.user_id}",
+    })
+
+def index_time_entries_for_days(db: Session, user_id: int, days: Iterable) -> None:
+    """Index a user's freshly inserted entries for the given days in one statement"""
+    days = list(days)
+    if not days:
+        return
+    if _is_postgresql(db):
+        stmt = text(
+            "INSERT INTO time_entry_search (entry_id, user_id, document) "
+            f"SELECT id, user_id, {_pg_document()} FROM time_entries "
+            "WHERE user_id = :user_id AND day IN :days "
+            "ON CONFLICT (entry_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+    else:
+        stmt = text(
+            "INSERT INTO time_entries_fts (rowid, activity_description, technical_challenge, owner) "
+            "SELECT id, activity_description, technical_challenge, 'u' || user_id FROM time_entries "
+            "WHERE user_id = :user_id AND day IN :days"
+        )
+    db.execute(stmt.bindparams(bindparam("days", expanding=True, type_=Date())), {"user_id": user_id, "days": days})
+
+def unindex_time_entry(db: Session, entry_id: int) -> None:
+    if _is_postgresql(db):
+        db.execute(text("DELETE FROM time_entry_search WHERE entry_id = :id"), {"id": entry_id})
+    else:
+        db.execute(text("DELETE FROM time_entries_fts WHERE rowid = :id"), {"id": entry_id})
+
+def unindex_time_entries_between(db: Session, start: datetime, end: datetime) -> None:
+    """Drop every user's entries dated in [start, end) from the index (archival)"""
+    entry_ids = "SELECT id FROM time_entries WHERE date >= :start AND date < :end"
+    if _is_postgresql(db):
+        stmt = text(f"DELETE FROM time_entry_search WHERE entry_id IN ({entry_ids})")
+    else:
+        stmt = text(f"DELETE FROM time_entries_fts WHERE rowid IN ({entry_ids})")
+    db.execute(stmt.bindparams(bindparam("start", type_=DateTime()), bindparam("end", type_=DateTime())), {"start": start, "end": end})
+
+def rebuild_search_index(db: Session) -> int:
+    """Re-index every entry, returning how many were indexed"""
+    if _is_postgresql(db):
+        db.execute(text("DELETE FROM time_entry_search"))
+        db.execute(text(
+            "INSERT INTO time_entry_search (entry_id, user_id, document) "
+            f"SELECT id, user_id, {_pg_document()} FROM time_entries"
+        ))
+    else:
+        db.execute(text("DELETE FROM time_entries_fts"))
+        db.execute(text(
+            "INSERT INTO time_entries_fts (rowid, activity_description, technical_challenge, owner) "
+            "SELECT id, activity_description, technical_challenge, 'u' || user_id FROM time_entries"
+        ))
+    db.commit()
+    return db.execute(text("SELECT COUNT(*) FROM time_entries")).scalar()
+
+def _fts5_query(query: str) -> Optional[str]:
+    # Quote every word so user input can never be parsed as FTS5 syntax; the last
+    # word also matches as a prefix, for search-as-you-type
+    terms = re.findall(r"\w+", query)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    # Only the text columns: unfiltered terms would also match the owner column ("u<id>")
+    return "{activity_description technical_challenge} : (" + " AND ".join(quoted) + ")"
+
+def _typed(stmt, binds):
+    return stmt.bindparams(*binds).columns(
+        id=Integer, date=DateTime, hours=Float, project_phase=String,
+        rank=Float, activity_snippet=String, challenge_snippet=String
+    )
+
+def search_time_entries(
+    db: Session,
+    user_id: int,
+    query: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    project_phase: Optional[str] = None,
+    limit: int = 50
+) -> List[Row]:
+    """Best-ranked entries matching `query`, optionally within [start, end) and one phase.
+
+    Rows carry id, date, hours, project_phase, rank and highlighted activity_snippet /
+    challenge_snippet. Snippets are raw text with HIGHLIGHT_START/END markers, not HTML-escaped.
+    Archived years in range are searched in their archive files (always FTS5, so on PostgreSQL
+    their bm25 ranks are merged with ts_rank ones as they are) and raise
+    ArchiveNotSearchableError if an archive has no search index.
+    """
+    params = {"user_id": user_id, "limit": limit}
+    binds = []
+    filters = ""
+    if start is not None:
+        filters += " AND e.date >= :start"
+        params["start"] = start
+        binds.append(bindparam("start", type_=DateTime()))
+    if end is not None:
+        filters += " AND e.date < :end"
+        params["end"] = end
+        binds.append(bindparam("end", type_=DateTime()))
+    if project_phase is not None:
+        filters += " AND e.project_phase = :phase"
+        params["phase"] = project_phase
+
+    if _is_postgresql(db):
+        rows = _pg_search(db, query, filters, params, binds)
+    else:
+        rows = _fts5_search(db, query, filters, params, binds)
+        if rows is None:
+            return []
+        rows = list(rows)
+
+    # Archived years are searched in their own files; rows moved there left the main index
+    archived = [year for year in archived_years() if _overlaps(year, start, end)]
+    for year in archived:
+        with search_session(db, year) as source:
+            rows += _fts5_search(source, query, filters, params, binds) or []
+    if archived:
+        rows = sorted(rows, key=lambda row: row.date, reverse=True)
+        rows = sorted(rows, key=lambda row: row.rank, reverse=True)[:limit]
+    return rows
+
+def _overlaps(year: int, start: Optional[datetime], end: Optional[datetime]) -> bool:
+    year_start, year_end = datetime(year, 1, 1), datetime(year + 1, 1, 1)
+    return (start is None or start < year_end) and (end is None or end > year_start)
+
+def _pg_search(db: Session, query: str, filters: str, params: dict, binds: list) -> List[Row]:
+    config = f"CAST('{settings.SEARCH_TEXT_CONFIG}' AS regconfig)"
+    options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=24, MinWords=8"
+    params = dict(params, query=query, options=options)
+    stmt = text(
+        "SELECT e.id, e.date, e.hours, e.project_phase, ts_rank(s.document, q) AS rank, "
+        f"ts_headline({config}, e.activity_description, q, :options) AS activity_snippet, "
+        f"ts_headline({config}, e.technical_challenge, q, :options) AS challenge_snippet "
+        f"FROM time_entry_search s JOIN time_entries e ON e.id = s.entry_id, "
+        f"websearch_to_tsquery({config}, :query) q "
+        f"WHERE s.user_id = :user_id AND s.document @@ q{filters} "
+        "ORDER BY rank DESC, e.date DESC LIMIT :limit"
+    )
+    return db.execute(_typed(stmt, binds), params).all()
+
+def _fts5_search(source: Session, query: str, filters: str, params: dict, binds: list) -> Optional[List[Row]]:
+    """The SQLite search query against `source`: the main database or an archive file"""
+    match = _fts5_query(query)
+    if match is None:
+        return None
+    params = dict(params, match=f'owner:"u{params["user_id"]}" AND ({match})', start_sel=HIGHLIGHT_START, end_sel=HIGHLIGHT_END)
+    stmt = text(
+        "SELECT e.id, e.date, e.hours, e.project_phase, "
+        # bm25 is lower-is-better; negate it so both backends rank higher-is-better
+        "-bm25(time_entries_fts, 1.0, 0.5, 0.0) AS rank, "
+        "snippet(time_entries_fts, 0, :start_sel, :end_sel, '…', 16) AS activity_snippet, "
+        "snippet(time_entries_fts, 1, :start_sel, :end_sel, '…', 16) AS challenge_snippet "
+        "FROM time_entries_fts JOIN time_entries e ON e.id = time_entries_fts.rowid "
+        f"WHERE time_entries_fts MATCH :match AND e.user_id = :user_id{filters} "
+        "ORDER BY bm25(time_entries_fts, 1.0, 0.5, 0.0), e.date DESC LIMIT :limit"
+    )
+    return source.execute(_typed(stmt, binds), params).all()
@@ -0,0 +1,69 @@
+"""Bookkeeping behind delta sync and conditional GETs: per-user data versions and tombstones"""
+from sqlalchemy import Select, delete, func, select
+from sqlalchemy.orm import Session
+from app.db.upsert import dialect_insert
+from app.models.time_entry import TimeEntry
+from app.models.time_entry_tombstone import TimeEntryTombstone
+from app.models.user_data_version import UserDataVersion
+from typing import List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+
+# Change tokens trail the clock by this much so rows stamped by transactions that were
+# still open when the token was issued are picked up next time (at the cost of resending)
+CHANGE_TOKEN_OVERLAP = timedelta(seconds=5)
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """Increment the user's data version inside the caller's transaction"""
+    table = UserDataVersion.__table__
+    stmt = dialect_insert(db, table).values(user_id=user_id, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={"version": table.c.version + 1},
+    )
+    db.execute(stmt)
+
+def data_version_query(user_id: int) -> Select:
+    return select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+
+def get_data_version(db: Session, user_id: int) -> int:
+    return db.execute(data_version_query(user_id)).scalar() or 0
+
+def list_validator_query(user_id: int, cutoff: datetime) -> Select:
+    """(data version, number of still-editable entries) in one round trip.
+
+    can_edit flips as entries age past the edit window without any write, which shows up
+    as a drop in the editable count; both lookups are index-only.
+    """
+    editable = select(func.count(TimeEntry.id)).where(
+        TimeEntry.user_id == user_id,
+        TimeEntry.created_at > cutoff
+    ).scalar_subquery()
+    return select(data_version_query(user_id).scalar_subquery(), editable)
+
+def get_list_validator(db: Session, user_id: int, cutoff: datetime) -> Tuple[int, int]:
+    row = db.execute(list_validator_query(user_id, cutoff)).one()
+    return row[0] or 0, row[1]
+
+def change_token_time() -> datetime:
+    return datetime.now(timezone.utc) - CHANGE_TOKEN_OVERLAP
+
+def record_tombstone(db: Session, user_id: int, entry_id: int, day: date) -> None:
+    db.add(TimeEntryTombstone(user_id=user_id, entry_id=entry_id, day=day))
+
+def get_tombstones(db: Session, user_id: int, since: datetime) -> List[Tuple[int, date]]:
+    """(entry_id, day) of entries deleted at or after `since`"""
+    return db.execute(
+        select(TimeEntryTombstone.entry_id, TimeEntryTombstone.day).where(
+            TimeEntryTombstone.user_id == user_id,
+            TimeEntryTombstone.deleted_at >= since
+        ).order_by(TimeEntryTombstone.deleted_at)
+    ).all()
+
+def prune_tombstones(db: Session, older_than: datetime, user_id: Optional[int] = None) -> int:
+    """Drop tombstones older than `older_than`; tokens from before then must resync in full"""
+    stmt = delete(TimeEntryTombstone).where(TimeEntryTombstone.deleted_at < older_than)
+    if user_id is not None:
+        stmt = stmt.where(TimeEntryTombstone.user_id == user_id)
+    deleted = db.execute(stmt).rowcount
+    db.commit()
+    return deleted
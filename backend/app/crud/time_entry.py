@@ -1,40 +1,225 @@
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from sqlalchemy import extract
+from app.crud.hours_rollup import apply_hours_delta, get_year_hours, refresh_month_rollup
+from app.crud.entry_changes import record_entry_change
+from app.crud.search import index_time_entry, index_time_entries_for_days, unindex_time_entry
+from app.crud.sync import record_tombstone
+from app.db.archive import archived_at, archived_years, entries_session, ensure_writable, is_archived
+from app.db.upsert import dialect_insert
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.models.time_entry import TimeEntry
-from app.schemas.time_entry import TimeEntryCreate, TimeEntryUpdate
-from typing import List, Optional
-from datetime import datetime, timedelta, timezone
+from app.schemas.time_entry import TimeEntryCreate, TimeEntryDay, TimeEntryUpdate
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from datetime import date as date_type, datetime, timedelta, timezone
 
-def get_time_entries(db: Session, user_id: int, year: Optional[int] = None) -> List[TimeEntry]:
+# Entries can be edited or deleted for this long after creation
+EDIT_WINDOW = timedelta(hours=48)
+
+def edit_cutoff() -> datetime:
+    """Entries created after this instant are still editable"""
+    return datetime.now(timezone.utc) - EDIT_WINDOW
+
+def year_bounds(year: Optional[int] = None) -> Tuple[datetime, datetime]:
+    """Half-open [start, end) datetime range covering a calendar year (defaults to current year)"""
     if year is None:
         year = datetime.now().year
-    return db.query(TimeEntry).filter(
+    return datetime(year, 1, 1), datetime(year + 1, 1, 1)
+
+# Archived years never change, so their totals are cached until evicted; (user_id, year) -> hours
+_archived_hours = TTLCache(maxsize=settings.ARCHIVED_TOTALS_CACHE_MAX_SIZE, ttl=24 * 3600)
+
+def get_time_entries(db: Session, user_id: int, year: Optional[int] = None) -> List[TimeEntry]:
+    start, end = year_bounds(year)
+    with entries_session(db, start.year) as source:
+        return source.query(TimeEntry).filter(
+            TimeEntry.user_id == user_id,
+            TimeEntry.date >= start,
+            TimeEntry.date < end
+        ).order_by(TimeEntry.date.desc()).all()
+
+EXPORT_COLUMNS = (
+    TimeEntry.id,
+    TimeEntry.date,
+    TimeEntry.hours,
+    TimeEntry.project_phase,
+    TimeEntry.activity_description,
+    TimeEntry.technical_challenge,
+    TimeEntry.created_at,
+    TimeEntry.updated_at,
+)
+
+def _split_by_archive(start: datetime, end: datetime) -> List[Tuple[datetime, datetime, bool]]:
+    """[start, end) cut into consecutive (start, end, archived) ranges at archived year boundaries"""
+    ranges: List[Tuple[datetime, datetime, bool]] = []
+    for year in range(start.year, end.year + 1):
+        year_start, year_end = year_bounds(year)
+        low, high = max(start, year_start), min(end, year_end)
+        if low >= high:
+            continue
+        archived = is_archived(year)
+        if ranges and not archived and not ranges[-1][2]:
+            ranges[-1] = (ranges[-1][0], high, False)
+        else:
+            ranges.append((low, high, archived))
+    return ranges
+
+def iter_entry_rows(db: Session, user_id: int, start: datetime, end: datetime, batch_size: int = 1000) -> Iterator[List[Row]]:
+    """Yield entries in [start, end) oldest first, one batch of plain rows at a time.
+
+    Uses yield_per, which streams through a server-side cursor on PostgreSQL, so only
+    one batch is ever held in memory. Archived years are read from their archive files.
+    """
+    for low, high, _ in _split_by_archive(start, end):
+        with entries_session(db, low.year) as source:
+            result = source.execute(
+                select(*EXPORT_COLUMNS).where(
+                    TimeEntry.user_id == user_id,
+                    TimeEntry.date >= low,
+                    TimeEntry.date < high
+                ).order_by(TimeEntry.date, TimeEntry.id),
+                execution_options={"yield_per": batch_size}
+            )
+            try:
+                for batch in result.partitions():
+                    yield batch
+            finally:
+                result.close()
+
+def _select_columns(columns: Iterable[str], cutoff: datetime) -> list:
+    return [
+        (TimeEntry.created_at > cutoff).label("can_edit") if column == "can_edit" else getattr(TimeEntry, column)
+        for column in columns
+    ]
+
+def time_entry_rows_query(
+    user_id: int,
+    columns: Iterable[str],
+    year: Optional[int] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None
+) -> Select:
+    """The SELECT behind get_time_entry_rows, shared with app.crud.async_time_entry"""
+    start, end = year_bounds(year)
+    query = select(*_select_columns(columns, edit_cutoff())).where(
         TimeEntry.user_id == user_id,
-        extract('year', TimeEntry.date) == year
-    ).order_by(TimeEntry.date.desc()).all()
+        TimeEntry.date >= start,
+        TimeEntry.date < end
+    )
+    if after is not None:
+        after_date, after_id = after
+        query = query.where(
+            TimeEntry.date <= after_date,
+            or_(TimeEntry.date < after_date, and_(TimeEntry.date == after_date, TimeEntry.id < after_id))
+        )
+    query = query.order_by(TimeEntry.date.desc(), TimeEntry.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def get_time_entry_rows(
+    db: Session,
+    user_id: int,
+    columns: Iterable[str],
+    year: Optional[int] = None,
+    limit: Optional[int] = None,
+    after: Optional[Tuple[datetime, int]] = None
+) -> List[Row]:
+    """Newest-first entries for a year as plain rows with only the requested columns.
+
+    The pseudo-column "can_edit" is computed in SQL against a single edit_cutoff() per call.
+    `after` is the (date, id) of the last row of the previous page (keyset pagination).
+    """
+    query = time_entry_rows_query(user_id, columns, year=year, limit=limit, after=after)
+    with entries_session(db, year_bounds(year)[0].year) as source:
+        return source.execute(query).all()
+
+def get_changed_entry_rows(db: Session, user_id: int, columns: Iterable[str], since: Optional[datetime] = None) -> List[Row]:
+    """Entries created or updated at or after `since` (all of the user's entries when None).
+
+    The OR is answered from the (user_id, created_at) and (user_id, updated_at) indexes.
+    Archives are only consulted when `since` predates their archival; entries were last
+    sent from the main table otherwise.
+    """
+    query = select(*_select_columns(columns, edit_cutoff())).where(TimeEntry.user_id == user_id)
+    if since is not None:
+        query = query.where(or_(TimeEntry.created_at >= since, TimeEntry.updated_at >= since))
+    query = query.order_by(TimeEntry.date.desc(), TimeEntry.id.desc())
+    rows = db.execute(query).all()
+    for year in sorted(archived_years(), reverse=True):
+        if since is None or since < archived_at(year):
+            with entries_session(db, year) as source:
+                rows.extend(source.execute(query).all())
+    return rows
 
 def get_time_entry(db: Session, entry_id: int, user_id: int) -> Optional[TimeEntry]:
     return db.query(TimeEntry).filter(TimeEntry.id == entry_id, TimeEntry.user_id == user_id).first()
 
 def get_entry_by_date(db: Session, user_id: int, date: datetime) -> Optional[TimeEntry]:
     """Check if an entry already exists for the given date"""
-    # Extract just the date part (ignore time)
-    target_date = date.date()
-    
-    entries = db.query(TimeEntry).filter(TimeEntry.user_id == user_id).all()
+    # Extract just the date part (ignore time); served by the (user_id, day) unique index
+    target_date = date.date() if isinstance(date, datetime) else date
+    return db.query(TimeEntry).filter(
+        TimeEntry.user_id == user_id,
+        TimeEntry.day == target_date
+    ).first()
+
+def get_existing_days(db: Session, user_id: int, days: Iterable[date_type]) -> Set[date_type]:
+    """Return which of the given calendar days already have an entry (one indexed query)"""
+    days = list(days)
+    if not days:
+        return set()
+    rows = db.query(TimeEntry.day).filter(
+        TimeEntry.user_id == user_id,
+        TimeEntry.day.in_(days)
+    ).all()
+    return {row.day for row in rows}
+
+def bulk_insert_time_entries(db: Session, entries: List[TimeEntryCreate], user_id: int) -> int:
+    """Insert entries as one executemany without committing; the caller owns the transaction.
+
+    Callers must have filtered out days that already exist (see get_existing_days) and
+    days in archived years.
+    """
+    if not entries:
+        return 0
+    rows = []
+    monthly: Dict[Tuple[int, int], List[float]] = {}
     for entry in entries:
-        if entry.date.date() == target_date:
-            return entry
-    return None
+        ensure_writable(entry.date)
+        row = entry.dict()
+        row["user_id"] = user_id
+        row["day"] = entry.date.date()
+        rows.append(row)
+        totals = monthly.setdefault((row["day"].year, row["day"].month), [0.0, 0])
+        totals[0] += entry.hours
+        totals[1] += 1
+
+    db.execute(TimeEntry.__table__.insert(), rows)
+    for (year, month), (hours, count) in monthly.items():
+        apply_hours_delta(db, user_id, date_type(year, month, 1), hours, count)
+    record_entry_change(db, user_id)
+    index_time_entries_for_days(db, user_id, [row["day"] for row in rows])
+    return len(rows)
 
-def create_time_entry(db: Session, entry: TimeEntryCreate, user_id: int) -> TimeEntry:
+# The write functions below take commit=False to leave the commit to the caller, which is
+# how the group-commit write queue (app.db.write_queue) batches them into one transaction.
+
+def create_time_entry(db: Session, entry: TimeEntryCreate, user_id: int, commit: bool = True) -> TimeEntry:
+    ensure_writable(entry.date)
     db_entry = TimeEntry(**entry.dict(), user_id=user_id)
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    db.flush()
+    apply_hours_delta(db, user_id, db_entry.day, db_entry.hours, 1)
+    index_time_entry(db, db_entry)
+    record_entry_change(db, user_id)
+    if commit:
+        db.commit()
+        db.refresh(db_entry)
     return db_entry
 
-def update_time_entry(db: Session, entry_id: int, entry: TimeEntryUpdate, user_id: int) -> Optional[TimeEntry]:
+def update_time_entry(db: Session, entry_id: int, entry: TimeEntryUpdate, user_id: int, commit: bool = True) -> Optional[TimeEntry]:
     db_entry = get_time_entry(db, entry_id, user_id)
     if not db_entry:
         return None
@@ -43,14 +228,54 @@ def update_time_entry(db: Session, entry_id: int, entry: TimeEntryUpdate, user_i
     if not can_edit_entry(db_entry):
         return None
     
+    ensure_writable(entry.date)
+    old_day, old_hours = db_entry.day, db_entry.hours
     for field, value in entry.dict().items():
         setattr(db_entry, field, value)
     
-    db.commit()
-    db.refresh(db_entry)
+    apply_hours_delta(db, user_id, old_day, -old_hours, -1)
+    apply_hours_delta(db, user_id, db_entry.day, db_entry.hours, 1)
+    db.flush()
+    index_time_entry(db, db_entry)
+    record_entry_change(db, user_id)
+    if commit:
+        db.commit()
+        db.refresh(db_entry)
     return db_entry
 
-def delete_time_entry(db: Session, entry_id: int, user_id: int) -> bool:
+def upsert_time_entry_by_date(db: Session, user_id: int, day: date_type, entry: TimeEntryDay, commit: bool = True) -> Tuple[Optional[Row], bool]:
+    """Insert or overwrite the user's entry for `day` in one INSERT ... ON CONFLICT statement.
+
+    The 48-hour edit rule is the DO UPDATE's WHERE clause, so a locked entry is left
+    untouched and nothing is returned. Returns (row or None, created).
+    """
+    ensure_writable(day)
+    table = TimeEntry.__table__
+    values = entry.dict()
+    stmt = dialect_insert(db, table).values(
+        user_id=user_id, date=datetime(day.year, day.month, day.day), day=day, **values
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.day],
+        set_={**{field: stmt.excluded[field] for field in values}, "updated_at": func.now()},
+        where=table.c.created_at > edit_cutoff()
+    ).returning(*table.c)
+    row = db.execute(stmt).first()
+    if row is None:
+        # Nothing was written
+        if commit:
+            db.rollback()
+        return None, False
+
+    refresh_month_rollup(db, user_id, day)
+    index_time_entry(db, row)
+    record_entry_change(db, user_id)
+    if commit:
+        db.commit()
+    # updated_at is only set by the DO UPDATE branch
+    return row, row.updated_at is None
+
+def delete_time_entry(db: Session, entry_id: int, user_id: int, commit: bool = True) -> bool:
     """Delete a time entry if it exists and belongs to the user"""
     db_entry = get_time_entry(db, entry_id, user_id)
     if not db_entry:
@@ -61,7 +286,12 @@ def delete_time_entry(db: Session, entry_id: int, user_id: int) -> bool:
         return False
     
     db.delete(db_entry)
-    db.commit()
+    apply_hours_delta(db, user_id, db_entry.day, -db_entry.hours, -1)
+    unindex_time_entry(db, entry_id)
+    record_tombstone(db, user_id, entry_id, db_entry.day)
+    record_entry_change(db, user_id)
+    if commit:
+        db.commit()
     return True
 
 def can_edit_entry(entry: TimeEntry) -> bool:
@@ -77,19 +307,28 @@ def can_edit_entry(entry: TimeEntry) -> bool:
         else:
             entry_time = entry.created_at
         
-        time_limit = entry_time + timedelta(hours=48)
+        time_limit = entry_time + EDIT_WINDOW
         return now < time_limit
     except Exception as e:
         print(f"Error in can_edit_entry: {e}")
         # If there's any error, default to not editable for safety
         return False
 
+def get_cached_total_hours(user_id: int, year: int) -> Optional[float]:
+    return _archived_hours.get((user_id, year))
+
+def cache_total_hours(user_id: int, year: int, hours: float) -> None:
+    """Keep the year's total if it is archived; other years still change"""
+    if is_archived(year):
+        _archived_hours.set((user_id, year), hours)
+
 def get_total_hours(db: Session, user_id: int, year: Optional[int] = None) -> float:
     """Get total hours logged by user for a given year (defaults to current year)"""
     if year is None:
         year = datetime.now().year
-    result = db.query(TimeEntry).filter(
-        TimeEntry.user_id == user_id,
-        extract('year', TimeEntry.date) == year
-    ).all()
-    return sum(entry.hours for entry in result)
+    hours = get_cached_total_hours(user_id, year)
+    if hours is None:
+        # An archived year's rollups stay in the main database
+        hours = get_year_hours(db, user_id, year)
+        cache_total_hours(user_id, year, hours)
+    return hours
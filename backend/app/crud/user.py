@@ -1,12 +1,55 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 from app.models.user import User
 from app.schemas.user import UserCreate
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
 from typing import Optional
 
+# Detached User rows for get_current_user, keyed by id
+_user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+_CHANGED_KEY = "changed_user_ids"
+
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
+def get_cached_user(user_id: int) -> Optional[User]:
+    return _user_cache.get(user_id)
+
+def cache_user(user: User) -> None:
+    """Cache a row already expunged from its session"""
+    _user_cache.set(user.id, user)
+
+def get_user_cached(db: Session, user_id: int) -> Optional[User]:
+    """get_user through the per-process cache; the returned row is detached and read-only"""
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = get_user(db, user_id)
+        if user is not None:
+            db.expunge(user)
+            cache_user(user)
+    return user
+
+def invalidate_user(user_id: int) -> None:
+    _user_cache.pop(user_id)
+
+# Flushed changes are only dropped from the cache once they commit: dropping them at flush
+# would let a concurrent request cache the old row again until the TTL runs out
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _record_changed_user(mapper, connection, target: User) -> None:
+    object_session(target).info.setdefault(_CHANGED_KEY, set()).add(target.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop(_CHANGED_KEY, ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     return db.query(User).filter(User.email == email).first()
 
@@ -26,6 +69,18 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.refresh(db_user)
     return db_user
 
+def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+    return user
+
+def set_admin(db: Session, user: User, is_admin: bool) -> User:
+    user.is_admin = is_admin
+    db.commit()
+    db.refresh(user)
+    return user
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     user = get_user_by_email(db, email)
     if not user:
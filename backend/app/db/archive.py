@@ -0,0 +1,166 @@
+"""Per-year archive files for closed years' time entries.
+
+An archived year lives in ARCHIVE_DIR/time_entries_<year>.db, a SQLite file with the
+same time_entries table (so the usual queries run against it unchanged), an FTS5 index
+of its entries for /search, the year's monthly totals and a little metadata. A year counts as archived once its file exists:
+`python -m app.cli archive run` writes the file under a temporary name and renames it
+into place before the rows leave the main database, so readers never see a gap.
+Archive files are replaced, never modified in place; readers reopen one whose inode changed.
+"""
+import os
+import re
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, create_engine, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.query_metrics import instrument_engine
+from app.models.time_entry import TimeEntry
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+ARCHIVE_FILE = re.compile(r"^time_entries_(\d{4})\.db$")
+
+archive_metadata = MetaData()
+# Hours per user per month of the archived year, computed once when the year is archived
+archive_totals = Table(
+    "archive_totals", archive_metadata,
+    Column("user_id", Integer, primary_key=True),
+    Column("month", Integer, primary_key=True),
+    Column("hours", Float, nullable=False),
+    Column("entry_count", Integer, nullable=False),
+)
+archive_info = Table(
+    "archive_info", archive_metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+# Same layout as the main database's SQLite index (migration 0005), so app.crud.search
+# runs one query against either
+ARCHIVE_SEARCH_INDEX = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS time_entries_fts USING fts5("
+    "activity_description, technical_challenge, owner, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+class ArchivedYearError(ValueError):
+    """A write targeted a day in an archived (read-only) year"""
+
+    def __init__(self, year: int):
+        super().__init__(f"{year} is archived and read-only")
+        self.year = year
+
+class ArchiveNotSearchableError(ValueError):
+    """The year's archive predates archive search indexes"""
+
+    def __init__(self, year: int):
+        super().__init__(
+            f"The {year} archive has no search index; rebuild it with `python -m app.cli archive run --year {year}`"
+        )
+        self.year = year
+
+class _OpenArchive(NamedTuple):
+    file_key: Tuple[int, int]
+    engine: Engine
+    archived_at: datetime
+    searchable: bool
+
+_open_archives: Dict[int, _OpenArchive] = {}
+_open_lock = threading.Lock()
+
+def archive_path(year: int) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, f"time_entries_{year}.db")
+
+def is_archived(year: int) -> bool:
+    return os.path.exists(archive_path(year))
+
+def archived_years() -> List[int]:
+    if not os.path.isdir(settings.ARCHIVE_DIR):
+        return []
+    return sorted(
+        int(match.group(1))
+        for match in map(ARCHIVE_FILE.match, os.listdir(settings.ARCHIVE_DIR))
+        if match
+    )
+
+def ensure_writable(day: date) -> None:
+    """Raise ArchivedYearError if `day` falls in an archived year"""
+    if is_archived(day.year):
+        raise ArchivedYearError(day.year)
+
+def create_archive_engine(path: str, read_only: bool = True) -> Engine:
+    if read_only:
+        return create_engine(f"sqlite:///file:{path}?mode=ro&uri=true")
+    return create_engine(f"sqlite:///{path}")
+
+def _open(year: int) -> Optional[_OpenArchive]:
+    try:
+        stat = os.stat(archive_path(year))
+    except FileNotFoundError:
+        return None
+    file_key = (stat.st_ino, stat.st_mtime_ns)
+    with _open_lock:
+        current = _open_archives.get(year)
+        if current is not None and current.file_key == file_key:
+            return current
+        if current is not None:
+            current.engine.dispose()
+        engine = create_archive_engine(archive_path(year))
+        instrument_engine(engine, "archive")
+        with engine.connect() as connection:
+            archived_at = connection.execute(
+                select(archive_info.c.value).where(archive_info.c.key == "archived_at")
+            ).scalar_one()
+            searchable = inspect(connection).has_table("time_entries_fts")
+        current = _OpenArchive(file_key, engine, datetime.fromisoformat(archived_at), searchable)
+        _open_archives[year] = current
+        return current
+
+def archive_engine(year: int) -> Optional[Engine]:
+    """Read-only engine on the year's archive, or None if the year is not archived"""
+    opened = _open(year)
+    return opened.engine if opened is not None else None
+
+def archived_at(year: int) -> Optional[datetime]:
+    opened = _open(year)
+    return opened.archived_at if opened is not None else None
+
+def search_session(db: Session, year: int) -> Iterator[Session]:
+    """entries_session for an archived year, checking that its archive has a search index"""
+    opened = _open(year)
+    if opened is not None and not opened.searchable:
+        raise ArchiveNotSearchableError(year)
+    return entries_session(db, year)
+
+@contextmanager
+def entries_session(db: Session, year: int) -> Iterator[Session]:
+    """Session to read `year`'s time entries from: its archive if archived, otherwise `db`"""
+    engine = archive_engine(year)
+    if engine is None:
+        yield db
+        return
+    source = Session(bind=engine)
+    try:
+        yield source
+    finally:
+        source.close()
+
+def get_archived_totals(user_id: Optional[int] = None) -> Dict[Tuple[int, int, int], Tuple[float, int]]:
+    """(user_id, year, month) -> (hours, entry_count) across all archives"""
+    totals = {}
+    for year in archived_years():
+        query = select(archive_totals)
+        if user_id is not None:
+            query = query.where(archive_totals.c.user_id == user_id)
+        with archive_engine(year).connect() as connection:
+            for row in connection.execute(query):
+                totals[(row.user_id, year, row.month)] = (row.hours, row.entry_count)
+    return totals
+
+def create_archive_schema(engine: Engine) -> None:
+    TimeEntry.__table__.create(engine, checkfirst=True)
+    archive_metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(ARCHIVE_SEARCH_INDEX)
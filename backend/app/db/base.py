@@ -1,14 +1,160 @@
-from sqlalchemy import create_engine
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.db.pool_metrics import async_pool_metrics, sync_pool_metrics, timed_pool_class
+from app.db.query_metrics import instrument_engine
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _pool_kwargs(url: str, pool_class, metrics) -> dict:
+    # In-memory SQLite uses a per-thread singleton pool that takes none of these
+    if _is_sqlite(url) and make_url(url).database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": timed_pool_class(pool_class, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    finally:
+        cursor.close()
 
 # SQLite-specific connection args
 connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
+if _is_sqlite(settings.DATABASE_URL):
     connect_args = {"check_same_thread": False}
 
-engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Created on first use instead of at import, so importing the app (uvicorn workers, the CLI,
+# migrations/env.py) loads no dialect and sets up no pool
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = create_engine(
+                    settings.DATABASE_URL,
+                    connect_args=connect_args,
+                    **_pool_kwargs(settings.DATABASE_URL, QueuePool, sync_pool_metrics)
+                )
+                if _is_sqlite(settings.DATABASE_URL):
+                    event.listen(engine, "connect", _apply_sqlite_pragmas)
+                instrument_engine(engine, "sync")
+                _engine = engine
+    return _engine
+
+class _AppSession(Session):
+    """Session bound to the app engine unless given another bind"""
+
+    def __init__(self, bind=None, **kwargs):
+        super().__init__(bind=bind if bind is not None else get_engine(), **kwargs)
+
+SessionLocal = sessionmaker(class_=_AppSession, autocommit=False, autoflush=False)
+
+def prewarm_pool() -> int:
+    """Open the pool's idle connections ahead of the first requests; returns how many were opened"""
+    engine = get_engine()
+    size = engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+def create_writer_engine():
+    """Single-connection engine for the group-commit writer (app.db.write_queue).
+
+    Requests hold their pool connection while they wait on the writer, so sharing the
+    request pool would let a burst of writers starve it.
+    """
+    writer = create_engine(
+        settings.DATABASE_URL,
+        connect_args=connect_args,
+        pool_size=1,
+        max_overflow=0,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if _is_sqlite(settings.DATABASE_URL):
+        event.listen(writer, "connect", _apply_sqlite_pragmas)
+    instrument_engine(writer, "writer")
+    return writer
 
 Base = declarative_base()
+
+# Async engine, created on first use so the async drivers are only needed when ASYNC_DB is on
+_async_engine = None
+_async_session_factory = None
+
+def get_async_database_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto its async driver (aiosqlite / asyncpg)"""
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    if scheme in ("postgres", "postgresql") or scheme.startswith("postgresql+"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine
+        _async_engine = create_async_engine(
+            get_async_database_url(settings.DATABASE_URL),
+            **_pool_kwargs(settings.DATABASE_URL, AsyncAdaptedQueuePool, async_pool_metrics)
+        )
+        if _is_sqlite(settings.DATABASE_URL):
+            event.listen(_async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        instrument_engine(_async_engine.sync_engine, "async")
+    return _async_engine
+
+def get_async_session_factory():
+    global _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        # Objects stay loaded after commit so endpoints can serialize them without lazy IO
+        _async_session_factory = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _async_session_factory
+
+async def prewarm_async_pool() -> int:
+    """prewarm_pool for the async engine; runs on the server's event loop, which its connections belong to"""
+    engine = get_async_engine()
+    pool = engine.sync_engine.pool
+    size = pool.size() if isinstance(pool, AsyncAdaptedQueuePool) else 1
+    connections = []
+    try:
+        for _ in range(size):
+            connections.append(await engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+    return len(connections)
+
+def get_pool_stats() -> dict:
+    """Pool occupancy and checkout wait statistics for the sync and (if started) async engines"""
+    stats = {"sync": sync_pool_metrics.snapshot(get_engine().pool)}
+    if _async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot(_async_engine.sync_engine.pool)
+    return stats
@@ -1,6 +1,86 @@
-from app.db.base import Base, engine
-from app.models import User, TimeEntry
+import ast
+import os
+from sqlalchemy import inspect, text
+from app.core.config import settings
+from app.db.base import get_engine
+from typing import Optional
 
-def init_db() -> None:
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+VERSIONS_DIR = os.path.join(BACKEND_DIR, "migrations", "versions")
+
+# Revision matching the schema that Base.metadata.create_all produced before migrations existed
+LEGACY_REVISION = "0001"
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the migrations' head and DB_STARTUP_MODE forbids upgrading it"""
+
+def get_alembic_config():
+    from alembic.config import Config
+    return Config(ALEMBIC_INI)
+
+def _revision_ids(path: str):
+    """(revision, down_revisions) from a migration file's module-level assignments"""
+    with open(path, encoding="utf-8") as source:
+        tree = ast.parse(source.read(), path)
+    values = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("revision", "down_revision"):
+                values[node.targets[0].id] = ast.literal_eval(node.value)
+    down = values.get("down_revision")
+    if down is None:
+        down = ()
+    elif isinstance(down, str):
+        down = (down,)
+    return values.get("revision"), tuple(down)
+
+def script_heads() -> set:
+    """Head revisions of the migration scripts, read without loading Alembic"""
+    revisions, parents = set(), set()
+    for name in os.listdir(VERSIONS_DIR):
+        if name.endswith(".py") and not name.startswith("_"):
+            revision, down = _revision_ids(os.path.join(VERSIONS_DIR, name))
+            if revision is not None:
+                revisions.add(revision)
+                parents.update(down)
+    return revisions - parents
+
+def database_revisions(connection) -> set:
+    """Revisions stamped in alembic_version; empty if the table does not exist"""
+    if not inspect(connection).has_table("alembic_version"):
+        return set()
+    return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+
+def _upgrade(connection) -> None:
+    # Alembic and the migration modules are only imported when there is something to do
+    from alembic import command
+    config = get_alembic_config()
+    config.attributes["connection"] = connection
+    tables = set(inspect(connection).get_table_names())
+    if "time_entries" in tables and "alembic_version" not in tables:
+        # Database created by create_all: adopt it at the matching revision
+        command.stamp(config, LEGACY_REVISION)
+    command.upgrade(config, "head")
+
+def init_db(mode: Optional[str] = None) -> None:
+    """Make sure the schema is at the migrations' head.
+
+    "upgrade" (the default) runs the pending migrations; "check" raises SchemaOutOfDate
+    instead, for deployments that migrate in a separate release step. Either way a
+    database that is already up to date costs one query, not an Alembic run.
+    """
+    mode = mode or settings.DB_STARTUP_MODE
+    if mode not in ("upgrade", "check"):
+        raise ValueError(f"Unknown DB_STARTUP_MODE {mode!r}: expected 'upgrade' or 'check'")
+    heads = script_heads()
+    with get_engine().begin() as connection:
+        current = database_revisions(connection)
+        if current == heads:
+            return
+        if mode == "check":
+            raise SchemaOutOfDate(
+                f"Database is at {sorted(current) or 'no revision'}, migrations are at {sorted(heads)}; "
+                "run `alembic upgrade head` from the backend directory"
+            )
+        _upgrade(connection)
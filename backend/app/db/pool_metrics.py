@@ -0,0 +1,61 @@
+import threading
+import time
+from typing import Dict
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+class PoolMetrics:
+    """Checkout wait times and timeouts for one engine's pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict:
+        with self._lock:
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            }
+        # QueuePool exposes live occupancy; other pool classes only have status()
+        for name in ("size", "checkedout", "overflow", "checkedin"):
+            if hasattr(pool, name):
+                stats["in_use" if name == "checkedout" else name] = getattr(pool, name)()
+        stats["status"] = pool.status()
+        return stats
+
+def timed_pool_class(base, metrics: PoolMetrics):
+    """Subclass `base` so every checkout records how long it waited for a connection"""
+
+    class TimedPool(base):
+        def _do_get(self):
+            started = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_timeout()
+                raise
+            metrics.record_wait(time.perf_counter() - started)
+            return connection
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+sync_pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
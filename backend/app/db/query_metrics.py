@@ -0,0 +1,26 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.metrics import current_request_stats, db_queries
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Count every statement `engine` runs and attribute its time to the current request"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        db_queries.inc(name)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.record(time.perf_counter() - started, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(exception_context):
+        # after_cursor_execute never fires for a failed statement
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
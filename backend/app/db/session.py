@@ -1,5 +1,5 @@
-from typing import Generator
-from app.db.base import SessionLocal
+from typing import AsyncGenerator, Generator
+from app.db.base import SessionLocal, get_async_session_factory
 
 def get_db() -> Generator:
     try:
@@ -7,3 +7,7 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+async def get_async_db() -> AsyncGenerator:
+    async with get_async_session_factory()() as db:
+        yield db
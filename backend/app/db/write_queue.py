@@ -0,0 +1,139 @@
+"""Group commit: many requests' writes share one transaction (WRITE_QUEUE_ENABLED).
+
+On SQLite every commit takes the single writer lock and syncs the WAL, so concurrent
+writers queue up behind each other's commits. With the queue on, endpoints hand their
+write to one writer thread instead. It collects whatever arrives within
+WRITE_QUEUE_WINDOW_MS (up to WRITE_QUEUE_MAX_BATCH operations), runs them in one session
+and commits once, then resolves each request's future with its own result.
+
+Operations are the crud write functions called with commit=False. If one of them raises,
+the batch is rolled back and every operation is retried in a transaction of its own, so a
+failure (say, a duplicate day) only reaches the request that caused it. SAVEPOINTs would
+avoid the retry, but under pysqlite's implicit transactions releasing the first savepoint
+commits the whole batch.
+"""
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, NamedTuple, Optional
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import write_batch_size
+from app.db.base import create_writer_engine
+
+class _Write(NamedTuple):
+    operation: Callable
+    args: tuple
+    kwargs: dict
+    future: Future
+
+_STOP = object()
+
+class WriteQueue:
+    def __init__(self, session_factory: Callable[[], Session], window_seconds: float, max_batch: int):
+        self._session_factory = session_factory
+        self._window = window_seconds
+        self._max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, operation: Callable, *args, **kwargs) -> Future:
+        """Queue `operation(db, *args, commit=False, **kwargs)`; the future holds its return value"""
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                    self._thread.start()
+        future: Future = Future()
+        self._queue.put(_Write(operation, args, kwargs, future))
+        return future
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Finish the queued writes and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            stopping = False
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit_batch([item for item in batch if item.future.set_running_or_notify_cancel()])
+            if stopping:
+                return
+
+    def _commit_batch(self, batch: List[_Write]) -> None:
+        if not batch:
+            return
+        write_batch_size.observe(len(batch))
+        db = self._session_factory()
+        try:
+            results = [item.operation(db, *item.args, commit=False, **item.kwargs) for item in batch]
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            db.close()
+            if len(batch) == 1:
+                batch[0].future.set_exception(exc)
+            else:
+                # Find the offender(s) by giving every operation its own transaction
+                self._commit_each(batch)
+            return
+        db.close()
+        for item, result in zip(batch, results):
+            item.future.set_result(result)
+
+    def _commit_each(self, batch: List[_Write]) -> None:
+        for item in batch:
+            db = self._session_factory()
+            try:
+                result = item.operation(db, *item.args, commit=False, **item.kwargs)
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                item.future.set_exception(exc)
+            else:
+                item.future.set_result(result)
+            finally:
+                db.close()
+
+_writer_sessions = None
+
+def _writer_session() -> Session:
+    # Only the writer thread calls this; the engine is created with the first write
+    global _writer_sessions
+    if _writer_sessions is None:
+        # Results are handed to other threads after the session closes, so keep them loaded
+        _writer_sessions = sessionmaker(bind=create_writer_engine(), autoflush=False, expire_on_commit=False)
+    return _writer_sessions()
+
+write_queue = WriteQueue(
+    _writer_session,
+    window_seconds=settings.WRITE_QUEUE_WINDOW_MS / 1000,
+    max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+)
+
+def run_write(operation: Callable, *args, **kwargs) -> Any:
+    """Run a write through the queue and wait for it (sync endpoints, in the threadpool)"""
+    return write_queue.submit(operation, *args, **kwargs).result()
+
+async def run_write_async(operation: Callable, *args, **kwargs) -> Any:
+    """Await a queued write without holding a thread"""
+    return await asyncio.wrap_future(write_queue.submit(operation, *args, **kwargs))
@@ -1,11 +1,23 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.db.init_db import init_db
 from app.api.api_v1.api import api_router
+from app.api.deps import require_metrics_token
+from app.core.static_files import InMemoryIndex, PrecompressedStaticFiles
+from app.core.metrics import RequestMetricsMiddleware, render_metrics
+from app.core.rate_limit import limiter
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from app.db.base import get_pool_stats, prewarm_async_pool, prewarm_pool
+from app.db.write_queue import write_queue
+from app.core.jobs import shutdown_pool
+from app.core.security import warm_up
+from app.crud.report_jobs import resume_jobs
+import asyncio
 import os
+import threading
 
 app = FastAPI(
     title="WBSO Time Tracker API",
@@ -15,6 +27,10 @@ app = FastAPI(
     redoc_url=None
 )
 
+# Rate limits answer 429 instead of surfacing as a 500
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
@@ -22,29 +38,69 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Added last so it wraps CORS and sees the final status of every request
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+if settings.METRICS_ENABLED and settings.METRICS_TOKEN:
+    # Registered before the React catch-all below, which would otherwise swallow it
+    @app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+    def metrics():
+        """Prometheus scrape target: per-route latency, status counts, SQL per request, pool gauges"""
+        return PlainTextResponse(render_metrics(get_pool_stats()), media_type="text/plain; version=0.0.4")
+
 # Serve React static files (if build folder exists)
-if os.path.exists("static"):
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+if os.path.exists(settings.STATIC_DIR):
+    # Indexed once: precompressed variants (see `python -m app.cli static compress`), ETags, cache headers
+    app.mount("/static", PrecompressedStaticFiles(settings.STATIC_DIR), name="static")
+    react_index = InMemoryIndex(os.path.join(settings.STATIC_DIR, "index.html"))
     
     # Catch-all route to serve React app for any non-API routes
     @app.get("/{full_path:path}")
-    async def serve_react_app(full_path: str):
+    async def serve_react_app(full_path: str, request: Request):
         # Don't serve React for API routes
         if full_path.startswith("api/"):
             return {"detail": "Not found"}
         
-        # Serve React's index.html for all other routes
-        return FileResponse("static/index.html")
+        # Serve React's index.html (from memory) for all other routes
+        return react_index.response(request.headers)
+
+def _prewarm() -> None:
+    try:
+        prewarm_pool()
+        warm_up()
+    except Exception as e:
+        print(f"Error in startup prewarm: {str(e)}")
+
+async def _prewarm_async() -> None:
+    try:
+        await prewarm_async_pool()
+    except Exception as e:
+        print(f"Error in startup prewarm: {str(e)}")
 
 @app.on_event("startup")
 async def startup_event():
-    # Initialize database and create tables
+    # Check the schema against the migrations' head (and upgrade it, per DB_STARTUP_MODE)
     init_db()
+    # Report jobs queued or interrupted before the last shutdown
+    resume_jobs()
+    # Off the startup path: the server accepts requests while connections and bcrypt load
+    if settings.STARTUP_PREWARM:
+        threading.Thread(target=_prewarm, name="prewarm", daemon=True).start()
+        if settings.ASYNC_DB:
+            app.state.prewarm = asyncio.create_task(_prewarm_async())
+
+@app.on_event("shutdown")
+def shutdown_event():
+    # Let queued writes commit before the process exits
+    write_queue.stop()
+    shutdown_pool()
 
 @app.get("/")
 async def root():
@@ -1,2 +1,5 @@
 from app.models.user import User
 from app.models.time_entry import TimeEntry
+from app.models.hours_rollup import HoursRollup
+from app.models.user_data_version import UserDataVersion
+from app.models.time_entry_tombstone import TimeEntryTombstone
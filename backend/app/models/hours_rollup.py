@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from app.db.base import Base
+
+class HoursRollup(Base):
+    """Hours logged per user per calendar month, maintained alongside time_entries"""
+    __tablename__ = "hours_rollups"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    month = Column(Integer, primary_key=True)
+
+    hours = Column(Float, nullable=False, default=0.0)
+    entry_count = Column(Integer, nullable=False, default=0)
@@ -1,16 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Date, Float, ForeignKey, Text, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.db.base import Base
 
 class TimeEntry(Base):
     __tablename__ = "time_entries"
+    __table_args__ = (
+        # One entry per user per calendar day, enforced by the database
+        Index("uq_time_entries_user_id_day", "user_id", "day", unique=True),
+    )
+    # Load created_at/updated_at at flush (RETURNING), so entries stay usable without a refresh
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     
     # Time entry data
     date = Column(DateTime, nullable=False)
+    day = Column(Date, nullable=False)  # Calendar day of `date`, kept in sync below
     hours = Column(Float, nullable=False)
     project_phase = Column(String, nullable=False)  # Research, Development, Testing, etc.
     activity_description = Column(Text, nullable=False)
@@ -22,3 +29,14 @@ class TimeEntry(Base):
     
     # Relationships
     user = relationship("User", back_populates="time_entries")
+
+    @validates("date")
+    def _sync_day(self, key, value):
+        self.day = value.date() if value is not None else None
+        return value
+
+# Serves the per-user, newest-first listing and the per-year date range filters
+Index("ix_time_entries_user_id_date", TimeEntry.user_id, TimeEntry.date.desc())
+# Delta sync ("changed since") and the editable-entry count behind the list ETag
+Index("ix_time_entries_user_id_created_at", TimeEntry.user_id, TimeEntry.created_at)
+Index("ix_time_entries_user_id_updated_at", TimeEntry.user_id, TimeEntry.updated_at)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+class TimeEntryTombstone(Base):
+    """A deleted time entry, kept so delta sync clients can drop it too"""
+    __tablename__ = "time_entry_tombstones"
+    __table_args__ = (
+        Index("ix_time_entry_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entry_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, Float, false
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -17,6 +17,9 @@ class User(Base):
     project_end_date = Column(DateTime, nullable=False)
     approved_hours = Column(Float, nullable=False)
     
+    # Admins can read organization-wide reports; granted with `python -m app.cli users admin`
+    is_admin = Column(Boolean, nullable=False, default=False, server_default=false())
+    
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
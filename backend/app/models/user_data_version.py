@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from app.db.base import Base
+
+class UserDataVersion(Base):
+    """Counter bumped in every transaction that changes a user's time entries (ETags, cache keys)"""
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
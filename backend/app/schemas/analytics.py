@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+class PhaseBreakdown(BaseModel):
+    project_phase: str
+    hours: float
+    entries: int
+    share: float  # percentage of the year's hours
+
+class WeekBreakdown(BaseModel):
+    iso_year: int
+    iso_week: int
+    week_start: date
+    hours: float
+    entries: int
+
+class MonthBreakdown(BaseModel):
+    month: int
+    hours: float
+    entries: int
+
+class BurnProjection(BaseModel):
+    window_start: date
+    window_end: date
+    weeks_elapsed: float
+    weeks_remaining: float
+    hours_per_week: float
+    required_hours_per_week: float
+    projected_total_hours: float
+    projected_over_under: float  # positive means the approved hours will be exceeded
+    projected_completion_date: Optional[date] = None
+
+class Analytics(BaseModel):
+    year: int
+    total_hours: float
+    entry_count: int
+    approved_hours: float
+    by_phase: List[PhaseBreakdown]
+    by_week: List[WeekBreakdown]
+    by_month: List[MonthBreakdown]
+    burn: BurnProjection
@@ -0,0 +1,31 @@
+from pydantic import BaseModel, model_validator
+from datetime import datetime
+from typing import Literal, Optional
+
+class ReportJobCreate(BaseModel):
+    kind: Literal["export", "analytics"]
+    format: Literal["csv", "jsonl"] = "csv"  # export only
+    start_year: Optional[int] = None  # analytics only; both default to the current year
+    end_year: Optional[int] = None
+
+    @model_validator(mode="after")
+    def _check_years(self):
+        current = datetime.now().year
+        self.start_year = self.start_year or self.end_year or current
+        self.end_year = self.end_year or current
+        if self.end_year < self.start_year:
+            raise ValueError("end_year must not be before start_year")
+        if self.end_year - self.start_year >= 20:
+            raise ValueError("Analytics jobs cover at most 20 years")
+        return self
+
+class ReportJob(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued, running, done or failed
+    progress: float  # 0 to 1
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result_url: Optional[str] = None  # set once the job is done
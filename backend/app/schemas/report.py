@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.analytics import BurnProjection, PhaseBreakdown
+
+class UserReport(BaseModel):
+    user_id: int
+    email: str
+    project_name: str
+    wbso_application_number: str
+    approved_hours: float
+    total_hours: float
+    remaining_hours: float
+    progress_percentage: float
+    entry_count: int
+    by_phase: List[PhaseBreakdown]
+    burn: BurnProjection
+
+class OrgReport(BaseModel):
+    year: int
+    user_count: int
+    total_hours: float
+    approved_hours: float
+    projected_over_count: int  # users on track to exceed their approved hours
+    by_phase: List[PhaseBreakdown]
+    users: List[UserReport]
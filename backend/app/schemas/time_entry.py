@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 class TimeEntryBase(BaseModel):
     date: datetime
@@ -15,6 +15,13 @@ class TimeEntryCreate(TimeEntryBase):
 class TimeEntryUpdate(TimeEntryBase):
     pass
 
+class TimeEntryDay(BaseModel):
+    """Body of PUT /time-entries/by-date/{day}; the date comes from the path"""
+    hours: float
+    project_phase: str
+    activity_description: str
+    technical_challenge: str
+
 class TimeEntry(TimeEntryBase):
     id: int
     user_id: int
@@ -24,3 +31,31 @@ class TimeEntry(TimeEntryBase):
 
     class Config:
         from_attributes = True
+
+class BulkImportError(BaseModel):
+    row: int  # 1-based record number in the uploaded body (CSV header excluded)
+    error: str
+
+class BulkImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[BulkImportError]
+
+class TimeEntrySearchHit(BaseModel):
+    id: int
+    date: datetime
+    hours: float
+    project_phase: str
+    rank: float
+    activity_snippet: str
+    challenge_snippet: str
+
+class TimeEntryTombstone(BaseModel):
+    id: int
+    date: date
+
+class TimeEntryChanges(BaseModel):
+    token: str  # pass back as `since` on the next call
+    full: bool  # True when `since` was omitted and every entry is included
+    entries: List[TimeEntry]
+    deleted: List[TimeEntryTombstone]
@@ -0,0 +1,5 @@
+"""Benchmarks for the WBSO Time Tracker backend.
+
+Run from the backend directory, e.g. ``python -m benchmarks.async_vs_sync``.
+These need the extra packages in benchmarks/requirements.txt.
+"""
@@ -0,0 +1,64 @@
+"""Compare the sync (threadpool) and async (AsyncSession) API modes under concurrent load.
+
+    python -m benchmarks.async_vs_sync --concurrency 10 50 100 --requests 2000
+
+Both modes serve the same seeded SQLite database; each concurrency level mixes the
+list and stats routes, which is what the dashboard issues on every load.
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import login, print_table, run_server, seed_database, summarize, temp_database_url
+
+ROUTES = ["/api/v1/time-entries/", "/api/v1/time-entries/stats"]
+
+async def _drive(base_url: str, headers: Dict[str, str], total: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for n in range(total):
+        queue.put_nowait(ROUTES[n % len(ROUTES)])
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while not queue.empty():
+            path = queue.get_nowait()
+            started = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--entries", type=int, default=220, help="entries seeded for the benchmark user")
+    args = parser.parse_args()
+
+    database_url = temp_database_url()
+    email = seed_database(database_url, users=1, years=1, entries_per_year=args.entries)[0]
+
+    rows = []
+    for mode, async_db in (("sync", "false"), ("async", "true")):
+        with run_server({"DATABASE_URL": database_url, "ASYNC_DB": async_db, "SECRET_KEY": "benchmark"}) as base_url:
+            headers = login(base_url, email)
+            for concurrency in args.concurrency:
+                result = asyncio.run(_drive(base_url, headers, args.requests, concurrency))
+                rows.append({"mode": mode, "concurrency": concurrency, **result})
+
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Shared helpers: seeding a throwaway database, running the app under uvicorn, latency stats"""
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchmark-password"
+PHASES = ["Research", "Development", "Testing"]
+
+def temp_database_url() -> str:
+    handle, path = tempfile.mkstemp(prefix="wbso-bench-", suffix=".db")
+    os.close(handle)
+    os.unlink(path)
+    return f"sqlite:///{path}"
+
+def _run_python(code: str, env: Dict[str, str]) -> None:
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env={**os.environ, **env}, check=True)
+
+def seed_database(database_url: str, users: int = 1, years: int = 1, entries_per_year: int = 220) -> List[str]:
+    """Migrate a fresh database and fill it with `users` x `years` x `entries_per_year` entries.
+
+    Seeding runs in a subprocess so the app's settings pick up `database_url`.
+    Returns the seeded users' emails (all share PASSWORD).
+    """
+    code = f"""
+from datetime import datetime, timedelta
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.base import SessionLocal
+from app.db.init_db import init_db
+from app.models import User
+from app.crud.time_entry import bulk_insert_time_entries
+from app.schemas.time_entry import TimeEntryCreate
+
+init_db()
+db = SessionLocal()
+hashed = get_password_hash({PASSWORD!r})
+first_year = datetime.now().year - {years} + 1
+phases = {PHASES!r}
+for n in range({users}):
+    user = User(
+        email=f"bench{{n}}@example.com", hashed_password=hashed, project_name="Benchmark",
+        wbso_application_number=f"WBSO-{{n}}", project_start_date=datetime(first_year, 1, 1),
+        project_end_date=datetime(first_year + {years}, 12, 31), approved_hours=2000.0,
+    )
+    db.add(user)
+    db.flush()
+    for year in range(first_year, first_year + {years}):
+        day = datetime(year, 1, 1)
+        entries = []
+        for i in range({entries_per_year}):
+            entries.append(TimeEntryCreate(
+                date=day + timedelta(days=i), hours=4 + i % 5, project_phase=phases[i % len(phases)],
+                activity_description="Benchmark activity " * 10, technical_challenge="Benchmark challenge " * 10,
+            ))
+        bulk_insert_time_entries(db, entries, user_id=user.id)
+    db.commit()
+db.close()
+"""
+    _run_python(code, {"DATABASE_URL": database_url})
+    return [f"bench{n}@example.com" for n in range(users)]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def run_server(env: Dict[str, str], workers: int = 1) -> Iterator[str]:
+    """Start the app under uvicorn with extra environment variables, yield its base URL"""
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(base_url + "/", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def login(base_url: str, email: str) -> Dict[str, str]:
+    response = httpx.post(f"{base_url}/api/v1/auth/login", json={"email": email, "password": PASSWORD}, timeout=30)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Latencies in seconds -> p50/p95/p99 in milliseconds plus throughput"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def print_table(rows: List[Dict], columns: Optional[List[str]] = None) -> None:
+    if not rows:
+        return
+    columns = columns or list(rows[0])
+    widths = {column: max(len(column), *(len(str(row.get(column, ""))) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(str(row.get(column, "")).ljust(widths[column]) for column in columns))
@@ -0,0 +1,282 @@
+"""Mixed-route load test against a seeded multi-year dataset, with saved baselines.
+
+    python -m benchmarks.load_test --users 1000 --years 5 --database /tmp/wbso-1k.db \\
+        --clients 50 --requests 5000 --save-baseline benchmarks/baselines/main.json
+    python -m benchmarks.load_test --users 1000 --years 5 --database /tmp/wbso-1k.db \\
+        --clients 50 --requests 5000 --compare benchmarks/baselines/main.json
+
+Every client logs in as its own seeded user, then issues a fixed-seed random mix of
+list, stats, create, update and delete requests. Each route gets p50/p95/p99 latency,
+throughput and SQL queries per request, read from the server's /metrics before and
+after the run. --compare exits non-zero when a route's p95 or queries per request grow
+past the threshold.
+
+The seeded database is kept when --database is given and reused on the next run, so
+large datasets are only built once. --target inprocess drives the ASGI app directly
+over httpx, skipping uvicorn and the network stack.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.common import PASSWORD, print_table, run_server, seed_database, summarize, temp_database_url
+
+# Relative weight of each operation in the mix; update and delete only target entries this client created
+DEFAULT_MIX = {"list": 4, "stats": 3, "create": 1, "update": 1, "delete": 1}
+ROUTE_TEMPLATES = {
+    "login": ("POST", "/api/v1/auth/login"),
+    "list": ("GET", "/api/v1/time-entries/"),
+    "stats": ("GET", "/api/v1/time-entries/stats"),
+    "create": ("POST", "/api/v1/time-entries/"),
+    "update": ("PUT", "/api/v1/time-entries/{entry_id}"),
+    "delete": ("DELETE", "/api/v1/time-entries/{entry_id}"),
+}
+# Created entries go far past the seeded years so they never collide with seeded days
+SCRATCH_YEAR = 2090
+REPORT_COLUMNS = ["operation", "requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request"]
+# /metrics is only served to scrapers presenting the server's METRICS_TOKEN
+METRICS_TOKEN = secrets.token_urlsafe(16)
+METRICS_HEADERS = {"Authorization": f"Bearer {METRICS_TOKEN}"}
+_SERIES = re.compile(r'^(http_request_db_queries_(?:sum|count))\{method="([^"]*)",route="([^"]*)"\} (\S+)$')
+
+def _scrape_queries(text: str) -> Dict[Tuple[str, str], List[float]]:
+    """/metrics text -> {(method, route): [query sum, request count]}"""
+    series: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0.0, 0.0])
+    for line in text.splitlines():
+        match = _SERIES.match(line)
+        if match:
+            name, method, route, value = match.groups()
+            series[(method, route)][0 if name.endswith("_sum") else 1] = float(value)
+    return series
+
+def _queries_per_request(before: Dict, after: Dict, operation: str):
+    key = ROUTE_TEMPLATES[operation]
+    queries = after[key][0] - before.get(key, [0.0, 0.0])[0]
+    requests = after[key][1] - before.get(key, [0.0, 0.0])[1]
+    return round(queries / requests, 2) if requests else None
+
+class Client:
+    """One virtual user: its own token, RNG and the entries it created and may still edit"""
+
+    def __init__(self, http: httpx.AsyncClient, email: str, index: int, seed: int, years: List[int]):
+        self.http = http
+        self.email = email
+        self.rng = random.Random(seed * 100003 + index)
+        self.years = years
+        self.headers: Dict[str, str] = {}
+        self.created: Dict[int, Dict] = {}
+        self.next_day = date(SCRATCH_YEAR, 1, 1) + timedelta(days=index * 3660)
+
+    async def login(self) -> httpx.Response:
+        # All clients log in at once; ride out the password hasher's 503 backpressure
+        while True:
+            response = await self.http.post("/api/v1/auth/login", json={"email": self.email, "password": PASSWORD})
+            if response.status_code != 503:
+                break
+            await asyncio.sleep(0.05)
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return response
+
+    def pick(self, mix: Dict[str, int]) -> str:
+        operation = self.rng.choices(list(mix), weights=list(mix.values()))[0]
+        if operation in ("update", "delete") and not self.created:
+            return "create"
+        return operation
+
+    async def run(self, operation: str) -> httpx.Response:
+        if operation == "list":
+            params = {"year": self.rng.choice(self.years), "limit": 50}
+            return await self.http.get("/api/v1/time-entries/", params=params, headers=self.headers)
+        if operation == "stats":
+            return await self.http.get("/api/v1/time-entries/stats", params={"year": self.rng.choice(self.years)}, headers=self.headers)
+        if operation == "create":
+            entry = {
+                "date": f"{self.next_day.isoformat()}T00:00:00",
+                "hours": self.rng.choice([2, 4, 6, 8]),
+                "project_phase": self.rng.choice(["Research", "Development", "Testing"]),
+                "activity_description": "Load test activity",
+                "technical_challenge": "Load test challenge",
+            }
+            self.next_day += timedelta(days=1)
+            response = await self.http.post("/api/v1/time-entries/", json=entry, headers=self.headers)
+            if response.status_code == 200:
+                self.created[response.json()["id"]] = entry
+            return response
+        entry_id = self.rng.choice(list(self.created))
+        if operation == "update":
+            entry = {**self.created[entry_id], "hours": self.rng.choice([3, 5, 7])}
+            return await self.http.put(f"/api/v1/time-entries/{entry_id}", json=entry, headers=self.headers)
+        del self.created[entry_id]
+        return await self.http.delete(f"/api/v1/time-entries/{entry_id}", headers=self.headers)
+
+@asynccontextmanager
+async def _in_process_client(database_url: str):
+    # Settings are read at import time, so point them at the benchmark database first
+    os.environ.update({
+        "DATABASE_URL": database_url, "SECRET_KEY": "benchmark", "RATELIMIT_ENABLED": "false", "METRICS_TOKEN": METRICS_TOKEN,
+    })
+    from app.main import app
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120) as http:
+        yield http
+
+async def _drive(http: httpx.AsyncClient, emails: List[str], years: List[int], args) -> Tuple[List[Dict], Dict]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    async def timed(operation: str, call) -> None:
+        started = time.perf_counter()
+        response = await call()
+        latencies[operation].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            errors[operation] += 1
+
+    clients = [Client(http, emails[n % len(emails)], n, args.seed, years) for n in range(args.clients)]
+    before = _scrape_queries((await http.get("/metrics", headers=METRICS_HEADERS)).raise_for_status().text)
+
+    login_started = time.perf_counter()
+    await asyncio.gather(*(timed("login", client.login) for client in clients))
+    login_elapsed = time.perf_counter() - login_started
+
+    remaining = args.requests
+
+    async def worker(client: Client) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            operation = client.pick(args.mix)
+            await timed(operation, lambda: client.run(operation))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client) for client in clients))
+    elapsed = time.perf_counter() - started
+    after = _scrape_queries((await http.get("/metrics", headers=METRICS_HEADERS)).raise_for_status().text)
+
+    # Leave a reused --database as it was seeded so the next run starts from the same state
+    for client in clients:
+        for entry_id in list(client.created):
+            await http.delete(f"/api/v1/time-entries/{entry_id}", headers=client.headers)
+
+    rows = []
+    for operation in ["login"] + [name for name in ROUTE_TEMPLATES if name in latencies and name != "login"]:
+        window = login_elapsed if operation == "login" else elapsed
+        rows.append({
+            "operation": operation,
+            **summarize(latencies[operation], window, errors[operation]),
+            "queries_per_request": _queries_per_request(before, after, operation),
+        })
+    all_latencies = [sample for operation, samples in latencies.items() if operation != "login" for sample in samples]
+    total = {"operation": "total (excl. login)", **summarize(all_latencies, elapsed, sum(errors.values()) - errors["login"])}
+    return rows + [total], {"elapsed_seconds": round(elapsed, 2)}
+
+def _compare(rows: List[Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Routes whose p95 or queries per request grew by more than `threshold` (a fraction)"""
+    previous = {row["operation"]: row for row in baseline["results"]}
+    regressions = []
+    for row in rows:
+        old = previous.get(row["operation"])
+        if not old:
+            continue
+        for metric in ("p95_ms", "queries_per_request"):
+            new_value, old_value = row.get(metric), old.get(metric)
+            if new_value is None or not old_value:
+                continue
+            change = (new_value - old_value) / old_value
+            row[f"{metric}_change"] = f"{change:+.0%}"
+            if change > threshold:
+                regressions.append(f"{row['operation']}: {metric} {old_value} -> {new_value} ({change:+.0%})")
+    return regressions
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name] = int(weight or 1)
+    return mix
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--entries-per-year", type=int, default=365, help="one entry per day from January 1st")
+    parser.add_argument("--database", help="SQLite file to seed once and reuse (default: throwaway)")
+    parser.add_argument("--clients", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=2000, help="requests after login, across all clients")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="e.g. list=4,stats=3,create=1")
+    parser.add_argument("--seed", type=int, default=1, help="seed for each client's operation sequence")
+    parser.add_argument("--target", choices=["uvicorn", "inprocess"], default="uvicorn")
+    parser.add_argument("--async-db", action="store_true", help="serve the async (ASYNC_DB) routes")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to flag regressions against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth before a regression (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.database and os.path.exists(args.database):
+        database_url = f"sqlite:///{os.path.abspath(args.database)}"
+        emails = [f"bench{n}@example.com" for n in range(args.users)]
+        print(f"Reusing seeded database {args.database}")
+    else:
+        database_url = f"sqlite:///{os.path.abspath(args.database)}" if args.database else temp_database_url()
+        started = time.perf_counter()
+        emails = seed_database(database_url, users=args.users, years=args.years, entries_per_year=args.entries_per_year)
+        print(f"Seeded {args.users} users x {args.years} years x {args.entries_per_year} entries in {time.perf_counter() - started:.1f}s")
+    last_year = date.today().year
+    years = list(range(last_year - args.years + 1, last_year + 1))
+
+    if args.target == "inprocess":
+        os.environ["ASYNC_DB"] = "true" if args.async_db else "false"
+
+        async def run():
+            async with _in_process_client(database_url) as http:
+                return await _drive(http, emails, years, args)
+
+        rows, extra = asyncio.run(run())
+    else:
+        env = {"DATABASE_URL": database_url, "ASYNC_DB": "true" if args.async_db else "false",
+               "SECRET_KEY": "benchmark", "RATELIMIT_ENABLED": "false", "METRICS_TOKEN": METRICS_TOKEN}
+        with run_server(env) as base_url:
+
+            async def run():
+                limits = httpx.Limits(max_connections=args.clients, max_keepalive_connections=args.clients)
+                async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+                    return await _drive(http, emails, years, args)
+
+            rows, extra = asyncio.run(run())
+
+    columns = list(REPORT_COLUMNS)
+    regressions = []
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = _compare(rows, json.load(handle), args.threshold)
+        columns += ["p95_ms_change", "queries_per_request_change"]
+    print_table(rows, columns)
+
+    if args.save_baseline:
+        config = {name: getattr(args, name) for name in ("users", "years", "entries_per_year", "clients", "requests", "mix", "seed", "target", "async_db")}
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as handle:
+            json.dump({"config": config, **extra, "results": rows}, handle, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
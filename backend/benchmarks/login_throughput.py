@@ -0,0 +1,91 @@
+"""Login throughput next to API latency while a login storm is running.
+
+    python -m benchmarks.login_throughput --logins 200 --login-concurrency 50
+
+Measures GET /time-entries/stats latency on its own, then again while concurrent logins
+hammer bcrypt, and reports login throughput and how many logins were shed with a 503.
+The login rate limit is disabled for the run (RATELIMIT_ENABLED=false).
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import PASSWORD, login, print_table, run_server, seed_database, summarize, temp_database_url
+
+async def _stats_probe(client: httpx.AsyncClient, headers: Dict[str, str], stop: asyncio.Event, concurrency: int) -> List[float]:
+    latencies: List[float] = []
+
+    async def worker() -> None:
+        while not stop.is_set():
+            started = time.perf_counter()
+            await client.get("/api/v1/time-entries/stats", headers=headers)
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
+
+async def _login_storm(client: httpx.AsyncClient, email: str, total: int, concurrency: int):
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = iter(range(total))
+
+    async def worker() -> None:
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.post("/api/v1/auth/login", json={"email": email, "password": PASSWORD})
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, statuses, time.perf_counter() - started
+
+async def _run(base_url: str, email: str, args) -> List[Dict]:
+    headers = login(base_url, email)
+    limits = httpx.Limits(max_connections=args.login_concurrency + args.probe_concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_stats_probe(client, headers, stop, args.probe_concurrency))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        idle = await probe
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_stats_probe(client, headers, stop, args.probe_concurrency))
+        login_latencies, statuses, elapsed = await _login_storm(client, email, args.logins, args.login_concurrency)
+        stop.set()
+        loaded = await probe
+
+    ok = statuses.get(200, 0)
+    return [
+        {"measurement": "stats (idle)", **summarize(idle, args.baseline_seconds)},
+        {"measurement": "stats (during logins)", **summarize(loaded, elapsed)},
+        {"measurement": f"logins ok={ok} 503={statuses.get(503, 0)}", **summarize(login_latencies, elapsed)},
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--login-concurrency", type=int, default=50)
+    parser.add_argument("--probe-concurrency", type=int, default=5)
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--async-db", action="store_true", help="run the app with ASYNC_DB=true")
+    args = parser.parse_args()
+
+    database_url = temp_database_url()
+    email = seed_database(database_url)[0]
+    env = {
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": "benchmark",
+        "RATELIMIT_ENABLED": "false",
+        "ASYNC_DB": "true" if args.async_db else "false",
+    }
+    with run_server(env) as base_url:
+        rows = asyncio.run(_run(base_url, email, args))
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
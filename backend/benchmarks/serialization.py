@@ -0,0 +1,80 @@
+"""Per-entry cost of the time entry list response: ORM + Pydantic vs plain rows + orjson.
+
+    python -m benchmarks.serialization --entries 5000
+
+Runs in-process against a seeded SQLite database, timing the query, can_edit and
+JSON encoding for one user's year of entries, and reports microseconds per entry.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import BACKEND_DIR, print_table, seed_database, temp_database_url
+
+def _time(func: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # One entry per day caps a calendar year at 366 entries, so --entries consecutive days
+    # are seeded and both paths list every year they span
+    database_url = temp_database_url()
+    seed_database(database_url, users=1, years=1, entries_per_year=args.entries)
+    os.environ["DATABASE_URL"] = database_url
+    sys.path.insert(0, BACKEND_DIR)
+
+    import json
+    from typing import List as ListType
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import ORJSONResponse
+    from pydantic import TypeAdapter
+    from app.api.api_v1.endpoints.time_entries import ENTRY_FIELDS, page_response
+    from app.crud.time_entry import can_edit_entry, get_time_entries, get_time_entry_rows
+    from app.db.base import SessionLocal
+    from app.models.time_entry import TimeEntry as TimeEntryModel
+    from app.schemas.time_entry import TimeEntry
+
+    db = SessionLocal()
+    years = sorted({row[0].year for row in db.query(TimeEntryModel.date).all()})
+    adapter = TypeAdapter(ListType[TimeEntry])
+
+    def orm_pydantic() -> bytes:
+        entries = [entry for year in years for entry in get_time_entries(db, user_id=1, year=year)]
+        for entry in entries:
+            entry.can_edit = can_edit_entry(entry)
+        db.expunge_all()
+        # What FastAPI does for response_model=List[TimeEntry]
+        validated = adapter.validate_python(entries, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def rows_orjson() -> bytes:
+        rows = [row for year in years for row in get_time_entry_rows(db, 1, ENTRY_FIELDS, year=year)]
+        response: ORJSONResponse = page_response(rows, ENTRY_FIELDS, None)
+        return response.body
+
+    count = db.query(TimeEntryModel).count()
+    results: List[Dict] = []
+    for name, func in (("orm + pydantic + json", orm_pydantic), ("rows + orjson", rows_orjson)):
+        seconds = _time(func, args.repeat)
+        results.append({
+            "path": name,
+            "entries": count,
+            "total_ms": round(seconds * 1000, 2),
+            "us_per_entry": round(seconds / count * 1e6, 2),
+        })
+    db.close()
+    print_table(results)
+
+if __name__ == "__main__":
+    main()
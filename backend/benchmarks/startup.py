@@ -0,0 +1,198 @@
+"""Cold start: import cost per package, startup phases and time to first response.
+
+    python -m benchmarks.startup --runs 5 --save-baseline benchmarks/baselines/startup.json
+    python -m benchmarks.startup --runs 5 --compare benchmarks/baselines/startup.json
+
+Every measurement runs in a fresh interpreter and the table shows medians over --runs:
+- import: self time per package from `python -X importtime -c "import app.main"`,
+  with app modules grouped per subpackage;
+- phase: importing app.main, the startup handlers, then the first request to `/`, the
+  first login and the first database query, in process over httpx's ASGI transport;
+- uvicorn: from launching uvicorn to its first 200 on `/`, against an already migrated
+  database and against a fresh one that the startup has to migrate.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, PASSWORD, free_port, print_table, seed_database, temp_database_url
+
+PHASES_CODE = """
+import asyncio, json, time
+import httpx
+phases = {}
+mark = time.perf_counter()
+def lap(name):
+    global mark
+    now = time.perf_counter()
+    phases[name] = (now - mark) * 1000
+    mark = now
+from app.main import app
+lap("import app.main")
+async def main():
+    await app.router.startup()
+    lap("startup handlers")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        (await http.get("/")).raise_for_status()
+        lap("first request")
+        login = await http.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        login.raise_for_status()
+        lap("first login")
+        headers = {"Authorization": "Bearer " + login.json()["access_token"]}
+        (await http.get("/api/v1/time-entries/stats", headers=headers)).raise_for_status()
+        lap("first query")
+    await app.router.shutdown()
+asyncio.run(main())
+print(json.dumps(phases))
+"""
+
+def _env(database_url: str, scratch: str) -> Dict[str, str]:
+    return {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": "benchmark",
+        "RATELIMIT_ENABLED": "false",
+        "RATELIMIT_STORAGE_URI": f"sqlite:///{scratch}/ratelimit.db",
+        "JOBS_DB_PATH": os.path.join(scratch, "jobs.db"),
+        "JOB_ARTIFACT_DIR": os.path.join(scratch, "artifacts"),
+    }
+
+def _group(module: str) -> str:
+    parts = module.split(".")
+    return ".".join(parts[:2]) if parts[0] == "app" and len(parts) > 1 else parts[0]
+
+def import_profile(env: Dict[str, str]) -> Dict[str, float]:
+    """Self time in milliseconds per package group for one `import app.main`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    )
+    totals: Counter = Counter()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|", 2)
+        totals[_group(module.strip())] += int(self_us) / 1000
+    return dict(totals)
+
+def phase_profile(env: Dict[str, str], email: str) -> Dict[str, float]:
+    code = f"EMAIL = {email!r}\nPASSWORD = {PASSWORD!r}\n" + PHASES_CODE
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def time_to_first_response(env: Dict[str, str]) -> float:
+    """Milliseconds from launching uvicorn to its first 200 on `/`"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        deadline = time.monotonic() + 60
+        # A refused connect is cheap; building an HTTP client per probe would compete with
+        # the server for the CPU it is starting on
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                pass
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.01)
+        httpx.get(f"http://127.0.0.1:{port}/", timeout=10).raise_for_status()
+        return (time.perf_counter() - started) * 1000
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def _row(stage: str, samples: List[float]) -> Dict:
+    return {"stage": stage, "median_ms": round(statistics.median(samples), 1), "max_ms": round(max(samples), 1)}
+
+def _compare(rows: List[Dict], baseline: Dict, threshold: float, floor_ms: float) -> List[str]:
+    """Stages whose median grew by more than `threshold` (a fraction) and at least `floor_ms`"""
+    previous = {row["stage"]: row for row in baseline["results"]}
+    regressions = []
+    for row in rows:
+        old = previous.get(row["stage"])
+        if not old or not old["median_ms"]:
+            continue
+        change = (row["median_ms"] - old["median_ms"]) / old["median_ms"]
+        row["median_change"] = f"{change:+.0%}"
+        if change > threshold and row["median_ms"] - old["median_ms"] >= floor_ms:
+            regressions.append(f"{row['stage']}: {old['median_ms']} -> {row['median_ms']} ms ({change:+.0%})")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=12, help="import groups to show, by median self time")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to flag regressions against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth before a regression (0.2 = 20%%)")
+    parser.add_argument("--floor-ms", type=float, default=10.0, help="ignore growth smaller than this")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="wbso-startup-")
+    database_url = temp_database_url()
+    email = seed_database(database_url, users=1, years=1, entries_per_year=20)[0]
+    env = _env(database_url, scratch)
+
+    # One warm-up import so the measured runs read bytecode instead of compiling it
+    import_profile(env)
+    imports: Dict[str, List[float]] = defaultdict(list)
+    phases: Dict[str, List[float]] = defaultdict(list)
+    first_response: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(args.runs):
+        profile = import_profile(env)
+        imports["import total"].append(sum(profile.values()))
+        for group, elapsed in profile.items():
+            imports[f"import {group}"].append(elapsed)
+        for phase, elapsed in phase_profile(env, email).items():
+            phases[f"phase {phase}"].append(elapsed)
+        first_response["uvicorn migrated database"].append(time_to_first_response(env))
+        first_response["uvicorn fresh database"].append(time_to_first_response(_env(temp_database_url(), scratch)))
+
+    import_rows = sorted(
+        (_row(stage, samples + [0.0] * (args.runs - len(samples))) for stage, samples in imports.items()),
+        key=lambda row: -row["median_ms"],
+    )
+    rows = (
+        import_rows[:args.top + 1]
+        + [_row(stage, samples) for stage, samples in phases.items()]
+        + [_row(stage, samples) for stage, samples in first_response.items()]
+    )
+
+    columns = ["stage", "median_ms", "max_ms"]
+    regressions = []
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = _compare(rows, json.load(handle), args.threshold, args.floor_ms)
+        columns.append("median_change")
+    print_table(rows, columns)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save_baseline)), exist_ok=True)
+        with open(args.save_baseline, "w") as handle:
+            json.dump({"config": {"runs": args.runs}, "results": rows}, handle, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Concurrent time entry writes with and without the group-commit write queue.
+
+    python -m benchmarks.write_throughput --clients 32 --writes 50
+
+Every client logs in as its own user and creates entries on consecutive days, so no
+request conflicts with another. The same run is made against a fresh database with
+WRITE_QUEUE_ENABLED off and on; the table shows write throughput, latency percentiles and
+failed requests. The rate limits are disabled for the run (RATELIMIT_ENABLED=false).
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import login, print_table, run_server, seed_database, summarize, temp_database_url
+
+async def _writer(client: httpx.AsyncClient, headers: Dict[str, str], writes: int, latencies: List[float]) -> int:
+    errors = 0
+    first_day = datetime(datetime.now().year, 1, 1)
+    for i in range(writes):
+        body = {
+            "date": (first_day + timedelta(days=i)).isoformat(),
+            "hours": 4,
+            "project_phase": "Development",
+            "activity_description": "Write benchmark",
+            "technical_challenge": "Write benchmark",
+        }
+        started = time.perf_counter()
+        response = await client.post("/api/v1/time-entries/", json=body, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors += 1
+    return errors
+
+async def _run(base_url: str, emails: List[str], writes: int):
+    headers = [login(base_url, email) for email in emails]
+    latencies: List[float] = []
+    limits = httpx.Limits(max_connections=len(emails))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        errors = await asyncio.gather(*(_writer(client, user_headers, writes, latencies) for user_headers in headers))
+        elapsed = time.perf_counter() - started
+    return latencies, sum(errors), elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent writers, one user each")
+    parser.add_argument("--writes", type=int, default=50, help="entries created per client")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="WRITE_QUEUE_WINDOW_MS for the queued run")
+    parser.add_argument("--async-db", action="store_true", help="run the app with ASYNC_DB=true")
+    args = parser.parse_args()
+
+    rows = []
+    for queued in (False, True):
+        database_url = temp_database_url()
+        emails = seed_database(database_url, users=args.clients, entries_per_year=0)
+        env = {
+            "DATABASE_URL": database_url,
+            "SECRET_KEY": "benchmark",
+            "RATELIMIT_ENABLED": "false",
+            "ASYNC_DB": "true" if args.async_db else "false",
+            "WRITE_QUEUE_ENABLED": "true" if queued else "false",
+            "WRITE_QUEUE_WINDOW_MS": str(args.window_ms),
+        }
+        with run_server(env) as base_url:
+            latencies, errors, elapsed = asyncio.run(_run(base_url, emails, args.writes))
+        rows.append({"write queue": "on" if queued else "off", **summarize(latencies, elapsed, errors)})
+    print_table(rows)
+
+if __name__ == "__main__":
+    main()
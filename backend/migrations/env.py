@@ -0,0 +1,70 @@
+from logging.config import fileConfig
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+from app.core.config import settings
+from app.db.base import Base
+import app.models  # noqa: F401  (registers the models on Base.metadata)
+
+config = context.config
+target_metadata = Base.metadata
+
+# Full-text search tables are dialect-specific and managed by hand (see 0005)
+UNMANAGED_TABLES = {"time_entries_fts", "time_entry_search"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == "table" and name in UNMANAGED_TABLES:
+        return False
+    if name and name.startswith("time_entries_fts_"):  # FTS5 shadow tables
+        return False
+    return True
+
+
+# Only configure logging when run from the alembic CLI; init_db() passes its own connection
+if config.config_file_name is not None and "connection" not in config.attributes:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=settings.DATABASE_URL,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=settings.DATABASE_URL.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run_with_connection(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with_connection(connection)
+        return
+
+    connectable = engine_from_config(
+        {"sqlalchemy.url": settings.DATABASE_URL},
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        _run_with_connection(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
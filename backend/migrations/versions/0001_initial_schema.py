@@ -0,0 +1,59 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-06 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("project_name", sa.String(), nullable=False),
+        sa.Column("wbso_application_number", sa.String(), nullable=False),
+        sa.Column("project_start_date", sa.DateTime(), nullable=False),
+        sa.Column("project_end_date", sa.DateTime(), nullable=False),
+        sa.Column("approved_hours", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"], unique=False)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "time_entries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("date", sa.DateTime(), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("project_phase", sa.String(), nullable=False),
+        sa.Column("activity_description", sa.Text(), nullable=False),
+        sa.Column("technical_challenge", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_time_entries_id", "time_entries", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_time_entries_id", table_name="time_entries")
+    op.drop_table("time_entries")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
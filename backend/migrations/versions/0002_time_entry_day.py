@@ -0,0 +1,70 @@
+"""time_entries.day with unique (user_id, day) index
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-13 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Conflicting (user_id, day) groups listed in the error before it is truncated
+MAX_LISTED_DUPLICATES = 20
+
+
+def _check_duplicate_days() -> None:
+    """Fail with the conflicting rows instead of a bare unique-index error.
+
+    Which of two entries on the same day is right is for their owner to decide, so the
+    migration does not pick one.
+    """
+    rows = op.get_bind().execute(sa.text(
+        "SELECT t.user_id, t.day, t.id, t.hours FROM time_entries t JOIN ("
+        " SELECT user_id, day FROM time_entries GROUP BY user_id, day HAVING COUNT(*) > 1"
+        ") d ON d.user_id = t.user_id AND d.day = t.day ORDER BY t.user_id, t.day, t.id"
+    )).all()
+    if not rows:
+        return
+    groups = {}
+    for row in rows:
+        groups.setdefault((row.user_id, row.day), []).append(f"id={row.id} ({row.hours}h)")
+    lines = [f"  user_id={user_id} day={day}: {', '.join(entries)}" for (user_id, day), entries in groups.items()]
+    if len(lines) > MAX_LISTED_DUPLICATES:
+        lines = lines[:MAX_LISTED_DUPLICATES] + [f"  ... and {len(lines) - MAX_LISTED_DUPLICATES} more"]
+    raise RuntimeError(
+        f"Cannot create uq_time_entries_user_id_day: {len(groups)} (user_id, day) pair(s) have more "
+        "than one time entry. Merge or delete the duplicates, then rerun the migration:\n" + "\n".join(lines)
+    )
+
+
+def upgrade() -> None:
+    columns, indexes = set(), set()
+    if not op.get_context().as_sql:
+        inspector = sa.inspect(op.get_bind())
+        columns = {column["name"] for column in inspector.get_columns("time_entries")}
+        indexes = {index["name"] for index in inspector.get_indexes("time_entries")}
+
+    # Databases created by create_all after the column was introduced already have it
+    if "day" not in columns:
+        op.add_column("time_entries", sa.Column("day", sa.Date(), nullable=True))
+        op.execute("UPDATE time_entries SET day = DATE(date)")
+        with op.batch_alter_table("time_entries") as batch_op:
+            batch_op.alter_column("day", existing_type=sa.Date(), nullable=False)
+
+    if "uq_time_entries_user_id_day" not in indexes:
+        if not op.get_context().as_sql:
+            _check_duplicate_days()
+        op.create_index("uq_time_entries_user_id_day", "time_entries", ["user_id", "day"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("uq_time_entries_user_id_day", table_name="time_entries")
+    with op.batch_alter_table("time_entries") as batch_op:
+        batch_op.drop_column("day")
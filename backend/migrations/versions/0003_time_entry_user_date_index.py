@@ -0,0 +1,33 @@
+"""composite (user_id, date DESC) index on time_entries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-20 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql:
+        indexes = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes("time_entries")}
+        if "ix_time_entries_user_id_date" in indexes:
+            return
+    op.create_index(
+        "ix_time_entries_user_id_date",
+        "time_entries",
+        ["user_id", sa.text("date DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_time_entries_user_id_date", table_name="time_entries")
@@ -0,0 +1,51 @@
+"""hours_rollups table, backfilled from time_entries
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-02-03 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    rollups = op.create_table(
+        "hours_rollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("hours", sa.Float(), nullable=False),
+        sa.Column("entry_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "year", "month"),
+    )
+
+    entries = sa.table(
+        "time_entries",
+        sa.column("id", sa.Integer()),
+        sa.column("user_id", sa.Integer()),
+        sa.column("date", sa.DateTime()),
+        sa.column("hours", sa.Float()),
+    )
+    year = sa.extract("year", entries.c.date)
+    month = sa.extract("month", entries.c.date)
+    op.execute(
+        rollups.insert().from_select(
+            ["user_id", "year", "month", "hours", "entry_count"],
+            sa.select(
+                entries.c.user_id, year, month, sa.func.sum(entries.c.hours), sa.func.count(entries.c.id)
+            ).group_by(entries.c.user_id, year, month),
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("hours_rollups")
@@ -0,0 +1,58 @@
+"""full-text search index over activity descriptions and technical challenges
+
+SQLite gets an FTS5 table, PostgreSQL a tsvector table with a GIN index. Both are kept
+in sync by app.crud.search and are not part of Base.metadata.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-02-17 00:00:00
+
+"""
+from alembic import op
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == "postgresql":
+        op.execute(
+            "CREATE TABLE time_entry_search ("
+            " entry_id INTEGER PRIMARY KEY REFERENCES time_entries (id) ON DELETE CASCADE,"
+            " user_id INTEGER NOT NULL,"
+            " document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX ix_time_entry_search_document ON time_entry_search USING GIN (document)")
+        op.execute("CREATE INDEX ix_time_entry_search_user_id ON time_entry_search (user_id)")
+        # Same text search configuration as app.crud.search indexes and queries with
+        config = settings.SEARCH_TEXT_CONFIG
+        op.execute(
+            "INSERT INTO time_entry_search (entry_id, user_id, document) "
+            "SELECT id, user_id, "
+            f"setweight(to_tsvector(CAST('{config}' AS regconfig), activity_description), 'A') || "
+            f"setweight(to_tsvector(CAST('{config}' AS regconfig), technical_challenge), 'B') "
+            "FROM time_entries"
+        )
+    else:
+        # `owner` holds "u<user_id>" so a MATCH can be restricted to one user's postings
+        op.execute(
+            "CREATE VIRTUAL TABLE time_entries_fts USING fts5("
+            "activity_description, technical_challenge, owner, "
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        op.execute(
+            "INSERT INTO time_entries_fts (rowid, activity_description, technical_challenge, owner) "
+            "SELECT id, activity_description, technical_challenge, 'u' || user_id FROM time_entries"
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("DROP TABLE time_entry_search")
+    else:
+        op.execute("DROP TABLE time_entries_fts")
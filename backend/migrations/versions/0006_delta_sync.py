@@ -0,0 +1,52 @@
+"""delta sync: user_data_versions, time_entry_tombstones, created_at/updated_at indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-03-03 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_data_versions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+    op.create_table(
+        "time_entry_tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_time_entry_tombstones_user_id_deleted_at",
+        "time_entry_tombstones",
+        ["user_id", "deleted_at"],
+        unique=False,
+    )
+    op.create_index("ix_time_entries_user_id_created_at", "time_entries", ["user_id", "created_at"], unique=False)
+    op.create_index("ix_time_entries_user_id_updated_at", "time_entries", ["user_id", "updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_time_entries_user_id_updated_at", table_name="time_entries")
+    op.drop_index("ix_time_entries_user_id_created_at", table_name="time_entries")
+    op.drop_index("ix_time_entry_tombstones_user_id_deleted_at", table_name="time_entry_tombstones")
+    op.drop_table("time_entry_tombstones")
+    op.drop_table("user_data_versions")
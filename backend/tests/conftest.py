@@ -0,0 +1,73 @@
+"""Shared fixtures: a throwaway migrated SQLite database, users and an API client.
+
+Settings are read when app modules are first imported, so the environment is pointed at
+a temporary directory before any of them load.
+"""
+import itertools
+import os
+import tempfile
+
+_scratch = tempfile.mkdtemp(prefix="wbso-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_scratch}/test.db",
+    "SECRET_KEY": "test",
+    "BCRYPT_ROUNDS": "4",
+    "RATELIMIT_ENABLED": "false",
+    "RATELIMIT_STORAGE_URI": f"sqlite:///{_scratch}/ratelimit.db",
+    "JOBS_DB_PATH": os.path.join(_scratch, "jobs.db"),
+    "JOB_ARTIFACT_DIR": os.path.join(_scratch, "artifacts"),
+    "ARCHIVE_DIR": os.path.join(_scratch, "archive"),
+    "STARTUP_PREWARM": "false",
+    "METRICS_TOKEN": "test-metrics-token",
+})
+
+from datetime import datetime
+
+import pytest
+
+from app.crud.user import create_user
+from app.db.base import SessionLocal
+from app.db.init_db import init_db
+from app.schemas.user import UserCreate
+
+PASSWORD = "test-password"
+_emails = itertools.count()
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    init_db()
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def make_user(db):
+    def make(**overrides):
+        fields = dict(
+            email=f"user{next(_emails)}@example.com", password=PASSWORD, project_name="Test",
+            wbso_application_number="WBSO-1", project_start_date=datetime(2020, 1, 1),
+            project_end_date=datetime(2030, 12, 31), approved_hours=1000.0,
+        )
+        fields.update(overrides)
+        return create_user(db, UserCreate(**fields))
+    return make
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def auth_headers(client):
+    def headers(user):
+        response = client.post("/api/v1/auth/login", json={"email": user.email, "password": PASSWORD})
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return headers
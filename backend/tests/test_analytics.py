@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from sqlalchemy import update
+
+from app.crud.analytics import get_breakdowns
+from app.crud.time_entry import create_time_entry
+from app.db.base import get_engine
+from app.models.time_entry import TimeEntry
+from app.models.user_data_version import UserDataVersion
+from app.schemas.time_entry import TimeEntryCreate
+
+YEAR = datetime.now().year
+
+def _entry(month: int, hours: float) -> TimeEntryCreate:
+    return TimeEntryCreate(
+        date=datetime(YEAR, month, 3), hours=hours, project_phase="Research",
+        activity_description="Analytics", technical_challenge="Analytics",
+    )
+
+def test_breakdowns_follow_writes_made_elsewhere(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(1, 4), user.id)
+    first = get_breakdowns(db, user.id, YEAR)
+
+    # Another worker's write, on its own connection: its rows change and it bumps the data
+    # version in the database, but nothing runs in this process
+    with get_engine().begin() as connection:
+        connection.execute(update(TimeEntry).where(TimeEntry.user_id == user.id).values(hours=8))
+    assert get_breakdowns(db, user.id, YEAR) is first
+    with get_engine().begin() as connection:
+        connection.execute(
+            update(UserDataVersion).where(UserDataVersion.user_id == user.id).values(version=UserDataVersion.version + 1)
+        )
+    assert get_breakdowns(db, user.id, YEAR)["total_hours"] == 8
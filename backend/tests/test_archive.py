@@ -0,0 +1,116 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.crud.archive import archive_year, ensure_archive_storage
+from app.crud.hours_rollup import apply_hours_delta, get_year_hours, rebuild_rollups, verify_rollups
+from app.crud.search import search_time_entries
+from app.crud.time_entry import create_time_entry
+from app.cli import main
+from app.db.archive import ArchiveNotSearchableError, archive_path, is_archived
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import TimeEntryCreate
+
+YEAR = datetime.now().year - 1
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+
+def _entry(day: datetime, activity: str) -> TimeEntryCreate:
+    return TimeEntryCreate(
+        date=day, hours=4, project_phase="Research",
+        activity_description=activity, technical_challenge="Challenge",
+    )
+
+def _close_year(db, year: int) -> None:
+    """Move the year's entries out of the edit window so it can be archived"""
+    db.execute(
+        update(TimeEntry)
+        .where(TimeEntry.date >= datetime(year, 1, 1), TimeEntry.date < datetime(year + 1, 1, 1))
+        .values(created_at=datetime.now() - timedelta(days=30))
+    )
+    db.commit()
+
+def test_search_finds_archived_entries(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(datetime(YEAR, 5, 4), "Archived zebra experiment"), user.id)
+    create_time_entry(db, _entry(datetime(YEAR + 1, 1, 5), "Current zebra experiment"), user.id)
+    _close_year(db, YEAR)
+
+    assert archive_year(db, YEAR).moved == 1
+    hits = search_time_entries(db, user.id, "zebra")
+    assert sorted(hit.date.year for hit in hits) == [YEAR, YEAR + 1]
+    assert "<mark>zebra</mark>" in next(hit for hit in hits if hit.date.year == YEAR).activity_snippet
+
+    in_archive = search_time_entries(db, user.id, "zebra", start=datetime(YEAR, 1, 1), end=datetime(YEAR + 1, 1, 1))
+    assert [hit.date.year for hit in in_archive] == [YEAR]
+    assert search_time_entries(db, user.id, "zebra", start=datetime(YEAR + 1, 1, 1)) != []
+    assert search_time_entries(db, make_user().id, "zebra") == []
+
+def test_search_refuses_archives_without_an_index(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(datetime(YEAR, 6, 1), "Old okapi notes"), user.id)
+    _close_year(db, YEAR)
+    archive_year(db, YEAR)
+    # Archives written before they carried a search index
+    connection = sqlite3.connect(archive_path(YEAR))
+    connection.execute("DROP TABLE time_entries_fts")
+    connection.commit()
+    connection.close()
+
+    with pytest.raises(ArchiveNotSearchableError):
+        search_time_entries(db, user.id, "okapi")
+    assert search_time_entries(db, user.id, "okapi", start=datetime(YEAR + 1, 1, 1)) == []
+
+def test_rollups_count_entries_left_behind_by_an_archive_run(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(datetime(YEAR, 4, 1), "Archived"), user.id)
+    _close_year(db, YEAR)
+    archive_year(db, YEAR)
+    # Backdated into the same month while the archive was built: it stays in time_entries
+    # until the next run
+    db.add(TimeEntry(
+        user_id=user.id, date=datetime(YEAR, 4, 2), hours=3, project_phase="Research",
+        activity_description="Late", technical_challenge="Late",
+    ))
+    apply_hours_delta(db, user.id, datetime(YEAR, 4, 2).date(), 3, 1)
+    db.commit()
+
+    assert verify_rollups(db, user.id) == []
+    rebuild_rollups(db, user.id)
+    assert get_year_hours(db, user.id, YEAR) == 7
+
+def test_archive_refuses_years_without_entries(db):
+    empty_year = YEAR - 1
+    with pytest.raises(ValueError, match="no entries"):
+        archive_year(db, empty_year)
+    assert not is_archived(empty_year)
+
+    assert archive_year(db, empty_year, allow_empty=True).moved == 0
+    assert is_archived(empty_year)
+
+def test_archive_run_skips_years_without_entries(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(datetime(YEAR, 3, 3), "Closed work"), user.id)
+    _close_year(db, YEAR)
+
+    assert main(["archive", "run"]) == 0
+    assert is_archived(YEAR)
+    assert [year for year in range(YEAR - 5, YEAR) if is_archived(year)] == []
+
+def test_archive_requires_explicit_storage_for_server_databases(db, monkeypatch):
+    class FakeBind:
+        class dialect:
+            name = "postgresql"
+
+    monkeypatch.setattr(db, "get_bind", lambda *args, **kwargs: FakeBind)
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", set())
+    with pytest.raises(ValueError, match="ARCHIVE_DIR"):
+        ensure_archive_storage(db)
+
+    monkeypatch.setattr(settings, "__pydantic_fields_set__", {"ARCHIVE_DIR"})
+    ensure_archive_storage(db)
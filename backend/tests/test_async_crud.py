@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.crud import async_time_entry, async_user, sync
+from app.crud import time_entry as sync_crud
+from app.crud.archive import archive_year
+from app.crud.user import get_user_cached, invalidate_user
+from app.db.base import get_async_engine, get_async_session_factory
+from app.models.time_entry import TimeEntry
+from app.schemas.time_entry import TimeEntryCreate
+
+YEAR = datetime.now().year
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+
+def _run(read):
+    """Run `read(async_db)` on a fresh AsyncSession and event loop"""
+    async def main():
+        try:
+            async with get_async_session_factory()() as async_db:
+                return await read(async_db)
+        finally:
+            await get_async_engine().dispose()
+    return asyncio.run(main())
+
+def _entry(day: datetime, hours: float) -> TimeEntryCreate:
+    return TimeEntryCreate(
+        date=day, hours=hours, project_phase="Research",
+        activity_description="Async", technical_challenge="Async",
+    )
+
+def test_async_reads_match_the_sync_crud(db, make_user):
+    user = make_user()
+    for month, hours in ((1, 4), (2, 3), (3, 5)):
+        last = sync_crud.create_time_entry(db, _entry(datetime(YEAR, month, 2), hours), user.id)
+    columns = ["id", "date", "hours", "can_edit"]
+    cutoff = sync_crud.edit_cutoff()
+
+    async def read(async_db):
+        return (
+            await async_time_entry.get_time_entry_rows(async_db, user.id, columns, year=YEAR, limit=2),
+            await async_time_entry.get_time_entry(async_db, last.id, user.id),
+            await async_time_entry.get_entry_by_date(async_db, user.id, datetime(YEAR, 3, 2, 15)),
+            await async_time_entry.get_total_hours(async_db, user.id, YEAR),
+            await async_time_entry.get_data_version(async_db, user.id),
+            await async_time_entry.get_list_validator(async_db, user.id, cutoff),
+        )
+
+    rows, entry, by_date, total, version, validator = _run(read)
+    assert rows == sync_crud.get_time_entry_rows(db, user.id, columns, year=YEAR, limit=2)
+    assert entry.id == by_date.id == last.id
+    assert total == sync_crud.get_total_hours(db, user.id, YEAR) == 12
+    assert version == sync.get_data_version(db, user.id) > 0
+    assert validator == sync.get_list_validator(db, user.id, cutoff)
+
+def test_async_rows_of_an_archived_year_come_from_its_archive(db, make_user):
+    user = make_user()
+    year = YEAR - 1
+    sync_crud.create_time_entry(db, _entry(datetime(year, 6, 1), 6), user.id)
+    db.execute(
+        update(TimeEntry).where(TimeEntry.user_id == user.id).values(created_at=datetime.now() - timedelta(days=30))
+    )
+    db.commit()
+    archive_year(db, year)
+
+    rows = _run(lambda async_db: async_time_entry.get_time_entry_rows(async_db, user.id, ["hours"], year=year))
+    assert [row.hours for row in rows] == [6]
+    assert _run(lambda async_db: async_time_entry.get_total_hours(async_db, user.id, year)) == 6
+
+def test_async_user_reads_share_the_user_cache(db, make_user):
+    user = make_user()
+    invalidate_user(user.id)
+    cached = _run(lambda async_db: async_user.get_user_cached(async_db, user.id))
+    assert cached.email == user.email
+    assert get_user_cached(db, user.id) is cached
+    assert _run(lambda async_db: async_user.get_user_by_email(async_db, user.email)).id == user.id
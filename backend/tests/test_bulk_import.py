@@ -0,0 +1,46 @@
+from datetime import date
+
+from app.api.api_v1.endpoints import time_entries as endpoints
+from app.core.config import settings
+from app.crud.time_entry import get_existing_days
+
+HEADER = "date,hours,project_phase,activity_description,technical_challenge\n"
+
+def _csv(*days: str) -> str:
+    return HEADER + "".join(f"{day},4,Research,Imported,Challenge\n" for day in days)
+
+def _import(client, headers, body: str):
+    return client.post("/api/v1/time-entries/bulk", content=body, headers={**headers, "Content-Type": "text/csv"})
+
+def test_bulk_import_commits_each_chunk(client, auth_headers, make_user, db, monkeypatch):
+    user = make_user()
+    monkeypatch.setattr(settings, "BULK_IMPORT_CHUNK_SIZE", 2)
+    inserts = []
+    original = endpoints.bulk_insert_time_entries
+
+    def counting_insert(session, entries, user_id):
+        inserts.append(len(entries))
+        return original(session, entries, user_id=user_id)
+
+    monkeypatch.setattr(endpoints, "bulk_insert_time_entries", counting_insert)
+    response = _import(client, auth_headers(user), _csv("2026-01-05", "2026-01-06", "2026-01-07", "2026-01-08", "2026-01-09"))
+
+    assert response.json() == {"imported": 5, "failed": 0, "errors": []}
+    assert inserts == [2, 2, 1]
+    assert len(get_existing_days(db, user.id, [date(2026, 1, day) for day in range(5, 10)])) == 5
+
+def test_bulk_import_reports_rows_lost_to_a_concurrent_write(client, auth_headers, make_user, monkeypatch):
+    user = make_user()
+    headers = auth_headers(user)
+    assert _import(client, headers, _csv("2026-02-03")).json()["imported"] == 1
+
+    # Pretend the day was written by another request after the existence check
+    monkeypatch.setattr(endpoints, "get_existing_days", lambda *args: set())
+    response = _import(client, headers, _csv("2026-02-02", "2026-02-03", "2026-02-04"))
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "imported": 2,
+        "failed": 1,
+        "errors": [{"row": 2, "error": "A time entry already exists for 2026-02-03"}],
+    }
@@ -0,0 +1,51 @@
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+
+from app.db.init_db import get_alembic_config
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database migrated to 0001, before time entries had a day column"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        _migrate(connection, "0001")
+        connection.execute(text(
+            "INSERT INTO users (id, email, hashed_password, project_name, wbso_application_number,"
+            " project_start_date, project_end_date, approved_hours)"
+            " VALUES (1, 'legacy@example.com', 'x', 'Legacy', 'WBSO-L', '2024-01-01', '2026-12-31', 100)"
+        ))
+    yield engine
+    engine.dispose()
+
+def _migrate(connection, revision: str) -> None:
+    config = get_alembic_config()
+    config.attributes["connection"] = connection
+    command.upgrade(config, revision)
+
+def _add_entry(engine, entry_id: int, moment: str) -> None:
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO time_entries (id, user_id, date, hours, project_phase, activity_description, technical_challenge)"
+            " VALUES (:id, 1, :date, 2, 'Research', 'Legacy', 'Legacy')"
+        ), {"id": entry_id, "date": moment})
+
+def test_day_index_is_created_without_duplicates(legacy_engine):
+    _add_entry(legacy_engine, 1, "2025-03-03 09:00:00")
+    _add_entry(legacy_engine, 2, "2025-03-04 09:00:00")
+    with legacy_engine.begin() as connection:
+        _migrate(connection, "0002")
+    indexes = {index["name"] for index in inspect(legacy_engine).get_indexes("time_entries")}
+    assert "uq_time_entries_user_id_day" in indexes
+
+def test_duplicate_days_are_listed_instead_of_failing_on_the_index(legacy_engine):
+    _add_entry(legacy_engine, 1, "2025-03-03 09:00:00")
+    _add_entry(legacy_engine, 2, "2025-03-03 14:00:00")
+    _add_entry(legacy_engine, 3, "2025-03-04 09:00:00")
+    with pytest.raises(RuntimeError) as error:
+        with legacy_engine.begin() as connection:
+            _migrate(connection, "0002")
+    message = str(error.value)
+    assert "1 (user_id, day) pair(s)" in message
+    assert "user_id=1 day=2025-03-03: id=1 (2.0h), id=2 (2.0h)" in message
+    assert "id=3" not in message
@@ -0,0 +1,118 @@
+"""The year queries must be answered from indexes, not table scans.
+
+Every statement a crud call runs is captured and EXPLAINed on the same database. The
+PostgreSQL variant runs when TEST_POSTGRES_URL points at an empty database it may migrate;
+sequential scans are disabled there so the plan shows whether an index is usable at all,
+whatever the (tiny) table statistics say.
+"""
+import os
+from contextlib import contextmanager
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from app.crud.hours_rollup import get_year_hours, refresh_month_rollup
+from app.crud.time_entry import create_time_entry, get_time_entries, get_time_entry_rows
+from app.crud.user import create_user
+from app.db.init_db import _upgrade
+from app.schemas.time_entry import TimeEntryCreate
+from app.schemas.user import UserCreate
+
+YEAR = datetime.now().year
+ENTRY_INDEX = "ix_time_entries_user_id_date"
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def backend_db(request, db):
+    if request.param == "sqlite":
+        yield db
+        return
+    url = os.environ.get("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    engine = create_engine(url)
+    with engine.begin() as connection:
+        _upgrade(connection)
+    session = Session(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+@pytest.fixture
+def seeded_user(backend_db):
+    user = create_user(backend_db, UserCreate(
+        email=f"plans-{datetime.now().timestamp()}@example.com", password="test-password",
+        project_name="Plans", wbso_application_number="WBSO-P", project_start_date=datetime(YEAR - 1, 1, 1),
+        project_end_date=datetime(YEAR + 1, 12, 31), approved_hours=1000.0,
+    ))
+    for month in range(1, 4):
+        create_time_entry(backend_db, TimeEntryCreate(
+            date=datetime(YEAR, month, 10), hours=4, project_phase="Research",
+            activity_description="Plan check", technical_challenge="Plan check",
+        ), user.id)
+    return user
+
+@contextmanager
+def _captured(session: Session):
+    statements = []
+
+    def record(connection, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+def _plans(session: Session, call, table: str):
+    """EXPLAIN output of every statement `call` runs against `table`"""
+    with _captured(session) as statements:
+        call()
+    session.rollback()
+    postgresql = session.get_bind().dialect.name == "postgresql"
+    plans = []
+    with session.get_bind().connect() as connection:
+        if postgresql:
+            connection.exec_driver_sql("SET enable_seqscan = off")
+        for statement, parameters in statements:
+            if f"FROM {table}" not in statement and f"INTO {table}" not in statement:
+                continue
+            prefix = "EXPLAIN " if postgresql else "EXPLAIN QUERY PLAN "
+            rows = connection.exec_driver_sql(prefix + statement, parameters).all()
+            plans.append("\n".join(str(row[-1]) for row in rows))
+    assert plans, f"no statement on {table} was captured"
+    return plans
+
+def _assert_uses_index(plan: str, table: str, index: str) -> None:
+    assert index in plan, plan
+    assert f"SCAN {table}" not in plan and f"Seq Scan on {table}" not in plan, plan
+
+def test_get_time_entries_uses_user_date_index(backend_db, seeded_user):
+    for plan in _plans(backend_db, lambda: get_time_entries(backend_db, seeded_user.id, YEAR), "time_entries"):
+        _assert_uses_index(plan, "time_entries", ENTRY_INDEX)
+
+def test_list_rows_use_user_date_index(backend_db, seeded_user):
+    def list_page():
+        get_time_entry_rows(backend_db, seeded_user.id, ["date", "hours", "can_edit"], year=YEAR, limit=2)
+        get_time_entry_rows(
+            backend_db, seeded_user.id, ["date", "hours"], year=YEAR, limit=2, after=(datetime(YEAR, 3, 10), 10**9)
+        )
+
+    for plan in _plans(backend_db, list_page, "time_entries"):
+        _assert_uses_index(plan, "time_entries", ENTRY_INDEX)
+
+def test_rollup_refresh_uses_user_date_index(backend_db, seeded_user):
+    plans = _plans(backend_db, lambda: refresh_month_rollup(backend_db, seeded_user.id, date(YEAR, 2, 1)), "time_entries")
+    for plan in plans:
+        _assert_uses_index(plan, "time_entries", ENTRY_INDEX)
+
+def test_year_hours_read_rollup_primary_key(backend_db, seeded_user):
+    primary_key = "hours_rollups_pkey" if backend_db.get_bind().dialect.name == "postgresql" else "sqlite_autoindex_hours_rollups_1"
+    for plan in _plans(backend_db, lambda: get_year_hours(backend_db, seeded_user.id, YEAR), "hours_rollups"):
+        _assert_uses_index(plan, "hours_rollups", primary_key)
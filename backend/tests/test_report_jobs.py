@@ -0,0 +1,106 @@
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+import app.api.api_v1.endpoints.jobs as jobs_endpoints
+import app.crud.report_jobs as report_jobs
+from app.core.config import settings
+from app.core.jobs import DONE, QUEUED, JobStore
+from app.crud.time_entry import create_time_entry
+from app.schemas.time_entry import TimeEntryCreate
+
+YEAR = datetime.now().year
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """A fresh job table and artifact directory; jobs run inline when the test says so"""
+    job_store = JobStore(str(tmp_path / "jobs.db"))
+    monkeypatch.setattr(settings, "JOB_ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(report_jobs, "job_store", lambda: job_store)
+    monkeypatch.setattr(jobs_endpoints, "job_store", lambda: job_store)
+    return job_store
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    job_ids = []
+    monkeypatch.setattr(report_jobs, "enqueue", lambda run, job_id: job_ids.append(job_id))
+    return job_ids
+
+def _entry(month: int) -> TimeEntryCreate:
+    return TimeEntryCreate(
+        date=datetime(YEAR, month, 5), hours=4, project_phase="Research",
+        activity_description="Report", technical_challenge="Report",
+    )
+
+def _entry_records(jsonl: str) -> int:
+    return jsonl.count('"record_type": "entry"')
+
+def test_export_job_is_built_reused_and_rebuilt_after_a_write(client, auth_headers, make_user, db, store, enqueued):
+    user = make_user()
+    create_time_entry(db, _entry(1), user.id)
+    headers = auth_headers(user)
+
+    submitted = client.post("/api/v1/jobs/", json={"kind": "export", "format": "jsonl"}, headers=headers)
+    assert submitted.status_code == 202 and submitted.json()["status"] == QUEUED
+    assert enqueued == [submitted.json()["id"]]
+
+    report_jobs.run_report_job(enqueued.pop())
+    job = client.get(f"/api/v1/jobs/{submitted.json()['id']}", headers=headers).json()
+    assert job["status"] == DONE
+    result = client.get(job["result_url"], headers=headers)
+    assert result.status_code == 200 and _entry_records(result.text) == 1
+
+    # Unchanged data: the artifact is reused without running anything
+    again = client.post("/api/v1/jobs/", json={"kind": "export", "format": "jsonl"}, headers=headers)
+    assert again.status_code == 200 and again.json()["status"] == DONE
+    assert enqueued == []
+
+    # A write bumps the data version: the next submit builds a new artifact
+    create_time_entry(db, _entry(2), user.id)
+    rebuilt = client.post("/api/v1/jobs/", json={"kind": "export", "format": "jsonl"}, headers=headers)
+    assert rebuilt.status_code == 202
+    report_jobs.run_report_job(enqueued.pop())
+    assert client.get(job["result_url"], headers=headers).status_code == 410
+    latest = client.get(f"/api/v1/jobs/{rebuilt.json()['id']}", headers=headers).json()
+    assert _entry_records(client.get(latest["result_url"], headers=headers).text) == 2
+
+def test_concurrent_submits_share_one_job(tmp_path, store):
+    # One JobStore per simulated worker process, all on the same table
+    stores = [store] + [JobStore(str(tmp_path / "jobs.db")) for _ in range(7)]
+    barrier = threading.Barrier(len(stores))
+    results = []
+
+    def submit(worker_store):
+        barrier.wait()
+        results.append(worker_store.create_unless_active(1, "export", {"format": "csv"}, "same-key", "same-artifact"))
+
+    threads = [threading.Thread(target=submit, args=(worker_store,)) for worker_store in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(created for _, created in results) == 1
+    assert len({job["id"] for job, _ in results}) == 1
+
+def test_queued_job_whose_pool_went_away_is_requeued_when_polled(make_user, db, store, enqueued):
+    user = make_user()
+    create_time_entry(db, _entry(1), user.id)
+    params = report_jobs.report_params(user, "export", "csv", YEAR, YEAR)
+    job = report_jobs.submit_report(db, user, "export", params)
+    enqueued.clear()
+
+    # Still within JOB_STALE_SECONDS: the original pool may yet start it
+    assert report_jobs.get_report_job(job["id"], user.id)["status"] == QUEUED
+    assert enqueued == []
+
+    store._execute("UPDATE jobs SET created_at = ? WHERE id = ?", (time.time() - settings.JOB_STALE_SECONDS - 1, job["id"]))
+    assert report_jobs.get_report_job(job["id"], user.id)["status"] == QUEUED
+    assert enqueued == [job["id"]]
+    # Handed out once per stale period, not on every poll
+    report_jobs.get_report_job(job["id"], user.id)
+    assert enqueued == [job["id"]]
+
+    report_jobs.run_report_job(job["id"])
+    assert report_jobs.get_report_job(job["id"], user.id)["status"] == DONE
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from app.crud.search import search_time_entries
+from app.crud.time_entry import create_time_entry
+from app.schemas.time_entry import TimeEntryCreate
+
+def _entry(day: datetime, activity: str, challenge: str = "Nothing special") -> TimeEntryCreate:
+    return TimeEntryCreate(
+        date=day, hours=4, project_phase="Research",
+        activity_description=activity, technical_challenge=challenge,
+    )
+
+def test_search_matches_text_and_prefix(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(datetime(2026, 3, 2), "Tuned the zebra crossing detector"), user.id)
+    create_time_entry(db, _entry(datetime(2026, 3, 3), "Wrote docs", "Latency of the parser"), user.id)
+
+    assert [row.date.day for row in search_time_entries(db, user.id, "zebra")] == [2]
+    assert [row.date.day for row in search_time_entries(db, user.id, "lat")] == [3]
+    assert search_time_entries(db, user.id, "giraffe") == []
+
+def test_search_does_not_match_owner_column(db, make_user):
+    user = make_user()
+    create_time_entry(db, _entry(datetime(2026, 3, 2), "Tuned the detector"), user.id)
+
+    # The hidden owner column holds "u<user id>"; it is for scoping only, never for matching
+    for query in ("u", f"u{user.id}", f"u{user.id} detector"):
+        assert search_time_entries(db, user.id, query) == [], query
+
+def test_search_is_scoped_to_the_user(db, make_user):
+    owner, other = make_user(), make_user()
+    create_time_entry(db, _entry(datetime(2026, 3, 2), "Private okapi research"), owner.id)
+
+    assert len(search_time_entries(db, owner.id, "okapi")) == 1
+    assert search_time_entries(db, other.id, "okapi") == []
@@ -0,0 +1,24 @@
+from app.crud.user import set_admin
+
+def test_pool_stats_require_an_admin(client, auth_headers, make_user, db):
+    assert client.get("/api/v1/system/pool").status_code == 403
+    user = make_user()
+    headers = auth_headers(user)
+    assert client.get("/api/v1/system/pool", headers=headers).status_code == 403
+
+    set_admin(db, user, True)
+    response = client.get("/api/v1/system/pool", headers=headers)
+    assert response.status_code == 200
+    assert "sync" in response.json()
+
+def test_metrics_require_the_scrape_token(client, auth_headers, make_user, db):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    # A user's API token is not a scrape token, even an admin's
+    user = make_user()
+    set_admin(db, user, True)
+    assert client.get("/metrics", headers=auth_headers(user)).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer test-metrics-token"})
+    assert response.status_code == 200
+    assert "db_pool_" in response.text
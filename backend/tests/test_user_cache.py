@@ -0,0 +1,31 @@
+from app.crud.user import get_user, get_user_cached
+from app.db.base import SessionLocal
+
+def test_cached_user_is_dropped_when_the_change_commits(db, make_user):
+    user = make_user()
+    assert get_user_cached(db, user.id).is_admin is False
+
+    writer = SessionLocal()
+    try:
+        changed = get_user(writer, user.id)
+        changed.is_admin = True
+        writer.flush()
+        # A request between the flush and the commit still reads, and caches, the old row
+        assert get_user_cached(db, user.id).is_admin is False
+        writer.commit()
+    finally:
+        writer.close()
+    assert get_user_cached(db, user.id).is_admin is True
+
+def test_rolled_back_change_keeps_the_cached_user(db, make_user):
+    user = make_user()
+    cached = get_user_cached(db, user.id)
+
+    writer = SessionLocal()
+    try:
+        get_user(writer, user.id).is_admin = True
+        writer.flush()
+        writer.rollback()
+    finally:
+        writer.close()
+    assert get_user_cached(db, user.id) is cached